@@ -4,7 +4,7 @@ import shlex
 import shutil
 import sys
 from dataclasses import dataclass, field
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 
 @dataclass
@@ -26,6 +26,16 @@ class UserConfig:
     handlers: Dict[str, "HandlerSpec"] = field(default_factory=dict)
     executors: ExecutorsSpec = field(default_factory=ExecutorsSpec)
     warnings: List[str] = field(default_factory=list)
+    expand_all_max_depth: int = 8
+    expand_all_max_nodes: int = 2000
+    matrix_fps: int = 25
+    matrix_idle_fps: int = 2
+    matrix_idle_seconds: int = 30
+    matrix_cpu_budget: int = 10
+    popup_max_lines: int = 50_000
+    popup_max_bytes: int = 16 * 1024 * 1024
+    popup_spill_to_disk: bool = True
+    popup_spill_max_bytes: int = 1024 * 1024 * 1024
 
     def get_handler_commands(self, name: str) -> List[List[str]]:
         return self.get_handler_spec(name).commands
@@ -53,6 +63,14 @@ def _config_path() -> str:
     return os.path.join(xdg_config, "o", "config.json")
 
 
+def get_cache_dir() -> str:
+    """Directory for o's cache files (picker selection, popup spill files)."""
+    xdg_cache = os.environ.get("XDG_CACHE_HOME")
+    if not xdg_cache:
+        xdg_cache = os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(xdg_cache, "o")
+
+
 def _normalize_command(entry) -> List[str]:
     if isinstance(entry, str):
         return shlex.split(entry) if entry.strip() else []
@@ -178,6 +196,21 @@ def _normalize_executors(raw_value) -> Tuple[ExecutorsSpec, List[str]]:
     return ExecutorsSpec(python=python_cmd, shell=shell_cmd), warnings
 
 
+def _normalize_limit(
+    data, key: str, default: int, warnings: List[str], maximum: Optional[int] = None
+) -> int:
+    if key not in data:
+        return default
+    value = data.get(key)
+    if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+        warnings.append(f"{key} must be a positive integer; using {default}")
+        return default
+    if maximum is not None and value > maximum:
+        warnings.append(f"{key} must be at most {maximum}; using {maximum}")
+        return maximum
+    return value
+
+
 def load_user_config() -> UserConfig:
     path = _config_path()
     data = {}
@@ -215,11 +248,54 @@ def load_user_config() -> UserConfig:
     if "browser_shortcuts" in data:
         warnings.append("browser_shortcuts is no longer supported and was ignored")
 
+    defaults = UserConfig()
+    expand_all_max_depth = _normalize_limit(
+        data, "expand_all_max_depth", defaults.expand_all_max_depth, warnings
+    )
+    expand_all_max_nodes = _normalize_limit(
+        data, "expand_all_max_nodes", defaults.expand_all_max_nodes, warnings
+    )
+    matrix_fps = _normalize_limit(
+        data, "matrix_fps", defaults.matrix_fps, warnings, maximum=60
+    )
+    matrix_idle_fps = _normalize_limit(
+        data, "matrix_idle_fps", defaults.matrix_idle_fps, warnings, maximum=60
+    )
+    matrix_idle_seconds = _normalize_limit(
+        data, "matrix_idle_seconds", defaults.matrix_idle_seconds, warnings
+    )
+    matrix_cpu_budget = _normalize_limit(
+        data, "matrix_cpu_budget", defaults.matrix_cpu_budget, warnings, maximum=100
+    )
+    popup_max_lines = _normalize_limit(
+        data, "popup_max_lines", defaults.popup_max_lines, warnings
+    )
+    popup_max_bytes = _normalize_limit(
+        data, "popup_max_bytes", defaults.popup_max_bytes, warnings
+    )
+    popup_spill_to_disk = data.get("popup_spill_to_disk", defaults.popup_spill_to_disk)
+    if not isinstance(popup_spill_to_disk, bool):
+        warnings.append("popup_spill_to_disk must be true or false; using true")
+        popup_spill_to_disk = defaults.popup_spill_to_disk
+    popup_spill_max_bytes = _normalize_limit(
+        data, "popup_spill_max_bytes", defaults.popup_spill_max_bytes, warnings
+    )
+
     return UserConfig(
         matrix_mode=matrix_mode,
         handlers=handlers,
         executors=executors,
         warnings=warnings,
+        expand_all_max_depth=expand_all_max_depth,
+        expand_all_max_nodes=expand_all_max_nodes,
+        matrix_fps=matrix_fps,
+        matrix_idle_fps=matrix_idle_fps,
+        matrix_idle_seconds=matrix_idle_seconds,
+        matrix_cpu_budget=matrix_cpu_budget,
+        popup_max_lines=popup_max_lines,
+        popup_max_bytes=popup_max_bytes,
+        popup_spill_to_disk=popup_spill_to_disk,
+        popup_spill_max_bytes=popup_spill_max_bytes,
     )
 
 
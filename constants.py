@@ -23,6 +23,8 @@ Navigation
   Ctrl+H          Go to previous directory in history
   Ctrl+L          Go to next directory in history
   Esc             Collapse inline expansions under current directory
+                  (stops a running ,xar or a "loading N…" listing first,
+                  keeping what was already read or expanded)
 
 Filtering (glob-style)
   /               Enter filter mode (type pattern)
@@ -48,6 +50,14 @@ Command Mode
   Esc             Cancel command mode
   Ctrl+P / Ctrl+N Navigate command history
 
+Output Popup (:! and e)
+  j / k           Scroll line by line
+  Ctrl+J / Ctrl+K Scroll in larger jumps
+  ,j / ,k         Jump to end / start of output
+  /               Search output (type text, Enter)
+  n / N           Next / previous match
+  Esc             Cancel running job, or close when finished
+
 Visual Mode
   v               Enter visual selection; press v again to add range to marks
   j / k           Extend/shrink selection while in visual mode
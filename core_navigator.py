@@ -3,15 +3,29 @@ import subprocess
 import os
 import threading
 from dataclasses import dataclass
-from typing import Set, List, Optional, Iterable
+from typing import Callable, List, Optional, Iterable, Tuple
 
 from directory_manager import DirectoryManager
+from fs_watcher import DirectoryWatcher
+from prefetcher import ListingPrefetcher
+from expand_all import ExpandAllJob
+from output_buffer import OutputBuffer
+from path_trie import ExpandedNodeSet
+from display_tree import DirNode, DisplayRows
 from clipboard_manager import ClipboardManager
 from ui_renderer import UIRenderer
 from input_handler import InputHandler
 from constants import Constants
 from file_actions import FileActionService
-from config import USER_CONFIG
+from config import USER_CONFIG, get_cache_dir
+
+
+@dataclass
+class _DisplayCache:
+    key: Optional[tuple]
+    items: DisplayRows
+    listed: List[Tuple[str, Optional[int]]]
+    tick: int
 
 
 @dataclass
@@ -23,6 +37,10 @@ class PickerOptions:
 
 
 class FileNavigator:
+    # Directories around the cursor whose listings are fetched ahead of time.
+    PREFETCH_LIMIT = 6
+    PREFETCH_WINDOW = 32
+
     def __init__(
         self,
         start_path: str,
@@ -54,7 +72,10 @@ class FileNavigator:
 
         # Multi-mark support — now using full absolute paths
         self.marked_items = set()  # set of str (absolute paths)
-        self.expanded_nodes: Set[str] = set()
+        self.expanded_nodes = ExpandedNodeSet()
+        # build_display_items() memo; revalidated once per event-loop tick.
+        self._display_cache: Optional[_DisplayCache] = None
+        self._tick = 0
 
         self.cheatsheet = Constants.CHEATSHEET
         self.status_message = ""
@@ -75,14 +96,28 @@ class FileNavigator:
         self.command_buffer = ""
 
         self.command_popup_visible = False
-        self.command_popup_lines: List[str] = []
+        self.command_popup_lines = self._new_popup_buffer()
         self.command_popup_header = ""
         self.command_popup_scroll = 0
         self.command_popup_view_rows = 0
+        self.command_popup_search = ""
+        self.command_popup_match: Optional[int] = None
         self.command_popup_lock = threading.Lock()
 
         self.active_execution_job = None
 
+        # Set by the watcher thread when a watched directory changed;
+        # apply_external_changes() revalidates the view on the UI thread.
+        self.fs_watcher: Optional[DirectoryWatcher] = None
+        self._external_change = False
+        self.prefetcher: Optional[ListingPrefetcher] = None
+        # ,xar runs here; apply_expand_progress() folds its results in.
+        self.expand_job: Optional[ExpandAllJob] = None
+        self.dir_manager.stream_observer = self._on_listing_progress
+        # Set by stream threads; apply_listing_progress() re-anchors the
+        # selection once the new batch is merged into the view.
+        self._listing_grew = False
+
         if self.config.warnings and not self.status_message:
             self.status_message = self.config.warnings[0]
 
@@ -102,6 +137,25 @@ class FileNavigator:
             globs = [f"*.{ext}" for ext in self.picker_options.extensions]
             self.dir_manager.filter_pattern = ",".join(globs)
 
+    @property
+    def need_redraw(self) -> bool:
+        return self._need_redraw
+
+    @need_redraw.setter
+    def need_redraw(self, value: bool) -> None:
+        # Worker threads flag redraws here; wake the event loop if it sleeps.
+        self._need_redraw = value
+        if value:
+            self.wake()
+
+    def set_wake_callback(self, callback: Optional[Callable[[], None]]) -> None:
+        self._wake_callback = callback
+
+    def wake(self) -> None:
+        callback = getattr(self, "_wake_callback", None)
+        if callback is not None:
+            callback()
+
     def open_file(self, filepath: str):
         self.file_actions.open_file(filepath)
 
@@ -138,6 +192,179 @@ class FileNavigator:
     def prompt_for_input(self, prompt: str) -> Optional[str]:
         return self.file_actions.prompt_for_input(prompt)
 
+    def start_background_services(self) -> None:
+        if self.fs_watcher is not None:
+            return
+        watcher = DirectoryWatcher(self.queue_external_change)
+        watcher.start()
+        self.fs_watcher = watcher
+        cached = self._display_cache
+        if cached is not None:
+            self._watch_listed(cached.listed)
+        else:
+            watcher.watch(os.path.realpath(self.dir_manager.current_path))
+        self.prefetcher = ListingPrefetcher(self.dir_manager)
+
+    def stop_background_services(self) -> None:
+        self.cancel_expand_all(quiet=True)
+        prefetcher = self.prefetcher
+        self.prefetcher = None
+        if prefetcher is not None:
+            prefetcher.close()
+        watcher = self.fs_watcher
+        self.fs_watcher = None
+        if watcher is not None:
+            watcher.stop()
+        self.dir_manager.close()
+        with self.command_popup_lock:
+            self._replace_popup_buffer(self._new_popup_buffer())
+
+    def _on_listing_progress(self, _path: str) -> None:
+        # Runs on the stream thread; the main loop picks the flags up.
+        self._listing_grew = True
+        self.need_redraw = True
+
+    def apply_listing_progress(self) -> bool:
+        """Keep the selected rows on the same paths after a streamed batch.
+
+        Batches are merged into the sorted view, so rows above the selection
+        can appear and shift the indices underneath it.
+        """
+        if not self._listing_grew:
+            return False
+        self._listing_grew = False
+        previous = self._display_cache
+        if previous is None or not len(previous.items):
+            return True
+        old_rows = previous.items
+        rows = self.build_display_items()
+        if rows is old_rows:
+            return True
+
+        def moved(index: Optional[int]) -> Optional[int]:
+            if index is None or not 0 <= index < len(old_rows):
+                return index
+            new_index = rows.index_of(old_rows[index][2])
+            return index if new_index is None else new_index
+
+        self.browser_selected = moved(self.browser_selected)
+        if self.visual_mode:
+            self.visual_anchor_index = moved(self.visual_anchor_index)
+            self.visual_active_index = moved(self.visual_active_index)
+            self._apply_visual_marks()
+        return True
+
+    def cancel_listing_scan(self) -> bool:
+        """Stop streaming the current directory, keeping what was read."""
+        count = self.dir_manager.cancel_scan(self.dir_manager.current_path)
+        if count is None:
+            return False
+        self.status_message = f"Listing stopped at {count:,} entries"
+        self.need_redraw = True
+        return True
+
+    def start_expand_all(self) -> None:
+        """Expand directories below the current one on a worker thread."""
+        self.cancel_expand_all(quiet=True)
+        job = ExpandAllJob(
+            self.dir_manager,
+            self.dir_manager.current_path,
+            max_depth=self.config.expand_all_max_depth,
+            max_nodes=self.config.expand_all_max_nodes,
+            on_progress=self._on_expand_progress,
+        )
+        self.expand_job = job
+        self.status_message = "Expanding…"
+        self.need_redraw = True
+        job.start()
+
+    def _on_expand_progress(self) -> None:
+        # Runs on the expand-all thread; the main loop picks the flag up.
+        self.need_redraw = True
+
+    def apply_expand_progress(self) -> bool:
+        """Add directories the expand-all job has listed since the last tick."""
+        job = self.expand_job
+        if job is None:
+            return False
+        # Read before draining so the final batch is never left behind.
+        finished = not job.is_running()
+        paths = job.take_expanded()
+        if paths:
+            self.expanded_nodes.update(paths)
+            self.need_redraw = True
+        if finished:
+            self.expand_job = None
+            if job.expanded == 0:
+                self.status_message = "No directories expanded"
+            elif job.limit_reached:
+                self.status_message = (
+                    f"Expanded {job.expanded:,} directories "
+                    f"(limit {job.max_nodes:,} reached)"
+                )
+            else:
+                self.status_message = f"Expanded {job.expanded:,} directories"
+            self.need_redraw = True
+        return bool(paths) or finished
+
+    def cancel_expand_all(self, *, quiet: bool = False) -> bool:
+        """Stop a running expand-all, keeping what was already expanded."""
+        job = self.expand_job
+        if job is None:
+            return False
+        self.expand_job = None
+        job.cancel()
+        if not quiet:
+            self.expanded_nodes.update(job.take_expanded())
+            self.status_message = (
+                f"Expand-all cancelled after {job.expanded:,} directories"
+            )
+            self.need_redraw = True
+        return True
+
+    def schedule_prefetch(self) -> None:
+        """Queue listings of the highlighted directory and nearby siblings."""
+        prefetcher = self.prefetcher
+        if prefetcher is None:
+            return
+        items = self.build_display_items()
+        if not items:
+            prefetcher.schedule(())
+            return
+        selected = max(0, min(self.browser_selected, len(items) - 1))
+        parent = os.path.dirname(items[selected][2])
+
+        targets: List[str] = []
+        for offset in range(self.PREFETCH_WINDOW + 1):
+            for idx in (selected + offset, selected - offset) if offset else (selected,):
+                if not 0 <= idx < len(items):
+                    continue
+                _name, is_dir, path, _depth = items[idx]
+                # Expanded directories are already listed for the tree view.
+                if not is_dir or path in self.expanded_nodes:
+                    continue
+                if os.path.dirname(path) == parent:
+                    targets.append(path)
+            if len(targets) >= self.PREFETCH_LIMIT:
+                break
+        prefetcher.schedule(targets[: self.PREFETCH_LIMIT])
+
+    def queue_external_change(self, _path: str) -> None:
+        self._external_change = True
+        self.need_redraw = True
+
+    def apply_external_changes(self) -> bool:
+        if not self._external_change:
+            return False
+        self._external_change = False
+        # Listings are not discarded here: shown ones are re-stamped on this
+        # tick and rescanned only if their directory changed, so an event
+        # that left the stamp alone does not restart a listing still loading.
+        items = self.build_display_items()
+        self.browser_selected = max(0, min(self.browser_selected, len(items) - 1))
+        self.need_redraw = True
+        return True
+
     def set_active_execution_job(self, job) -> None:
         self.active_execution_job = job
 
@@ -149,20 +376,53 @@ class FileNavigator:
     ) -> None:
         if lines is None:
             lines = []
+        buffer = self._new_popup_buffer()
+        buffer.extend(lines)
         with self.command_popup_lock:
-            self.command_popup_lines = list(lines)
+            self._replace_popup_buffer(buffer)
             self.command_popup_header = header
             self.command_popup_scroll = 0
             self.command_popup_view_rows = 0
+            self.command_popup_match = None
             self.command_popup_visible = True
         self.status_message = header
         self.need_redraw = True
 
+    def _new_popup_buffer(self) -> OutputBuffer:
+        spill_dir = get_cache_dir() if self.config.popup_spill_to_disk else None
+        return OutputBuffer(
+            max_lines=self.config.popup_max_lines,
+            max_bytes=self.config.popup_max_bytes,
+            spill_dir=spill_dir,
+            spill_max_bytes=self.config.popup_spill_max_bytes,
+        )
+
+    def _replace_popup_buffer(self, buffer: OutputBuffer) -> None:
+        """Swap in *buffer* (popup lock held), deleting the old spill file."""
+        previous = self.command_popup_lines
+        self.command_popup_lines = buffer
+        close = getattr(previous, "close", None)
+        if close is not None:
+            close()
+
     def append_command_popup_lines(self, new_lines: List[str]) -> None:
         if not new_lines:
             return
         with self.command_popup_lock:
-            self.command_popup_lines.extend(new_lines)
+            buffer = self.command_popup_lines
+            dropped = buffer.dropped
+            buffer.extend(new_lines)
+            # Keep the rows on screen in place while old lines are evicted.
+            evicted = buffer.dropped - dropped
+            if evicted and self.command_popup_scroll:
+                self.command_popup_scroll = max(
+                    0, self.command_popup_scroll - evicted
+                )
+            match = self.command_popup_match
+            if evicted and match is not None:
+                # The matched line itself may have been evicted.
+                match -= evicted
+                self.command_popup_match = match if match >= 0 else None
         self.need_redraw = True
 
     def update_command_popup_header(self, header: str) -> None:
@@ -174,10 +434,11 @@ class FileNavigator:
     def close_command_popup(self) -> None:
         with self.command_popup_lock:
             self.command_popup_visible = False
-            self.command_popup_lines = []
+            self._replace_popup_buffer(self._new_popup_buffer())
             self.command_popup_header = ""
             self.command_popup_scroll = 0
             self.command_popup_view_rows = 0
+            self.command_popup_match = None
         self.status_message = ""
         self.need_redraw = True
 
@@ -220,72 +481,169 @@ class FileNavigator:
     def rename_selected(self):
         self.file_actions.rename_selected()
 
-    def build_display_items(self):
-        base_items = self.dir_manager.get_filtered_items()
-        display = []
-
-        for name, is_dir in base_items:
-            path = os.path.join(self.dir_manager.current_path, name)
-            display.append((name, is_dir, path, 0))
-            if is_dir and path in self.expanded_nodes:
-                self._append_expanded(path, 1, display)
-
+    def begin_tick(self) -> None:
+        """Start an event-loop tick; cached display items get revalidated."""
+        self._tick += 1
+
+    def _display_key(self) -> Optional[tuple]:
+        dm = self.dir_manager
+        version = getattr(self.expanded_nodes, "version", None)
+        generation = getattr(dm, "generation", None)
+        if version is None or generation is None:
+            return None
+        return (
+            dm.current_path,
+            dm.filter_pattern,
+            dm.show_hidden,
+            dm.sort_mode,
+            generation,
+            id(self.expanded_nodes),
+            version,
+        )
+
+    def build_display_items(self) -> DisplayRows:
+        """Return the flattened ``(name, is_dir, path, depth)`` rows.
+
+        Rows are materialized on access from per-directory nodes, so callers
+        that only index or slice pay for the rows they touch. The sequence is
+        shared between callers and never changes; it is reused while the
+        display key is unchanged, and on the first call of a new tick the
+        listed directories are re-stamped, costing one ``stat`` each instead
+        of a rebuild. Listings of directories that are not shown, such as
+        prefetched siblings, do not invalidate it.
+        """
+        cached = self._valid_display_cache()
+        if cached is not None:
+            return cached.items
+
+        listed: List[Tuple[str, Optional[int]]] = []
+        base_items = self.dir_manager.get_filtered_items(record=listed)
+        root = self._build_node(
+            self.dir_manager.current_path, 0, base_items, listed
+        )
+        display = DisplayRows(root)
+
+        key = self._display_key()
+        if key is not None:
+            self._display_cache = _DisplayCache(key, display, listed, self._tick)
+        self._watch_listed(listed)
         return display
 
+    def _watch_listed(self, listed: List[Tuple[str, Optional[int]]]) -> None:
+        """Watch the directories on screen, and only those.
+
+        Prefetched and other off-screen listings are revalidated by their
+        stamp when shown. The current directory is watched last, so it is
+        the most recently used watch and the last one the LRU would evict;
+        when more directories are shown than there are watches, only the
+        first ones are watched, so a rebuild does not churn through them.
+        """
+        watcher = self.fs_watcher
+        if watcher is None:
+            return
+        shown = listed[: watcher.max_watches]
+        for path, _version in reversed(shown):
+            watcher.watch(path)
+
+    def _valid_display_cache(self) -> Optional[_DisplayCache]:
+        key = self._display_key()
+        cached = self._display_cache
+        if key is None or cached is None or cached.key != key:
+            return None
+        if not self.dir_manager.listings_unchanged(
+            cached.listed, restat=cached.tick != self._tick
+        ):
+            return None
+        cached.tick = self._tick
+        return cached
+
+    def expand_node(self, path: str, index: Optional[int] = None) -> None:
+        """Expand *path*; with the row *index* its subtree is spliced in.
+
+        Only the new subtree is listed and built, so the cost follows the
+        size of the expansion rather than of the whole view.
+        """
+        cached = self._valid_display_cache()
+        already_expanded = path in self.expanded_nodes
+        self.expanded_nodes.add(path)
+        if cached is None or index is None or already_expanded:
+            return
+        rows = cached.items
+        if not 0 <= index < len(rows):
+            return
+        _name, is_dir, row_path, depth = rows[index]
+        if row_path != path or not is_dir:
+            return
+        child = self._expanded_node(path, depth + 1, cached.listed)
+        if child is None:
+            cached.key = None
+            return
+        # The previous rows stay valid for callers still holding them.
+        cached.items = rows.with_expanded(index, child)
+        cached.key = self._display_key()
+        self._watch_listed(cached.listed)
+
+    def collapse_node(self, path: str, index: Optional[int] = None) -> None:
+        """Collapse *path*; with the row *index* its subtree is dropped in place."""
+        cached = self._valid_display_cache()
+        self.collapse_branch(path)
+        if cached is None or index is None:
+            return
+        rows = cached.items
+        if not 0 <= index < len(rows) or rows[index][2] != path:
+            return
+        cached.items = rows.with_collapsed(index)
+        cached.key = self._display_key()
+
     def _apply_reveal_selection(self) -> None:
         target = self.reveal_target
         if not target:
             return
 
         items = self.build_display_items()
-        for idx, (_, _is_dir, path, _depth) in enumerate(items):
-            if os.path.realpath(path) == target:
-                self.browser_selected = idx
-                self.update_visual_active(self.browser_selected)
-                return
-
-    def _append_expanded(self, base_path: str, depth: int, collection: list):
-        children = self.dir_manager.list_directory(base_path)
-        if (
-            not children
-            and base_path in self.expanded_nodes
-            and not os.path.exists(base_path)
-        ):
-            self.expanded_nodes.discard(base_path)
-            return
-
-        for child_name, child_is_dir in children:
-            child_path = os.path.join(base_path, child_name)
-            collection.append((child_name, child_is_dir, child_path, depth))
-            if child_is_dir and child_path in self.expanded_nodes:
-                self._append_expanded(child_path, depth + 1, collection)
+        idx = items.index_of(target)
+        if idx is not None:
+            self.browser_selected = idx
+            self.update_visual_active(self.browser_selected)
+
+    def _expanded_node(
+        self, path: str, depth: int, listed: List[Tuple[str, Optional[int]]]
+    ) -> Optional[DirNode]:
+        entries = self.dir_manager.list_directory(path, record=listed)
+        if not entries and path in self.expanded_nodes and not os.path.exists(path):
+            self.expanded_nodes.discard(path)
+            return None
+        return self._build_node(path, depth, entries, listed)
+
+    def _build_node(
+        self,
+        path: str,
+        depth: int,
+        entries: list,
+        listed: List[Tuple[str, Optional[int]]],
+    ) -> DirNode:
+        children = {}
+        if not self.expanded_nodes.has_descendants(path):
+            return DirNode(path, depth, entries, children)
+        for position, entry in enumerate(entries):
+            if not entry.is_dir:
+                continue
+            child_path = os.path.join(path, entry.name)
+            if child_path in self.expanded_nodes:
+                child = self._expanded_node(child_path, depth + 1, listed)
+                if child is not None:
+                    children[position] = child
+        return DirNode(path, depth, entries, children)
 
     def collapse_branch(self, base_path: str):
-        if base_path not in self.expanded_nodes and not any(
-            p.startswith(f"{base_path}{os.sep}") for p in self.expanded_nodes
-        ):
-            return
-        to_remove = [
-            p
-            for p in self.expanded_nodes
-            if p == base_path or p.startswith(f"{base_path}{os.sep}")
-        ]
-        for entry in to_remove:
-            self.expanded_nodes.discard(entry)
+        self.expanded_nodes.discard_subtree(base_path)
 
     def collapse_expansions_under(self, base_path: str):
         real_base = os.path.realpath(base_path)
         if not real_base:
             return
-        prefix = f"{real_base}{os.sep}"
-        to_remove = [
-            p for p in self.expanded_nodes if p == real_base or p.startswith(prefix)
-        ]
-        if not to_remove:
-            return
-        for entry in to_remove:
-            self.expanded_nodes.discard(entry)
-        self.need_redraw = True
+        if self.expanded_nodes.discard_subtree(real_base):
+            self.need_redraw = True
 
     def add_bookmark(self, path: Optional[str] = None) -> bool:
         target = path or self.dir_manager.current_path
@@ -347,9 +705,6 @@ class FileNavigator:
             if target == real_current:
                 current_changed = True
 
-        if current_changed:
-            self.reset_matrix_state()
-
         self.need_redraw = True
 
         if current_changed:
@@ -380,13 +735,15 @@ class FileNavigator:
 
     def _set_current_path(self, new_path: str):
         self.exit_visual_mode()
+        self.cancel_expand_all(quiet=True)
+        # Partial listings are only meaningful while their scan is on screen.
+        self.dir_manager.discard_partial_listings()
         self.dir_manager.current_path = new_path
         self.browser_selected = 0
         self.list_offset = 0
         self.need_redraw = True
         if self.layout_mode == "matrix":
             self.restore_matrix_position(new_path)
-        self.reset_matrix_state()
         real_path = os.path.realpath(new_path)
         if real_path in self.bookmarks:
             self.bookmark_index = self.bookmarks.index(real_path)
@@ -1,20 +1,204 @@
 # ~/Apps/vios/directory_manager.py
 import os
 import fnmatch
-import subprocess
-from typing import Optional, Dict, List, Set, Tuple
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Optional, Dict, List, Set, Tuple
+
+from git_repo import (
+    CheckIgnoreProcess,
+    GitRootFinder,
+    GitignoreMatcher,
+    resolve_git_dirs,
+)
+
+
+class ListingEntry:
+    """A directory entry produced by ``os.scandir``.
+
+    Iterates as ``(name, is_dir)`` so callers can unpack it like the tuples the
+    listing cache used to hold. The originating ``os.DirEntry`` is kept so that
+    sort modes needing ``stat`` data reuse its cached result instead of issuing
+    another system call per entry; ``refresh_mtime`` stats the entry again.
+    """
+
+    __slots__ = ("name", "is_dir", "_dir_entry", "_mtime")
+
+    def __init__(
+        self, name: str, is_dir: bool, dir_entry: Optional[os.DirEntry] = None
+    ):
+        self.name = name
+        self.is_dir = is_dir
+        self._dir_entry = dir_entry
+        self._mtime: Optional[float] = None
+
+    @classmethod
+    def from_dir_entry(cls, dir_entry: os.DirEntry) -> Optional["ListingEntry"]:
+        """Build an entry from ``d_type`` data, or ``None`` for dangling links."""
+        try:
+            if dir_entry.is_symlink():
+                # Only symlinks need a stat: it resolves the target type and
+                # filters out dangling links the way ``os.path.exists`` did.
+                dir_entry.stat()
+            is_dir = dir_entry.is_dir()
+        except OSError:
+            return None
+        return cls(dir_entry.name, is_dir, dir_entry)
+
+    @property
+    def path(self) -> Optional[str]:
+        return self._dir_entry.path if self._dir_entry is not None else None
+
+    def is_symlink(self) -> bool:
+        return self._dir_entry is not None and self._dir_entry.is_symlink()
+
+    def mtime(self) -> float:
+        if self._mtime is not None:
+            return self._mtime
+        if self._dir_entry is None:
+            return 0
+        try:
+            return self._dir_entry.stat().st_mtime
+        except OSError:
+            return 0
+
+    def refresh_mtime(self) -> None:
+        """Re-read the modification time; ``DirEntry`` caches its first stat."""
+        if self._dir_entry is None:
+            return
+        try:
+            self._mtime = os.stat(self._dir_entry.path).st_mtime
+        except OSError:
+            self._mtime = 0
+
+    def __iter__(self):
+        yield self.name
+        yield self.is_dir
+
+    def __repr__(self) -> str:
+        return f"ListingEntry({self.name!r}, {self.is_dir!r})"
+
+
+def stat_stamp(path: str) -> Optional[Tuple[int, int, int]]:
+    """Return the ``(st_dev, st_ino, st_mtime_ns)`` identity of *path*."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_dev, st.st_ino, st.st_mtime_ns)
+
+
+@dataclass
+class CachedListing:
+    """Raw listing of one directory, stamped with ``(st_dev, st_ino, st_mtime_ns)``.
+
+    ``entries`` holds every readable entry (dotfiles included) minus git-ignored
+    ones; ``views`` memoizes the hidden-filtered, sorted variants derived from it
+    together with the number of entries they cover. While a streaming scan is
+    still appending (``complete`` is false), ``sort_runs`` keeps each view as
+    sorted ``(*key, seq, entry)`` tuples so new batches are merged, not resorted.
+    Editing a file leaves the directory stamp alone, so mtime-sorted views are
+    also tied to ``mtime_epoch`` and rebuilt from fresh stats once a newer
+    mtime sort has been selected.
+    """
+
+    stamp: Tuple[int, int, int]
+    entries: List[ListingEntry]
+    views: Dict[Tuple[bool, str], Tuple[int, List[ListingEntry]]] = field(
+        default_factory=dict
+    )
+    complete: bool = True
+    sort_runs: Dict[Tuple[bool, str], list] = field(default_factory=dict)
+    mtime_epoch: int = 0
+    # Unique per stored listing and renewed whenever a stream batch lands.
+    version: int = 0
+
+
+class ListingStream:
+    """Finish a scan that outgrew its synchronous budget on a worker thread.
+
+    Entries are handed back to ``DirectoryManager`` in batches at most every
+    ``DirectoryManager.STREAM_PUBLISH_SECONDS`` so the UI redraws a growing
+    list instead of freezing until the whole directory has been read.
+    """
+
+    def __init__(self, manager: "DirectoryManager", real_path: str, listing, scanner):
+        self.manager = manager
+        self.real_path = real_path
+        self.listing = listing
+        self._scanner = scanner
+        self._cancelled = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="o-listing-stream", daemon=True
+        )
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    def _run(self) -> None:
+        batch: List[ListingEntry] = []
+        last_publish = time.monotonic()
+        try:
+            for dir_entry in self._scanner:
+                if self._cancelled.is_set():
+                    return
+                entry = ListingEntry.from_dir_entry(dir_entry)
+                if entry is not None:
+                    batch.append(entry)
+                now = time.monotonic()
+                if now - last_publish >= self.manager.STREAM_PUBLISH_SECONDS:
+                    self.manager._publish_stream_batch(self, batch, done=False)
+                    batch = []
+                    last_publish = now
+        except OSError:
+            pass
+        finally:
+            self._scanner.close()
+        if not self._cancelled.is_set():
+            self.manager._publish_stream_batch(self, batch, done=True)
 
 
 class DirectoryManager:
+    # Repositories with a live ``git check-ignore`` coprocess at any one time.
+    MAX_IGNORE_PROCESSES = 8
+    MAX_IGNORE_MATCHERS = 32
+    # A scan still running after this long continues on a ListingStream.
+    STREAM_SYNC_SECONDS = 0.05
+    STREAM_PUBLISH_SECONDS = 0.25
+    STREAM_CHECK_EVERY = 1024
+    # Listings kept in memory; expand-all and long sessions would otherwise
+    # grow the cache without bound.
+    MAX_CACHED_LISTINGS = 4096
+
     def __init__(self, start_path: str):
         self.current_path = os.path.realpath(start_path)
         self.filter_pattern = ""
         self.show_hidden = False  # Default: hide dotfiles/dotdirs
         self.sort_mode = "alpha"
         self.sort_map = {}
-        self._cache: Dict[str, List[Tuple[str, bool]]] = {}
-        self._git_repo_cache: Dict[str, Optional[str]] = {}
-        self._git_ignored_cache: Dict[str, Tuple[Set[str], Set[str]]] = {}
+        self._cache: "OrderedDict[str, CachedListing]" = OrderedDict()
+        # Guards the caches below; listings are also built on prefetch threads.
+        # Scans run outside the lock so the UI never waits on a slow mount.
+        self._lock = threading.RLock()
+        self._git_roots = GitRootFinder()
+        self._gitignore_matchers: "OrderedDict[str, GitignoreMatcher]" = OrderedDict()
+        self._git_ignore_procs: "OrderedDict[str, CheckIgnoreProcess]" = OrderedDict()
+        # Called from stream threads whenever a partial listing grows.
+        self.stream_observer: Optional[Callable[[str], None]] = None
+        self._streams: Dict[str, ListingStream] = {}
+        # Bumped whenever the way listings are ordered changes; display
+        # caches key on it. Changes to one listing show in its ``version``.
+        self.generation = 0
+        self._versions = itertools.count(1)
+        # Bumped whenever an mtime sort is selected; listings stamped with an
+        # older epoch re-stat their entries before serving an mtime view.
+        self.mtime_epoch = 0
 
         # Keep home_path for pretty_path only
         self.home_path = os.path.realpath(os.path.expanduser("~"))
@@ -35,164 +219,353 @@ class DirectoryManager:
     def toggle_hidden(self):
         """Toggle visibility of hidden files/directories"""
         self.show_hidden = not self.show_hidden
-        # Hidden visibility affects every cached listing, so clear caches
-        self.refresh_cache()
+        # Cached listings keep hidden entries, so only the derived views change
 
     def get_hidden_status_text(self) -> str:
         """Return text for status bar when hidden files are visible"""
         return " .dot" if self.show_hidden else ""
 
     def get_items(self):
-        real_path = os.path.realpath(self.current_path)
-        cached = self._cache.get(real_path)
-        if cached is not None:
-            return cached[:]
-        items = self.list_directory(self.current_path)
-        self._cache[real_path] = items[:]
-        return items
-
-    def list_directory(self, target_path: str):
-        try:
-            raw_items = os.listdir(target_path)
-        except (PermissionError, FileNotFoundError):
+        return self.list_directory(self.current_path)
+
+    def list_directory(
+        self,
+        target_path: str,
+        *,
+        record: Optional[List[Tuple[str, Optional[int]]]] = None,
+        allow_stream: bool = True,
+    ) -> List[ListingEntry]:
+        """Return the sorted, hidden-filtered entries of *target_path*.
+
+        When *record* is given the resolved path and the version of the
+        listing served are appended to it, so callers can later ask
+        ``listings_unchanged`` about what they listed. Worker threads pass
+        ``allow_stream=False`` to read large directories fully.
+        """
+        real_target = os.path.realpath(target_path)
+        listing = self._get_listing(real_target, allow_stream=allow_stream)
+        if listing is None:
+            if record is not None:
+                record.append((real_target, None))
             return []
 
-        visible_items = []
-
-        real_target = os.path.realpath(target_path)
         sort_mode = self.sort_map.get(real_target, self.sort_mode)
-        ignored_items = self._get_git_ignored_items(target_path, raw_items)
-
-        for item in raw_items:
-            if item in {".", ".."}:
-                continue
-
-            full_path = os.path.join(target_path, item)
-            if not os.path.exists(full_path):
-                continue
-
-            is_dir = os.path.isdir(full_path)
-            is_hidden = item.startswith(".")
-
-            if is_hidden and not self.show_hidden:
-                continue
-            if item in ignored_items:
-                continue
-
-            visible_items.append((item, is_dir))
-
+        view_key = (self.show_hidden, sort_mode)
+        if sort_mode != "alpha" and listing.mtime_epoch != self.mtime_epoch:
+            self._refresh_mtimes(listing)
+        # Views are built under the lock: stream threads extend ``entries``
+        # and another lister may be merging the same ``sort_runs``.
+        with self._lock:
+            if record is not None:
+                record.append((real_target, listing.version))
+            size = len(listing.entries)
+            view = listing.views.get(view_key)
+            if view is None or view[0] != size:
+                view = self._build_view(listing, view_key, size)
+            return view[1][:]
+
+    def _refresh_mtimes(self, listing: CachedListing) -> None:
+        epoch = self.mtime_epoch
+        with self._lock:
+            entries = listing.entries[:]
+        # Stat outside the lock; entries streamed in meanwhile are fresh.
+        for entry in entries:
+            entry.refresh_mtime()
+        with self._lock:
+            listing.mtime_epoch = epoch
+            for key in [key for key in listing.views if key[1] != "alpha"]:
+                del listing.views[key]
+                listing.sort_runs.pop(key, None)
+
+    def _build_view(
+        self, listing: CachedListing, view_key: Tuple[bool, str], size: int
+    ) -> Tuple[int, List[ListingEntry]]:
+        show_hidden, sort_mode = view_key
         if sort_mode == "alpha":
-            visible_items.sort(key=self._alpha_sort_key)
+            key_fn, reverse = self._alpha_sort_key, False
         else:
-            reverse = sort_mode == "mtime_desc"
-            visible_items.sort(
-                key=self._mtime_sort_key_factory(target_path), reverse=reverse
-            )
-
-        real_path = os.path.realpath(target_path)
-        self._cache[real_path] = visible_items[:]
-        return visible_items
-
-    def _get_git_ignored_items(self, target_path: str, raw_items: List[str]) -> set:
-        real_target = os.path.realpath(target_path)
-        repo_root = self._get_git_repo_root(real_target)
-        if not repo_root:
-            return set()
-
-        ignored_dirs, ignored_files = self._get_git_ignored_paths(repo_root)
-        if not ignored_dirs and not ignored_files:
-            return set()
-
-        ignored_items = set()
-        for item in raw_items:
-            full_path = os.path.join(real_target, item)
-            if not os.path.exists(full_path):
-                continue
-            rel_path = os.path.relpath(full_path, repo_root)
-            if os.path.isdir(full_path):
-                if f"{rel_path}/" in ignored_dirs:
-                    ignored_items.add(item)
-            elif rel_path in ignored_files:
-                ignored_items.add(item)
-        return ignored_items
-
-    def _get_git_ignored_paths(self, repo_root: str) -> Tuple[Set[str], Set[str]]:
-        cached = self._git_ignored_cache.get(repo_root)
-        if cached is not None:
-            return cached
-
-        try:
-            result = subprocess.run(
-                [
-                    "git",
-                    "-C",
-                    repo_root,
-                    "ls-files",
-                    "--others",
-                    "-i",
-                    "--exclude-standard",
-                    "--directory",
-                ],
-                capture_output=True,
-                text=True,
-                check=False,
-            )
-        except (FileNotFoundError, OSError):
-            cached = (set(), set())
-            self._git_ignored_cache[repo_root] = cached
-            return cached
+            key_fn, reverse = self._mtime_sort_key, sort_mode == "mtime_desc"
 
-        if result.returncode != 0:
-            cached = (set(), set())
-            self._git_ignored_cache[repo_root] = cached
-            return cached
+        runs = listing.sort_runs.get(view_key)
+        start = listing.views[view_key][0] if runs is not None else 0
+        fresh = listing.entries[start:size]
 
-        ignored_dirs: Set[str] = set()
-        ignored_files: Set[str] = set()
-        for line in result.stdout.splitlines():
-            path = line.strip()
-            if not path:
-                continue
-            normalized = path.replace("\\", "/")
-            if normalized.endswith("/"):
-                ignored_dirs.add(normalized)
+        if runs is None and listing.complete:
+            entries = fresh if show_hidden else [
+                e for e in fresh if not e.name.startswith(".")
+            ]
+            entries.sort(key=key_fn, reverse=reverse)
+        else:
+            # Appending a sorted batch leaves two runs that Timsort merges in
+            # linear time; ``seq`` keeps tuples from ever comparing entries.
+            runs = runs if runs is not None else []
+            batch = [
+                key_fn(entry) + (start + offset, entry)
+                for offset, entry in enumerate(fresh)
+                if show_hidden or not entry.name.startswith(".")
+            ]
+            batch.sort(reverse=reverse)
+            runs.extend(batch)
+            runs.sort(reverse=reverse)
+            entries = [item[-1] for item in runs]
+            if listing.complete:
+                listing.sort_runs.pop(view_key, None)
             else:
-                ignored_files.add(normalized)
-
-        cached = (ignored_dirs, ignored_files)
-        self._git_ignored_cache[repo_root] = cached
-        return cached
+                listing.sort_runs[view_key] = runs
+
+        view = (size, entries)
+        listing.views[view_key] = view
+        return view
+
+    def _get_listing(
+        self, real_target: str, *, allow_stream: bool = True
+    ) -> Optional[CachedListing]:
+        """Return the cached listing, rebuilding it when the directory changed.
+
+        Validation costs one ``stat`` of the directory itself. A scan that is
+        still running after ``STREAM_SYNC_SECONDS`` returns a partial listing
+        and continues on a ``ListingStream`` when *allow_stream* is set.
+        """
+        stamp = stat_stamp(real_target)
+        if stamp is None:
+            self._discard_listing(real_target)
+            return None
 
-    def _get_git_repo_root(self, target_path: str) -> Optional[str]:
-        cached = self._git_repo_cache.get(target_path)
-        if target_path in self._git_repo_cache:
+        with self._lock:
+            cached = self._cache.get(real_target)
+            if cached is not None:
+                self._cache.move_to_end(real_target)
+        if cached is not None and cached.stamp == stamp:
             return cached
 
-        for known_path, known_root in self._git_repo_cache.items():
-            if not known_root:
-                continue
-            if target_path == known_root or target_path.startswith(f"{known_root}{os.sep}"):
-                self._git_repo_cache[target_path] = known_root
-                return known_root
-
+        entries: List[ListingEntry] = []
+        streamed = False
         try:
-            result = subprocess.run(
-                ["git", "-C", target_path, "rev-parse", "--show-toplevel"],
-                capture_output=True,
-                text=True,
-                check=False,
-            )
-        except (FileNotFoundError, OSError):
-            self._git_repo_cache[target_path] = None
+            scanner = os.scandir(real_target)
+        except (PermissionError, FileNotFoundError, NotADirectoryError):
+            self._discard_listing(real_target)
             return None
-
-        if result.returncode != 0:
-            self._git_repo_cache[target_path] = None
+        try:
+            deadline = time.monotonic() + self.STREAM_SYNC_SECONDS
+            for count, dir_entry in enumerate(scanner, 1):
+                entry = ListingEntry.from_dir_entry(dir_entry)
+                if entry is not None:
+                    entries.append(entry)
+                if (
+                    allow_stream
+                    and count % self.STREAM_CHECK_EVERY == 0
+                    and time.monotonic() > deadline
+                ):
+                    streamed = True
+                    break
+        except OSError:
+            scanner.close()
+            self._discard_listing(real_target)
             return None
+        finally:
+            if not streamed:
+                scanner.close()
+
+        ignored_items = self._get_git_ignored_items(real_target, entries)
+        if ignored_items:
+            entries = [entry for entry in entries if entry.name not in ignored_items]
+
+        # The stamp is taken before reading, so a change racing the scan
+        # simply fails validation on the next access.
+        listing = CachedListing(
+            stamp=stamp,
+            entries=entries,
+            complete=not streamed,
+            mtime_epoch=self.mtime_epoch,
+        )
+        stream = None
+        with self._lock:
+            current = self._cache.get(real_target)
+            if current is not None and current.stamp == stamp and not streamed:
+                # Another thread finished the same scan first; keep its views.
+                listing = current
+            else:
+                self._cancel_stream_locked(real_target)
+                listing.version = next(self._versions)
+                self._cache[real_target] = listing
+                self._cache.move_to_end(real_target)
+                self._evict_listings_locked()
+                if streamed:
+                    stream = ListingStream(self, real_target, listing, scanner)
+                    self._streams[real_target] = stream
+        if stream is not None:
+            stream.start()
+        return listing
+
+    def _publish_stream_batch(
+        self, stream: ListingStream, batch: List[ListingEntry], *, done: bool
+    ) -> None:
+        ignored_items = self._get_git_ignored_items(stream.real_path, batch)
+        if ignored_items:
+            batch = [entry for entry in batch if entry.name not in ignored_items]
+        with self._lock:
+            if self._streams.get(stream.real_path) is not stream:
+                return
+            stream.listing.entries.extend(batch)
+            stream.listing.version = next(self._versions)
+            if done:
+                stream.listing.complete = True
+                del self._streams[stream.real_path]
+        observer = self.stream_observer
+        if observer is not None:
+            observer(stream.real_path)
+
+    def _evict_listings_locked(self) -> None:
+        while len(self._cache) > self.MAX_CACHED_LISTINGS:
+            real_target, _listing = self._cache.popitem(last=False)
+            self._cancel_stream_locked(real_target)
+
+    def _cancel_stream_locked(self, real_target: str) -> None:
+        stream = self._streams.pop(real_target, None)
+        if stream is not None:
+            stream.cancel()
+
+    def scan_progress(self, path: str) -> Optional[int]:
+        """Entries read so far while *path* is still being streamed, else ``None``."""
+        real_target = os.path.realpath(path)
+        with self._lock:
+            stream = self._streams.get(real_target)
+            if stream is None:
+                return None
+            return len(stream.listing.entries)
+
+    def cancel_scan(self, path: str) -> Optional[int]:
+        """Stop streaming *path*, keeping the partial listing; returns its size."""
+        real_target = os.path.realpath(path)
+        with self._lock:
+            stream = self._streams.get(real_target)
+            if stream is None:
+                return None
+            self._cancel_stream_locked(real_target)
+            return len(stream.listing.entries)
+
+    def discard_partial_listings(self) -> None:
+        """Cancel running scans and forget every incomplete listing."""
+        with self._lock:
+            for real_target in list(self._streams):
+                self._cancel_stream_locked(real_target)
+            for real_target, listing in list(self._cache.items()):
+                if not listing.complete:
+                    del self._cache[real_target]
+
+    def listings_unchanged(
+        self, records: List[Tuple[str, Optional[int]]], *, restat: bool = True
+    ) -> bool:
+        """Whether the listings recorded by ``list_directory`` are still current.
+
+        Each listing must still be the cached version that was served. With
+        *restat* its directory is also compared against disk, costing one
+        ``stat`` per path; it never scans.
+        """
+        with self._lock:
+            cached = [self._cache.get(path) for path, _version in records]
+        for (path, version), listing in zip(records, cached):
+            if (listing.version if listing is not None else None) != version:
+                return False
+            if restat and (listing is None or stat_stamp(path) != listing.stamp):
+                return False
+        return True
+
+    def _discard_listing(self, real_target: str) -> None:
+        with self._lock:
+            self._cancel_stream_locked(real_target)
+            self._cache.pop(real_target, None)
+
+    def prefetch(self, target_path: str) -> None:
+        """Bring the listing of *target_path* into the cache (thread-safe)."""
+        self._get_listing(os.path.realpath(target_path), allow_stream=False)
+
+    def _get_git_ignored_items(
+        self, real_target: str, entries: List[ListingEntry]
+    ) -> Set[str]:
+        repo_root = self._get_git_repo_root(real_target)
+        if not repo_root or not entries:
+            return set()
 
-        repo_root = result.stdout.strip() or None
-        self._git_repo_cache[target_path] = repo_root
-        return repo_root
+        if real_target == repo_root:
+            dir_rel = ""
+            prefix = ""
+        else:
+            dir_rel = real_target[len(repo_root) :].lstrip(os.sep).replace(os.sep, "/")
+            prefix = dir_rel + "/"
+
+        matcher = self._get_gitignore_matcher(repo_root)
+        # git sees a symlink to a directory as a file, so ``dir/`` rules skip it.
+        ignored = matcher.ignored_names(
+            dir_rel,
+            ((entry.name, entry.is_dir and not entry.is_symlink()) for entry in entries),
+        )
+        if ignored is not None:
+            return ignored
+
+        queries = [prefix + entry.name for entry in entries]
+        if dir_rel:
+            queries.append(dir_rel)
+        answers = self._get_ignore_process(repo_root).ignored(
+            queries, self._ignore_files_for(repo_root, dir_rel)
+        )
+        # Entering an ignored directory shows its contents, as before; git
+        # would otherwise report every child as ignored too.
+        if dir_rel and answers.get(dir_rel):
+            return set()
+
+        return {entry.name for entry in entries if answers.get(prefix + entry.name)}
+
+    def _get_gitignore_matcher(self, repo_root: str) -> GitignoreMatcher:
+        with self._lock:
+            matcher = self._gitignore_matchers.get(repo_root)
+            if matcher is not None:
+                self._gitignore_matchers.move_to_end(repo_root)
+                return matcher
+            matcher = GitignoreMatcher(repo_root)
+            self._gitignore_matchers[repo_root] = matcher
+            while len(self._gitignore_matchers) > self.MAX_IGNORE_MATCHERS:
+                self._gitignore_matchers.popitem(last=False)
+            return matcher
+
+    def _get_ignore_process(self, repo_root: str) -> CheckIgnoreProcess:
+        evicted: List[CheckIgnoreProcess] = []
+        with self._lock:
+            process = self._git_ignore_procs.get(repo_root)
+            if process is not None:
+                self._git_ignore_procs.move_to_end(repo_root)
+                return process
+            process = CheckIgnoreProcess(repo_root)
+            self._git_ignore_procs[repo_root] = process
+            while len(self._git_ignore_procs) > self.MAX_IGNORE_PROCESSES:
+                evicted.append(self._git_ignore_procs.popitem(last=False)[1])
+        for old in evicted:
+            old.close()
+        return process
+
+    @staticmethod
+    def _ignore_files_for(repo_root: str, dir_rel: str) -> List[str]:
+        """Files whose changes can alter ignore answers under *dir_rel*."""
+        # Worktrees and submodules keep a ``.git`` file pointing elsewhere.
+        dirs = resolve_git_dirs(repo_root)
+        if dirs is None:
+            dot_git = os.path.join(repo_root, ".git")
+            dirs = (dot_git, dot_git)
+        git_dir, common_dir = dirs
+        # Tracked paths are never reported as ignored, so the index counts too.
+        files = [
+            os.path.join(git_dir, "index"),
+            os.path.join(common_dir, "info", "exclude"),
+        ]
+        current = repo_root
+        files.append(os.path.join(current, ".gitignore"))
+        for part in dir_rel.split("/") if dir_rel else ():
+            current = os.path.join(current, part)
+            files.append(os.path.join(current, ".gitignore"))
+        return files
+
+    def _get_git_repo_root(self, target_path: str) -> Optional[str]:
+        return self._git_roots.find(target_path)
 
     def _normalize_pattern(self, pattern: str) -> str:
         pattern = pattern.strip()
@@ -207,8 +580,10 @@ class DirectoryManager:
         parts = [part.strip() for part in raw.split(",")]
         return [part for part in parts if part]
 
-    def get_filtered_items(self):
-        all_items = self.get_items()
+    def get_filtered_items(
+        self, *, record: Optional[List[Tuple[str, Optional[int]]]] = None
+    ):
+        all_items = self.list_directory(self.current_path, record=record)
 
         if not self.filter_pattern:
             return all_items
@@ -233,15 +608,15 @@ class DirectoryManager:
         return [
             item
             for item in all_items
-            if any(fnmatch.fnmatch(item[0].lower(), pat) for pat in lowered)
+            if any(fnmatch.fnmatch(item.name.lower(), pat) for pat in lowered)
         ]
 
     def set_sort_mode(self, mode: str):
         if mode in {"alpha", "mtime_asc", "mtime_desc"}:
-            if self.sort_mode == mode:
-                return
             self.sort_mode = mode
-            self.refresh_cache()
+            if mode != "alpha":
+                self.mtime_epoch += 1
+            self.generation += 1
 
     def set_sort_mode_for_path(self, path: str, mode: str):
         if mode not in {"alpha", "mtime_asc", "mtime_desc"}:
@@ -250,34 +625,47 @@ class DirectoryManager:
             return
         real_path = os.path.realpath(path)
         self.sort_map[real_path] = mode
-        self._cache.pop(real_path, None)
+        if mode != "alpha":
+            self.mtime_epoch += 1
+        self.generation += 1
 
     def refresh_cache(self, path: Optional[str] = None):
+        """Force the next access to re-read *path* (or every listing).
+
+        Listings already revalidate against the directory stamp; this covers
+        filesystems with coarse mtimes where a change can keep the same stamp.
+        Repository roots found for *path* are forgotten as well, so a
+        ``git init`` or a removed ``.git`` there is noticed.
+        """
         if path:
-            real = os.path.realpath(path)
-            self._cache.pop(real, None)
+            real_target = os.path.realpath(path)
+            self._git_roots.forget(real_target)
+            self._discard_listing(real_target)
         else:
-            self._cache.clear()
-        self._git_repo_cache.clear()
-        self._git_ignored_cache.clear()
-
-    def _alpha_sort_key(self, entry):
-        name, is_dir = entry
-        hidden = name.startswith(".")
-        if hidden:
-            group = 2 if is_dir else 3
+            self._git_roots.forget()
+            with self._lock:
+                for real_target in list(self._streams):
+                    self._cancel_stream_locked(real_target)
+                self._cache.clear()
+
+    @staticmethod
+    def _alpha_sort_key(entry: ListingEntry):
+        if entry.name.startswith("."):
+            group = 2 if entry.is_dir else 3
         else:
-            group = 0 if is_dir else 1
-        return (group, name.lower())
-
-    def _mtime_sort_key_factory(self, base_path: str):
-        def sorter(entry):
-            name, _ = entry
-            full_path = os.path.join(base_path, name)
-            try:
-                mtime = os.path.getmtime(full_path)
-            except Exception:
-                mtime = 0
-            return (mtime, name.lower())
-
-        return sorter
+            group = 0 if entry.is_dir else 1
+        return (group, entry.name.lower())
+
+    @staticmethod
+    def _mtime_sort_key(entry: ListingEntry):
+        return (entry.mtime(), entry.name.lower())
+
+    def close(self) -> None:
+        """Stop listing streams and ``git check-ignore`` coprocesses."""
+        with self._lock:
+            for real_target in list(self._streams):
+                self._cancel_stream_locked(real_target)
+            processes = list(self._git_ignore_procs.values())
+            self._git_ignore_procs.clear()
+        for process in processes:
+            process.close()
@@ -0,0 +1,237 @@
+"""Lazy flattened view of the current directory and its inline expansions."""
+
+from __future__ import annotations
+
+import os
+from bisect import bisect_left, bisect_right
+from collections.abc import Sequence
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple
+
+Row = Tuple[str, bool, str, int]
+
+
+class DirNode:
+    """One listed directory whose rows appear at ``depth`` in the view.
+
+    ``children`` maps the index of an expanded entry to its own node. Nodes
+    are never mutated once built; expanding or collapsing copies the nodes on
+    the path to the root and shares every other subtree, so row sequences
+    already handed out keep their contents.
+    """
+
+    __slots__ = (
+        "path",
+        "depth",
+        "entries",
+        "children",
+        "size",
+        "_positions",
+        "_starts",
+        "_names",
+    )
+
+    def __init__(
+        self,
+        path: str,
+        depth: int,
+        entries: list,
+        children: Optional[Dict[int, "DirNode"]] = None,
+    ):
+        self.path = path
+        self.depth = depth
+        self.entries = entries
+        self.children: Dict[int, DirNode] = children or {}
+        self._positions: List[int] = sorted(self.children)
+        # _starts[k] is the row, relative to this node, of entry _positions[k].
+        self._starts: List[int] = []
+        nested = 0
+        for position in self._positions:
+            self._starts.append(position + nested)
+            nested += self.children[position].size
+        self.size = len(entries) + nested
+        self._names: Optional[Dict[str, int]] = None
+
+    def row_of(self, position: int) -> int:
+        """Row, relative to this node, of the entry at *position*."""
+        k = bisect_left(self._positions, position)
+        if k == len(self._positions):
+            nested = self.size - len(self.entries)
+        else:
+            nested = self._starts[k] - self._positions[k]
+        return position + nested
+
+    def locate(self, row: int) -> Tuple[int, Optional["DirNode"], int]:
+        """Resolve *row* to ``(position, child, child_row)``.
+
+        When the row lies inside an expanded child, ``child`` is that node and
+        ``child_row`` the row relative to it; otherwise ``child`` is ``None``
+        and ``position`` is the entry shown on the row.
+        """
+        k = bisect_right(self._starts, row) - 1
+        if k < 0:
+            return row, None, 0
+        position, start = self._positions[k], self._starts[k]
+        if row == start:
+            return position, None, 0
+        child = self.children[position]
+        if row - start <= child.size:
+            return position, child, row - start - 1
+        return position + row - start - child.size, None, 0
+
+    def position_of(self, name: str) -> Optional[int]:
+        if self._names is None:
+            self._names = {entry.name: idx for idx, entry in enumerate(self.entries)}
+        return self._names.get(name)
+
+    def row_tuple(self, position: int) -> Row:
+        entry = self.entries[position]
+        return (
+            entry.name,
+            entry.is_dir,
+            os.path.join(self.path, entry.name),
+            self.depth,
+        )
+
+    def with_child(self, position: int, child: Optional["DirNode"]) -> "DirNode":
+        children = dict(self.children)
+        if child is None:
+            children.pop(position, None)
+        else:
+            children[position] = child
+        return DirNode(self.path, self.depth, self.entries, children)
+
+    def iter_rows(self, start: int = 0) -> Iterator[Row]:
+        for position in range(start, len(self.entries)):
+            yield self.row_tuple(position)
+            child = self.children.get(position)
+            if child is not None:
+                yield from child.iter_rows()
+
+
+class DisplayRows(Sequence):
+    """Read-only ``(name, is_dir, path, depth)`` rows backed by a ``DirNode``.
+
+    Rows are built on access: ``len`` is O(1) and a row lookup costs
+    O(depth × log expanded-siblings), so drawing a viewport touches only the
+    rows on screen however large the expansion is. Slices return lists.
+    """
+
+    __slots__ = ("root",)
+
+    def __init__(self, root: DirNode):
+        self.root = root
+
+    def __len__(self) -> int:
+        return self.root.size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.root.size)
+            if step != 1:
+                return [self._row(i) for i in range(start, stop, step)]
+            if start >= stop:
+                return []
+            return list(islice(self._iter_from(start), stop - start))
+        if index < 0:
+            index += self.root.size
+        if not 0 <= index < self.root.size:
+            raise IndexError("display row out of range")
+        return self._row(index)
+
+    def __iter__(self) -> Iterator[Row]:
+        return self.root.iter_rows()
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (DisplayRows, list, tuple)):
+            return len(self) == len(other) and all(
+                a == b for a, b in zip(self, other)
+            )
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"DisplayRows({self.root.path!r}, {len(self)} rows)"
+
+    def _trail(self, index: int) -> Tuple[List[Tuple[DirNode, int]], int]:
+        """Nodes from the root down to the one owning *index*.
+
+        Returns ``([(node, position), ...], offset)``: each pair names the
+        expanded entry leading to the next node, the last pair the entry on
+        the row, and ``offset`` is the global row of the last node's first
+        row.
+        """
+        trail: List[Tuple[DirNode, int]] = []
+        node, row, offset = self.root, index, 0
+        while True:
+            position, child, child_row = node.locate(row)
+            trail.append((node, position))
+            if child is None:
+                return trail, offset
+            offset += row - child_row
+            node, row = child, child_row
+
+    def _iter_from(self, index: int) -> Iterator[Row]:
+        trail, _offset = self._trail(index)
+        node, position = trail.pop()
+        yield from node.iter_rows(position)
+        while trail:
+            node, position = trail.pop()
+            yield from node.iter_rows(position + 1)
+
+    def _row(self, index: int) -> Row:
+        trail, _offset = self._trail(index)
+        node, position = trail[-1]
+        return node.row_tuple(position)
+
+    def index_of(self, path: str) -> Optional[int]:
+        """Row showing *path*, or ``None`` when it is not visible."""
+        prefix = self.root.path
+        if not prefix.endswith(os.sep):
+            prefix += os.sep
+        if not path.startswith(prefix) or len(path) == len(prefix):
+            return None
+        node, offset = self.root, 0
+        parts = path[len(prefix) :].split(os.sep)
+        for depth, name in enumerate(parts):
+            position = node.position_of(name)
+            if position is None:
+                return None
+            row = offset + node.row_of(position)
+            if depth == len(parts) - 1:
+                return row
+            child = node.children.get(position)
+            if child is None:
+                return None
+            node, offset = child, row + 1
+        return None
+
+    def subtree_end(self, index: int) -> int:
+        """Index just past the rows nested under row *index*."""
+        trail, _offset = self._trail(index)
+        node, position = trail[-1]
+        child = node.children.get(position)
+        return index + 1 + (child.size if child is not None else 0)
+
+    def parent_index(self, index: int) -> Optional[int]:
+        """Row of the expanded directory containing row *index*, if any."""
+        trail, offset = self._trail(index)
+        return offset - 1 if len(trail) > 1 else None
+
+    def _replace(self, index: int, child: Optional[DirNode]) -> "DisplayRows":
+        trail, _offset = self._trail(index)
+        node, position = trail.pop()
+        replacement = node.with_child(position, child)
+        while trail:
+            parent, parent_position = trail.pop()
+            replacement = parent.with_child(parent_position, replacement)
+        return DisplayRows(replacement)
+
+    def with_expanded(self, index: int, child: DirNode) -> "DisplayRows":
+        """Rows with *child* shown under row *index*; ``self`` is unchanged."""
+        return self._replace(index, child)
+
+    def with_collapsed(self, index: int) -> "DisplayRows":
+        """Rows with the subtree under row *index* removed."""
+        return self._replace(index, None)
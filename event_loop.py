@@ -0,0 +1,107 @@
+"""Blocking wait on terminal input, worker wake-ups and terminal resizes."""
+
+from __future__ import annotations
+
+import os
+import selectors
+import signal
+import threading
+from typing import Optional
+
+
+class EventLoop:
+    """Sleep until there is something for the UI thread to do.
+
+    The terminal's input descriptor and the read end of a self-pipe are
+    registered with a ``selectors`` selector. Background workers call
+    ``wake`` to interrupt ``wait``; calls made on the thread that owns the
+    loop are ignored because that thread re-checks its state before blocking
+    anyway. ``SIGWINCH`` is routed through the same pipe so a resize wakes an
+    idle loop; ``take_resize`` reports it once.
+    """
+
+    def __init__(self, input_fd: int):
+        self.input_fd = input_fd
+        self._owner = threading.get_ident()
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        os.set_blocking(self._wake_w, False)
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(input_fd, selectors.EVENT_READ, "input")
+        self._selector.register(self._wake_r, selectors.EVENT_READ, "wake")
+        self._resized = False
+        self._previous_winch = None
+        self._winch_installed = False
+
+    def wake(self) -> None:
+        if threading.get_ident() == self._owner or self._wake_w < 0:
+            return
+        self._write_wake()
+
+    def _write_wake(self) -> None:
+        try:
+            os.write(self._wake_w, b"\0")
+        except (BlockingIOError, OSError):
+            # A full pipe already guarantees the next wait returns.
+            pass
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block up to *timeout* seconds (forever when ``None``).
+
+        Returns whether terminal input is ready.
+        """
+        input_ready = False
+        try:
+            events = self._selector.select(timeout)
+        except (OSError, ValueError):
+            return False
+        for key, _mask in events:
+            if key.data == "input":
+                input_ready = True
+            else:
+                self._drain_wake()
+        return input_ready
+
+    def _drain_wake(self) -> None:
+        try:
+            while os.read(self._wake_r, 4096):
+                pass
+        except (BlockingIOError, OSError):
+            pass
+
+    def install_resize_handler(self) -> None:
+        """Wake the loop on ``SIGWINCH`` (main thread only)."""
+        if self._winch_installed or not hasattr(signal, "SIGWINCH"):
+            return
+        if threading.current_thread() is not threading.main_thread():
+            return
+        self._previous_winch = signal.getsignal(signal.SIGWINCH)
+        signal.signal(signal.SIGWINCH, self._on_winch)
+        self._winch_installed = True
+
+    def _on_winch(self, _signum, _frame) -> None:
+        self._resized = True
+        self._write_wake()
+
+    def take_resize(self) -> bool:
+        resized, self._resized = self._resized, False
+        return resized
+
+    def close(self) -> None:
+        if self._winch_installed:
+            previous = self._previous_winch
+            # ``None`` means a handler installed outside Python (ncurses).
+            signal.signal(
+                signal.SIGWINCH, previous if previous is not None else signal.SIG_DFL
+            )
+            self._winch_installed = False
+        try:
+            self._selector.close()
+        except Exception:
+            pass
+        for fd in (self._wake_r, self._wake_w):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+        self._wake_r = self._wake_w = -1
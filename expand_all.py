@@ -0,0 +1,130 @@
+"""Background breadth-first expansion for ``,xar``."""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, List, Optional, Set, Tuple
+
+
+class ExpandAllJob:
+    """Expand every directory below *root* on a worker thread.
+
+    Directories are visited breadth first, so the rows nearest the top of the
+    view are expanded first, down to ``max_depth`` levels and at most
+    ``max_nodes`` directories. A directory is only handed out once its own
+    listing is cached, which keeps the UI thread from scanning when it splices
+    the expansion in. Paths are published in batches every
+    ``PUBLISH_SECONDS``; ``on_progress`` is called from the worker after each
+    batch and once more when the job ends.
+    """
+
+    PUBLISH_SECONDS = 0.1
+
+    def __init__(
+        self,
+        dir_manager,
+        root: str,
+        *,
+        max_depth: int,
+        max_nodes: int,
+        on_progress: Optional[Callable[[], None]] = None,
+    ):
+        self.dir_manager = dir_manager
+        self.root = root
+        self.max_depth = max(1, max_depth)
+        self.max_nodes = max(1, max_nodes)
+        self.on_progress = on_progress
+        self.expanded = 0
+        self.limit_reached = False
+        self.cancelled = False
+        self.done_event = threading.Event()
+        self._pending: List[str] = []
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._run, name="o-expand-all", daemon=True
+        )
+        self._thread.start()
+
+    def cancel(self) -> None:
+        self.cancelled = True
+        self._cancel.set()
+
+    def is_running(self) -> bool:
+        return not self.done_event.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self.done_event.wait(timeout)
+
+    def take_expanded(self) -> List[str]:
+        """Return the paths published since the last call."""
+        with self._lock:
+            paths, self._pending = self._pending, []
+        return paths
+
+    def _publish(self, batch: List[str]) -> None:
+        with self._lock:
+            self._pending.extend(batch)
+            self.expanded += len(batch)
+        batch.clear()
+        self._notify()
+
+    def _notify(self) -> None:
+        if self.on_progress is not None:
+            try:
+                self.on_progress()
+            except Exception:
+                pass
+
+    def _run(self) -> None:
+        try:
+            self._walk()
+        finally:
+            self.done_event.set()
+            self._notify()
+
+    def _walk(self) -> None:
+        queue: Deque[Tuple[str, int]] = deque([(self.root, 0)])
+        visited: Set[str] = {os.path.realpath(self.root)}
+        batch: List[str] = []
+        count = 0
+        last_publish = time.monotonic()
+
+        while queue and not self._cancel.is_set():
+            path, depth = queue.popleft()
+            try:
+                entries = self.dir_manager.list_directory(path, allow_stream=False)
+            except Exception:
+                continue
+            if depth > 0:
+                batch.append(path)
+                count += 1
+            if depth < self.max_depth:
+                for entry in entries:
+                    if not entry.is_dir:
+                        continue
+                    child = os.path.join(path, entry.name)
+                    real_child = os.path.realpath(child)
+                    # Symlinked directories can loop back on an ancestor.
+                    if real_child in visited:
+                        continue
+                    visited.add(real_child)
+                    queue.append((child, depth + 1))
+            if count >= self.max_nodes:
+                self.limit_reached = bool(queue)
+                break
+            now = time.monotonic()
+            if batch and now - last_publish >= self.PUBLISH_SECONDS:
+                self._publish(batch)
+                last_publish = now
+
+        if batch and not self._cancel.is_set():
+            self._publish(batch)
@@ -9,7 +9,7 @@ import sys
 import threading
 import time
 import zipfile
-from typing import Optional, cast, Any, List, Tuple
+from typing import Callable, Optional, cast, Any, List, Tuple
 
 try:
     import termios
@@ -17,6 +17,8 @@ except ImportError:  # pragma: no cover
     termios = None  # type: ignore[assignment]
 
 from config import HandlerSpec
+from frame_scheduler import set_focus_reporting
+from line_decoder import LineDecoder
 
 
 MEDIA_AUDIO_EXTENSIONS = {
@@ -100,7 +102,7 @@ class ExecutionJob:
         self.command = command
         self.display = display
         self.mode = mode
-        self.process: Optional[subprocess.Popen[str]] = None
+        self.process: Optional[subprocess.Popen[bytes]] = None
         self.thread: Optional[threading.Thread] = None
         self.cancelled = False
         self.exit_code: Optional[int] = None
@@ -112,7 +114,7 @@ class ExecutionJob:
             return False
         return self.process.poll() is None
 
-    def mark_process(self, process: subprocess.Popen[str]) -> None:
+    def mark_process(self, process: subprocess.Popen[bytes]) -> None:
         self.process = process
 
     def mark_finished(self, exit_code: Optional[int]) -> None:
@@ -143,6 +145,14 @@ class ExecutionJob:
 
 
 class FileActionService:
+    # Execution output is read in chunks of this size and handed to the
+    # popup in batches, roughly once per frame.
+    OUTPUT_READ_BYTES = 64 * 1024
+    OUTPUT_PUBLISH_SECONDS = 0.04
+    # After the command exits, output still arriving is read for at most
+    # this long; a background child may keep the pipes open indefinitely.
+    EXIT_DRAIN_SECONDS = 0.25
+
     def __init__(self, navigator):
         self.nav = navigator
 
@@ -267,6 +277,7 @@ class FileActionService:
         stdscr.clrtoeol()
 
         leaveok_changed = False
+        focus_reporting = set_focus_reporting(False)
         try:
             stdscr.timeout(-1)
             try:
@@ -343,6 +354,7 @@ class FileActionService:
         except Exception:
             text = ""
         finally:
+            set_focus_reporting(focus_reporting)
             stdscr.timeout(40)
             if leaveok_changed:
                 try:
@@ -385,6 +397,7 @@ class FileActionService:
         except curses.error:
             pass
 
+        focus_reporting = set_focus_reporting(False)
         try:
             stdscr.timeout(-1)
             stdscr.refresh()
@@ -405,6 +418,7 @@ class FileActionService:
         except Exception:
             return None
         finally:
+            set_focus_reporting(focus_reporting)
             stdscr.timeout(40)
             self.nav.need_redraw = True
 
@@ -555,6 +569,7 @@ class FileActionService:
     def _open_with_vim(self, filepath: str) -> bool:
         flush_terminal_input()
         stdscr_opt = self.nav.renderer.stdscr
+        focus_reporting = set_focus_reporting(False)
         if stdscr_opt is not None:
             try:
                 curses.def_prog_mode()
@@ -574,6 +589,7 @@ class FileActionService:
                 except Exception:
                     pass
         finally:
+            set_focus_reporting(focus_reporting)
             if stdscr_opt is not None:
                 try:
                     curses.reset_prog_mode()
@@ -707,6 +723,7 @@ class FileActionService:
 
     def _run_internal_handler(self, handlers: List[List[str]], filepath: str) -> bool:
         stdscr_opt = getattr(self.nav.renderer, "stdscr", None)
+        focus_reporting = set_focus_reporting(False)
 
         if stdscr_opt is not None:
             try:
@@ -745,6 +762,7 @@ class FileActionService:
                     succeeded = True
                     break
         finally:
+            set_focus_reporting(focus_reporting)
             if stdscr_opt is not None:
                 try:
                     curses.reset_prog_mode()
@@ -831,16 +849,14 @@ class FileActionService:
         job = ExecutionJob(filepath, command, display, mode_value)
 
         try:
+            # Raw byte pipes: the monitor decodes output itself.
             process = subprocess.Popen(
                 command,
                 cwd=cwd,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
                 stdin=subprocess.DEVNULL,
-                text=True,
-                encoding="utf-8",
-                errors="replace",
-                bufsize=1,
+                bufsize=0,
             )
         except FileNotFoundError:
             self.nav.status_message = f"Executor not found: {command[0]}"
@@ -929,70 +945,85 @@ class FileActionService:
         return tokens
 
     def _monitor_execution_job(self, job: ExecutionJob) -> None:
+        """Pump the job's stdout and stderr into the command popup.
+
+        Pipes are read in ``OUTPUT_READ_BYTES`` chunks with non-blocking
+        ``os.read`` and split into lines by a ``LineDecoder``, so a chatty
+        process costs one syscall per chunk rather than per line and a
+        partial line never blocks the reader. Lines are published in batches
+        at most every ``OUTPUT_PUBLISH_SECONDS``, about once per frame.
+        """
         process = job.process
         if process is None:
             return
 
         selector = selectors.DefaultSelector()
-
-        def register_stream(stream, label):
+        decoders: dict[int, Tuple[str, LineDecoder]] = {}
+        for label, stream in (("stdout", process.stdout), ("stderr", process.stderr)):
             if stream is None:
-                return
+                continue
             try:
-                selector.register(stream, selectors.EVENT_READ, data=label)
+                fd = stream.fileno()
+                os.set_blocking(fd, False)
+                selector.register(fd, selectors.EVENT_READ, data=label)
             except Exception:
-                pass
-
-        register_stream(process.stdout, "stdout")
-        register_stream(process.stderr, "stderr")
+                continue
+            decoders[fd] = (label, LineDecoder())
+
+        pending: List[str] = []
+        last_publish = time.monotonic()
+        exited_at: Optional[float] = None
+
+        def publish() -> None:
+            nonlocal last_publish
+            if pending:
+                self.nav.append_command_popup_lines(list(pending))
+                pending.clear()
+            last_publish = time.monotonic()
+
+        def pump(fd: int) -> bool:
+            """Read what *fd* has buffered; return False once it hit EOF."""
+            label, decoder = decoders[fd]
+            try:
+                data = os.read(fd, self.OUTPUT_READ_BYTES)
+            except BlockingIOError:
+                return True
+            except OSError:
+                data = b""
+            lines = decoder.feed(data) if data else decoder.finish()
+            pending.extend(self._format_stream_line(label, line) for line in lines)
+            return bool(data)
 
         try:
-            while True:
-                if process.poll() is not None and not selector.get_map():
-                    break
-
-                events = selector.select(timeout=0.1)
-
-                if not events:
-                    if process.poll() is not None:
-                        break
-                    continue
-
-                for key, _ in events:
-                    label = key.data
-                    stream = cast(Any, key.fileobj)
-                    try:
-                        chunk = stream.readline()  # type: ignore[attr-defined]
-                    except Exception:
-                        chunk = ""
-
-                    if not chunk:
-                        try:
-                            selector.unregister(stream)
-                        except Exception:
-                            pass
-                        continue
-
-                    line = chunk.rstrip("\n")
-                    formatted = self._format_stream_line(label, line)
-                    self.nav.append_command_popup_lines([formatted])
-
-            # Drain remaining buffered output after process finishes
-            for label, stream in (
-                ("stdout", process.stdout),
-                ("stderr", process.stderr),
-            ):
-                if stream is None:
-                    continue
-                try:
-                    remaining = cast(Any, stream).read()  # type: ignore[attr-defined]
-                except Exception:
-                    remaining = ""
-                if not remaining:
-                    continue
-                for raw_line in remaining.splitlines():
-                    formatted = self._format_stream_line(label, raw_line.rstrip("\n"))
-                    self.nav.append_command_popup_lines([formatted])
+            while selector.get_map():
+                if pending:
+                    elapsed = time.monotonic() - last_publish
+                    timeout = max(0.0, self.OUTPUT_PUBLISH_SECONDS - elapsed)
+                else:
+                    timeout = 0.1
+                events = selector.select(timeout=timeout)
+
+                self._pump_ready(selector, events, pump)
+
+                if time.monotonic() - last_publish >= self.OUTPUT_PUBLISH_SECONDS:
+                    publish()
+
+                if exited_at is None and process.poll() is not None:
+                    exited_at = time.monotonic()
+                if exited_at is not None and (
+                    not events
+                    or time.monotonic() - exited_at >= self.EXIT_DRAIN_SECONDS
+                ):
+                    # Exited, and the pipes went quiet or a background child
+                    # kept writing past the drain deadline: stop reading.
+                    for fd in list(selector.get_map()):
+                        label, decoder = decoders[fd]
+                        pending.extend(
+                            self._format_stream_line(label, line)
+                            for line in decoder.finish()
+                        )
+                        selector.unregister(fd)
+            publish()
         finally:
             for stream in (process.stdout, process.stderr):
                 if stream and not stream.closed:
@@ -1032,6 +1063,15 @@ class FileActionService:
 
         self.nav.update_command_popup_header(header)
 
+    @staticmethod
+    def _pump_ready(selector, events, pump: Callable[[int], bool]) -> bool:
+        """Run *pump* on each ready descriptor; drop those at EOF."""
+        for key, _ in events:
+            fd = cast(int, key.fd)
+            if not pump(fd):
+                selector.unregister(fd)
+        return bool(events)
+
     @staticmethod
     def _format_stream_line(channel: str, text: str) -> str:
         if channel == "stderr":
@@ -0,0 +1,128 @@
+"""Frame pacing for the animated Matrix view."""
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+from typing import Callable, Optional
+
+# xterm focus reporting: the terminal sends ESC [ I / ESC [ O on focus changes.
+FOCUS_REPORTING_ON = "\x1b[?1004h"
+FOCUS_REPORTING_OFF = "\x1b[?1004l"
+FOCUS_IN = ord("I")
+FOCUS_OUT = ord("O")
+
+_focus_reporting = False
+
+
+def set_focus_reporting(enabled: bool) -> bool:
+    """Turn terminal focus reporting on or off; return the previous state.
+
+    Callers that hand the terminal to another program switch it off first
+    and restore the returned state afterwards.
+    """
+    global _focus_reporting
+    previous = _focus_reporting
+    if enabled == previous:
+        return previous
+    stream = sys.__stdout__
+    try:
+        if stream is None or not os.isatty(stream.fileno()):
+            return previous
+        stream.write(FOCUS_REPORTING_ON if enabled else FOCUS_REPORTING_OFF)
+        stream.flush()
+    except (AttributeError, OSError, ValueError):
+        return previous
+    _focus_reporting = enabled
+    return previous
+
+
+class FrameScheduler:
+    """Decide when the Matrix view draws its next frame.
+
+    Frames run at ``fps`` while keys arrive, fall to ``idle_fps`` once
+    ``idle_seconds`` pass without input and stop while the terminal reports
+    that it lost focus. The cost of each frame is smoothed, and the interval
+    is stretched so drawing uses at most ``cpu_budget`` of one core; stream
+    heads move by elapsed time, so a slower rate drops frames rather than
+    slowing the rain.
+    """
+
+    SMOOTHING = 0.2
+
+    def __init__(
+        self,
+        fps: int = 25,
+        idle_fps: int = 2,
+        idle_seconds: float = 30.0,
+        cpu_budget: float = 0.1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.fps = max(1, fps)
+        self.idle_fps = max(1, min(idle_fps, self.fps))
+        self.idle_seconds = max(0.0, idle_seconds)
+        self.cpu_budget = min(1.0, max(0.01, cpu_budget))
+        self.clock = clock
+        self.focused = True
+        self.frame_cost = 0.0
+        self._last_input = clock()
+        self._next_frame = 0.0
+
+    @classmethod
+    def from_config(cls, config, **kwargs) -> "FrameScheduler":
+        defaults = cls()
+        return cls(
+            fps=getattr(config, "matrix_fps", defaults.fps),
+            idle_fps=getattr(config, "matrix_idle_fps", defaults.idle_fps),
+            idle_seconds=getattr(config, "matrix_idle_seconds", defaults.idle_seconds),
+            cpu_budget=getattr(
+                config, "matrix_cpu_budget", defaults.cpu_budget * 100
+            )
+            / 100.0,
+            **kwargs,
+        )
+
+    def note_input(self) -> None:
+        """Record user activity; a key press also implies focus."""
+        self._last_input = self.clock()
+        self.focused = True
+
+    def set_focus(self, focused: bool) -> None:
+        self.focused = focused
+        if focused:
+            self._last_input = self.clock()
+            self._next_frame = 0.0
+
+    def is_idle(self, now: Optional[float] = None) -> bool:
+        now = self.clock() if now is None else now
+        return now - self._last_input >= self.idle_seconds
+
+    def interval(self, now: Optional[float] = None) -> Optional[float]:
+        """Seconds between frames, or ``None`` while animation is paused."""
+        if not self.focused:
+            return None
+        rate = self.idle_fps if self.is_idle(now) else self.fps
+        return max(1.0 / rate, self.frame_cost / self.cpu_budget)
+
+    def frame_due(self, now: Optional[float] = None) -> bool:
+        now = self.clock() if now is None else now
+        return self.interval(now) is not None and now >= self._next_frame
+
+    def timeout(self, now: Optional[float] = None) -> Optional[float]:
+        """How long the event loop may sleep before the next frame."""
+        now = self.clock() if now is None else now
+        interval = self.interval(now)
+        if interval is None:
+            return None
+        return max(0.0, self._next_frame - now)
+
+    def record_frame(self, started: float, finished: float) -> None:
+        cost = max(0.0, finished - started)
+        if self.frame_cost == 0.0:
+            self.frame_cost = cost
+        else:
+            self.frame_cost += self.SMOOTHING * (cost - self.frame_cost)
+        interval = self.interval(finished)
+        if interval is not None:
+            self._next_frame = started + interval
@@ -0,0 +1,293 @@
+"""Background watcher that reports external changes to cached directories."""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from directory_manager import stat_stamp
+
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_EXCL_UNLINK = 0x04000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, "O_CLOEXEC", 0o2000000)
+
+# Membership and type changes only: content writes inside a directory do not
+# alter its listing, and watching them would flood the queue during builds.
+WATCH_MASK = (
+    IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+    | IN_MOVE_SELF
+    | IN_ONLYDIR
+    | IN_EXCL_UNLINK
+)
+
+_EVENT_HEADER = struct.Struct("iIII")
+# Errors meaning "the kernel will not give us more watches".
+_LIMIT_ERRNOS = {errno.ENOSPC, errno.ENOMEM, errno.EMFILE}
+
+
+class _Inotify:
+    """Thin ctypes binding over the libc inotify calls."""
+
+    def __init__(self, libc, fd: int):
+        self._libc = libc
+        self.fd = fd
+
+    @classmethod
+    def create(cls) -> Optional["_Inotify"]:
+        try:
+            libc_name = ctypes.util.find_library("c") or "libc.so.6"
+            libc = ctypes.CDLL(libc_name, use_errno=True)
+            init1 = libc.inotify_init1
+            libc.inotify_add_watch.argtypes = [
+                ctypes.c_int,
+                ctypes.c_char_p,
+                ctypes.c_uint32,
+            ]
+            libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        except (OSError, AttributeError):
+            return None
+        fd = init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            return None
+        return cls(libc, fd)
+
+    def add_watch(self, path: str) -> Tuple[int, int]:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            return -1, ctypes.get_errno()
+        return wd, 0
+
+    def rm_watch(self, wd: int) -> None:
+        self._libc.inotify_rm_watch(self.fd, wd)
+
+    def read_events(self) -> Iterable[Tuple[int, int]]:
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        except OSError:
+            return []
+        events = []
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, name_len = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size + name_len
+            events.append((wd, mask))
+        return events
+
+    def close(self) -> None:
+        try:
+            os.close(self.fd)
+        except OSError:
+            pass
+
+
+class DirectoryWatcher:
+    """Report external changes to recently listed directories.
+
+    Directories are watched with inotify through ``ctypes``. Watches are kept
+    in LRU order and capped at ``max_watches``; when inotify is unavailable or
+    the kernel refuses a watch, directories fall back to being polled by
+    their ``(st_dev, st_ino, st_mtime_ns)`` stamp. ``on_change`` is invoked
+    from the watcher thread with the real path of each changed directory.
+    """
+
+    def __init__(
+        self,
+        on_change: Callable[[str], None],
+        *,
+        max_watches: int = 512,
+        max_polled: int = 128,
+        poll_interval: float = 1.0,
+    ):
+        self.on_change = on_change
+        self.max_watches = max(1, max_watches)
+        self.max_polled = max(1, max_polled)
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._watches: "OrderedDict[str, int]" = OrderedDict()
+        self._paths_by_wd: Dict[int, str] = {}
+        self._polled: "OrderedDict[str, Optional[Tuple[int, int, int]]]" = (
+            OrderedDict()
+        )
+        self._inotify: Optional[_Inotify] = None
+        self._wake_r = -1
+        self._wake_w = -1
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    @property
+    def uses_inotify(self) -> bool:
+        return self._inotify is not None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._inotify = _Inotify.create()
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="o-fs-watcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        thread = self._thread
+        if thread is None:
+            return
+        self._stopped.set()
+        self._wake()
+        thread.join(timeout=1.0)
+        self._thread = None
+        with self._lock:
+            self._watches.clear()
+            self._paths_by_wd.clear()
+            self._polled.clear()
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+        for fd in (self._wake_r, self._wake_w):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+        self._wake_r = self._wake_w = -1
+
+    def watch(self, real_path: str) -> None:
+        """Start watching *real_path*, or mark it as most recently used."""
+        if self._thread is None:
+            return
+        with self._lock:
+            if real_path in self._watches:
+                self._watches.move_to_end(real_path)
+                return
+            if real_path in self._polled:
+                self._polled.move_to_end(real_path)
+                return
+            if self._inotify is not None and self._add_inotify_watch(real_path):
+                return
+            start_polling = not self._polled
+            self._polled[real_path] = stat_stamp(real_path)
+            while len(self._polled) > self.max_polled:
+                self._polled.popitem(last=False)
+        if start_polling:
+            self._wake()
+
+    def _add_inotify_watch(self, real_path: str) -> bool:
+        assert self._inotify is not None
+        while len(self._watches) >= self.max_watches:
+            self._evict_oldest_watch()
+        wd, err = self._inotify.add_watch(real_path)
+        if wd < 0:
+            if err in _LIMIT_ERRNOS and self._watches:
+                # Another process holds most of the per-user budget; shrink
+                # ours to what the kernel actually grants.
+                self.max_watches = max(1, len(self._watches))
+            # Other refusals (EACCES, ENOENT, ...) are not retried on every
+            # watch(); the path is polled by its stamp instead.
+            return False
+        # inotify hands back the existing descriptor when the inode is already
+        # watched under another name; keep a single path per descriptor.
+        previous = self._paths_by_wd.get(wd)
+        if previous is not None and previous != real_path:
+            self._watches.pop(previous, None)
+        self._watches[real_path] = wd
+        self._paths_by_wd[wd] = real_path
+        return True
+
+    def _evict_oldest_watch(self) -> None:
+        path, wd = self._watches.popitem(last=False)
+        self._paths_by_wd.pop(wd, None)
+        if self._inotify is not None:
+            self._inotify.rm_watch(wd)
+
+    def _wake(self) -> None:
+        if self._wake_w < 0:
+            return
+        try:
+            os.write(self._wake_w, b"\0")
+        except OSError:
+            pass
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            read_fds = [self._wake_r]
+            if self._inotify is not None:
+                read_fds.append(self._inotify.fd)
+            with self._lock:
+                timeout = self.poll_interval if self._polled else None
+            try:
+                ready, _, _ = select.select(read_fds, [], [], timeout)
+            except (OSError, ValueError):
+                return
+            if self._stopped.is_set():
+                return
+            if self._wake_r in ready:
+                try:
+                    os.read(self._wake_r, 4096)
+                except OSError:
+                    pass
+
+            changed: set[str] = set()
+            if self._inotify is not None and self._inotify.fd in ready:
+                changed.update(self._collect_inotify_changes())
+            changed.update(self._collect_polled_changes())
+            for path in changed:
+                try:
+                    self.on_change(path)
+                except Exception:
+                    pass
+
+    def _collect_inotify_changes(self) -> set[str]:
+        assert self._inotify is not None
+        changed: set[str] = set()
+        for wd, mask in self._inotify.read_events():
+            with self._lock:
+                if mask & IN_Q_OVERFLOW:
+                    changed.update(self._watches)
+                    continue
+                path = self._paths_by_wd.get(wd)
+                if path is None:
+                    continue
+                if mask & IN_IGNORED:
+                    # The kernel dropped the watch (directory deleted/unmounted).
+                    self._paths_by_wd.pop(wd, None)
+                    if self._watches.get(path) == wd:
+                        del self._watches[path]
+            changed.add(path)
+        return changed
+
+    def _collect_polled_changes(self) -> set[str]:
+        changed: set[str] = set()
+        with self._lock:
+            polled = list(self._polled.items())
+        for path, stamp in polled:
+            current = stat_stamp(path)
+            if current == stamp:
+                continue
+            changed.add(path)
+            with self._lock:
+                if path in self._polled:
+                    self._polled[path] = current
+        return changed
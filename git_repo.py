@@ -0,0 +1,879 @@
+"""Git helpers used by DirectoryManager to hide ignored entries."""
+
+from __future__ import annotations
+
+import os
+import re
+import select
+import stat
+import struct
+import subprocess
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from path_trie import PathTrie
+
+FileStamp = Optional[Tuple[int, int, int]]
+
+
+def file_stamp(path: str) -> FileStamp:
+    """Return ``(st_ino, st_mtime_ns, st_size)`` for *path*, or ``None``."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+# Environment that redirects git away from the plain ``<root>/.git`` layout the
+# in-process matcher understands; when any is set, ask git itself.
+_GIT_OVERRIDE_ENV = (
+    "GIT_DIR",
+    "GIT_WORK_TREE",
+    "GIT_INDEX_FILE",
+    "GIT_COMMON_DIR",
+    "GIT_CONFIG",
+    "GIT_CONFIG_GLOBAL",
+    "GIT_CONFIG_SYSTEM",
+    "GIT_CONFIG_COUNT",
+    "GIT_CONFIG_PARAMETERS",
+)
+
+
+def resolve_git_dirs(repo_root: str) -> Optional[Tuple[str, str]]:
+    """Return ``(git_dir, common_dir)`` for the work tree at *repo_root*.
+
+    Handles both a ``.git`` directory and the ``gitdir:`` files used by
+    submodules and linked worktrees.
+    """
+    dot_git = os.path.join(repo_root, ".git")
+    if os.path.isdir(dot_git):
+        git_dir = dot_git
+    else:
+        try:
+            with open(dot_git, "r", encoding="utf-8") as handle:
+                first_line = handle.readline().strip()
+        except (OSError, UnicodeDecodeError):
+            return None
+        if not first_line.startswith("gitdir:"):
+            return None
+        git_dir = first_line[len("gitdir:") :].strip()
+        if not os.path.isabs(git_dir):
+            git_dir = os.path.join(repo_root, git_dir)
+        git_dir = os.path.normpath(git_dir)
+        if not os.path.isdir(git_dir):
+            return None
+
+    common_dir = git_dir
+    try:
+        with open(os.path.join(git_dir, "commondir"), "r", encoding="utf-8") as handle:
+            common = handle.read().strip()
+    except (OSError, UnicodeDecodeError):
+        common = ""
+    if common:
+        if not os.path.isabs(common):
+            common = os.path.join(git_dir, common)
+        common_dir = os.path.normpath(common)
+    return git_dir, common_dir
+
+
+def is_worktree_root(directory: str) -> bool:
+    """Whether *directory* holds a ``.git`` directory or a valid gitfile."""
+    dot_git = os.path.join(directory, ".git")
+    try:
+        st = os.stat(dot_git)
+    except OSError:
+        return False
+    if stat.S_ISDIR(st.st_mode):
+        return os.path.exists(os.path.join(dot_git, "HEAD"))
+    return resolve_git_dirs(directory) is not None
+
+
+def rev_parse_toplevel(path: str) -> Optional[str]:
+    try:
+        result = subprocess.run(
+            ["git", "-C", path, "rev-parse", "--show-toplevel"],
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+    except (FileNotFoundError, OSError):
+        return None
+    if result.returncode != 0:
+        return None
+    return result.stdout.strip() or None
+
+
+class GitRootFinder:
+    """Find the work tree containing a directory by probing for ``.git``.
+
+    Discovery walks upwards the way git does: it stops below any
+    ``GIT_CEILING_DIRECTORIES`` entry and at filesystem boundaries unless
+    ``GIT_DISCOVERY_ACROSS_FILESYSTEM`` is set, and accepts the gitfiles used
+    by submodules and worktrees. Every directory probed is recorded in a
+    ``PathTrie``, so later lookups stop at the deepest known ancestor. With
+    ``GIT_DIR`` set the answer comes from ``git rev-parse`` instead.
+    """
+
+    def __init__(self):
+        # Directory -> work tree root, or "" when it is not inside one.
+        self._roots: PathTrie[str] = PathTrie()
+        self._env_key: Optional[Tuple[str, str, str]] = None
+        self._ceilings: Set[str] = set()
+        self._across_filesystems = False
+        self._lock = threading.Lock()
+
+    def find(self, real_path: str) -> Optional[str]:
+        with self._lock:
+            self._refresh_environment()
+            if os.environ.get("GIT_DIR"):
+                cached = self._roots.get(real_path)
+                if cached is None:
+                    cached = rev_parse_toplevel(real_path) or ""
+                    self._roots[real_path] = cached
+                return cached or None
+            return self._discover(real_path) or None
+
+    def forget(self, real_path: Optional[str] = None) -> None:
+        """Drop cached answers for *real_path*, or all of them.
+
+        A ``git init`` or removed ``.git`` at *real_path* or above it changes
+        the answer for *real_path* and everything below it; the ancestors'
+        own entries are dropped too so rediscovery does not stop at them.
+        """
+        with self._lock:
+            if real_path is None:
+                self._roots.clear()
+                return
+            self._roots.pop_subtree(real_path)
+            current = os.path.dirname(real_path)
+            while True:
+                self._roots.pop(current)
+                parent = os.path.dirname(current)
+                if parent == current:
+                    break
+                current = parent
+
+    def _refresh_environment(self) -> None:
+        key = (
+            os.environ.get("GIT_DIR", ""),
+            os.environ.get("GIT_CEILING_DIRECTORIES", ""),
+            os.environ.get("GIT_DISCOVERY_ACROSS_FILESYSTEM", ""),
+        )
+        if key == self._env_key:
+            return
+        self._env_key = key
+        self._roots.clear()
+        self._ceilings = {
+            os.path.realpath(entry)
+            for entry in key[1].split(os.pathsep)
+            if os.path.isabs(entry)
+        }
+        self._across_filesystems = _config_bool(key[2])
+
+    def _discover(self, real_path: str) -> str:
+        known = self._roots.longest_prefix(real_path)
+        if known is not None and known[0] == real_path:
+            return known[1]
+        known_path = known[0] if known is not None else None
+
+        probed: List[str] = []
+        result = ""
+        current = real_path
+        previous_dev: Optional[int] = None
+        while True:
+            try:
+                device = os.stat(current).st_dev
+            except OSError:
+                break
+            if (
+                previous_dev is not None
+                and device != previous_dev
+                and not self._across_filesystems
+            ):
+                break
+            previous_dev = device
+            if current == known_path:
+                assert known is not None
+                result = known[1]
+                break
+            probed.append(current)
+            if os.path.basename(current) == ".git":
+                # Inside a repository's git directory there is no work tree.
+                break
+            if is_worktree_root(current):
+                result = current
+                break
+            parent = os.path.dirname(current)
+            if parent == current or parent in self._ceilings:
+                break
+            current = parent
+
+        for path in probed:
+            self._roots[path] = result
+        return result
+
+
+class UnsupportedGitConfig(Exception):
+    """Raised when a repository needs features the in-process matcher lacks."""
+
+
+def _parse_git_config(path: str) -> Dict[str, str]:
+    """Read the ``section.key`` values of one git config file.
+
+    Only the handful of keys that influence ignore handling are consumed, so
+    this is a forgiving subset parser. ``include``/``includeIf`` sections pull
+    in files we would have to follow and raise ``UnsupportedGitConfig``.
+    """
+    values: Dict[str, str] = {}
+    try:
+        with open(path, "r", encoding="utf-8", errors="surrogateescape") as handle:
+            lines = handle.read().splitlines()
+    except OSError:
+        return values
+
+    section = ""
+    for raw in lines:
+        line = raw.strip()
+        if line.startswith("["):
+            end = line.find("]")
+            if end < 0:
+                raise UnsupportedGitConfig(path)
+            name, _, subsection = line[1:end].strip().partition(" ")
+            name = name.lower()
+            if name in ("include", "includeif"):
+                raise UnsupportedGitConfig(path)
+            section = name
+            if subsection:
+                section += "." + subsection.strip().strip('"')
+            line = line[end + 1 :].strip()
+        if not line or line[0] in "#;":
+            continue
+        key, sep, value = line.partition("=")
+        values[f"{section}.{key.strip().lower()}"] = (
+            _config_value(value) if sep else "true"
+        )
+    return values
+
+
+def _config_value(raw: str) -> str:
+    out: List[str] = []
+    quoted = False
+    index = 0
+    while index < len(raw):
+        char = raw[index]
+        if char == '"':
+            quoted = not quoted
+        elif char == "\\" and index + 1 < len(raw):
+            index += 1
+            out.append({"n": "\n", "t": "\t"}.get(raw[index], raw[index]))
+        elif char in "#;" and not quoted:
+            break
+        else:
+            out.append(char)
+        index += 1
+    return "".join(out).strip()
+
+
+def _config_bool(value: Optional[str]) -> bool:
+    return (value or "").lower() in ("true", "yes", "on", "1")
+
+
+def _translate_glob(pattern: str) -> str:
+    """Translate a gitignore glob (without leading ``/``) to a regex body."""
+    out: List[str] = []
+    index = 0
+    length = len(pattern)
+    while index < length:
+        char = pattern[index]
+        if char == "*":
+            end = index
+            while end < length and pattern[end] == "*":
+                end += 1
+            at_start = index == 0 or pattern[index - 1] == "/"
+            at_end = end == length or pattern[end] == "/"
+            if end - index == 2 and at_start and at_end:
+                if end == length:
+                    # ``foo/**`` matches everything inside ``foo``.
+                    out.append(".+" if index else ".*")
+                    index = end
+                else:
+                    # ``**/`` matches zero or more leading directories.
+                    out.append("(?:.*/)?")
+                    index = end + 1
+                continue
+            out.append("[^/]*")
+            index = end
+        elif char == "?":
+            out.append("[^/]")
+            index += 1
+        elif char == "[":
+            end = index + 1
+            if end < length and pattern[end] in "!^":
+                end += 1
+            if end < length and pattern[end] == "]":
+                end += 1
+            while end < length and pattern[end] != "]":
+                end += 2 if pattern[end] == "\\" else 1
+            if end >= length:
+                out.append(re.escape(char))
+                index += 1
+                continue
+            body = pattern[index + 1 : end]
+            if "[:" in body:
+                raise UnsupportedGitConfig(pattern)
+            negate = body[:1] in ("!", "^")
+            if negate:
+                body = body[1:]
+            members: List[str] = []
+            pos = 0
+            while pos < len(body):
+                member = body[pos]
+                if member == "\\" and pos + 1 < len(body):
+                    pos += 1
+                    member = body[pos]
+                members.append(member if member == "-" else re.escape(member))
+                pos += 1
+            out.append(("[^/" if negate else "[") + "".join(members) + "]")
+            index = end + 1
+        elif char == "\\" and index + 1 < length:
+            out.append(re.escape(pattern[index + 1]))
+            index += 2
+        else:
+            out.append(re.escape(char))
+            index += 1
+    return "".join(out)
+
+
+@dataclass(frozen=True)
+class IgnoreRule:
+    """One compiled line of an ignore file, matching repo-relative paths."""
+
+    regex: str
+    negated: bool
+    dir_only: bool
+
+
+def parse_ignore_lines(lines: Iterable[str], base: str = "") -> List[IgnoreRule]:
+    """Compile ignore-file *lines* found in the repo-relative directory *base*."""
+    prefix = re.escape(base + "/") if base else ""
+    rules: List[IgnoreRule] = []
+    for line in lines:
+        if not line or line.startswith("#"):
+            continue
+        end = len(line)
+        while end > 0 and line[end - 1] == " " and not (
+            end > 1 and line[end - 2] == "\\"
+        ):
+            end -= 1
+        line = line[:end]
+        negated = line.startswith("!")
+        if negated:
+            line = line[1:]
+        dir_only = line.endswith("/")
+        if dir_only:
+            line = line[:-1]
+        if not line:
+            continue
+        anchored = "/" in line
+        body = _translate_glob(line.lstrip("/") if anchored else line)
+        regex = prefix + body if anchored else prefix + "(?:.*/)?" + body
+        rules.append(IgnoreRule(regex, negated, dir_only))
+    return rules
+
+
+class _CompiledRules:
+    """All rules applying inside one directory, merged into two regexes.
+
+    Alternatives are ordered from highest to lowest precedence, so the first
+    alternative that matches a path is the rule git would apply to it.
+    """
+
+    def __init__(self, rules: List[IgnoreRule], ignore_case: bool):
+        ordered = list(reversed(rules))
+        self._negated = [rule.negated for rule in ordered]
+        flags = re.IGNORECASE if ignore_case else 0
+        self._any = self._combine(ordered, flags, include_dir_only=True)
+        self._files = self._combine(ordered, flags, include_dir_only=False)
+
+    @staticmethod
+    def _combine(rules: List[IgnoreRule], flags: int, include_dir_only: bool):
+        parts = [
+            f"(?P<r{index}>{rule.regex})"
+            for index, rule in enumerate(rules)
+            if include_dir_only or not rule.dir_only
+        ]
+        if not parts:
+            return None
+        return re.compile("|".join(parts), flags | re.DOTALL)
+
+    def matches(self, rel_path: str, is_dir: bool) -> bool:
+        regex = self._any if is_dir else self._files
+        if regex is None:
+            return False
+        match = regex.fullmatch(rel_path)
+        if match is None or match.lastgroup is None:
+            return False
+        return not self._negated[int(match.lastgroup[1:])]
+
+
+def _read_index_paths(index_path: str, hash_size: int) -> Optional[List[str]]:
+    """Return the sorted repo-relative paths tracked in a git index (versions 2–4).
+
+    Returns ``None`` for layouts we cannot read in full, such as split
+    indexes, so the caller falls back to asking git.
+    """
+    try:
+        with open(index_path, "rb") as handle:
+            data = handle.read()
+    except FileNotFoundError:
+        return []
+    except OSError:
+        return None
+    if len(data) < 12 or data[:4] != b"DIRC":
+        return None
+    version, count = struct.unpack_from(">II", data, 4)
+    if version not in (2, 3, 4):
+        return None
+
+    paths: List[str] = []
+    offset = 12
+    previous = b""
+    fixed = 40 + hash_size
+    try:
+        for _ in range(count):
+            flags = struct.unpack_from(">H", data, offset + fixed)[0]
+            cursor = offset + fixed + 2
+            if version >= 3 and flags & 0x4000:
+                cursor += 2
+            if version == 4:
+                byte = data[cursor]
+                cursor += 1
+                strip = byte & 0x7F
+                while byte & 0x80:
+                    byte = data[cursor]
+                    cursor += 1
+                    strip = ((strip + 1) << 7) | (byte & 0x7F)
+                end = data.index(b"\0", cursor)
+                name = previous[: len(previous) - strip] + data[cursor:end]
+                offset = end + 1
+            else:
+                end = data.index(b"\0", cursor)
+                name = data[cursor:end]
+                entry_len = end - offset
+                offset += (entry_len + 8) & ~7
+            previous = name
+            paths.append(os.fsdecode(name.rstrip(b"/")))
+    except (IndexError, ValueError, struct.error):
+        return None
+
+    # Extensions follow the entries; a split index keeps entries elsewhere.
+    while offset + 8 <= len(data) - hash_size:
+        signature = data[offset : offset + 4]
+        size = struct.unpack_from(">I", data, offset + 4)[0]
+        if signature == b"link":
+            return None
+        offset += 8 + size
+    # Entries are in byte order already; this only fixes up undecodable names.
+    paths.sort()
+    return paths
+
+
+class GitignoreMatcher:
+    """Decide git-ignored status in process, without forking git.
+
+    Reads nested ``.gitignore`` files, ``info/exclude`` and the global
+    excludes file, and treats paths tracked in the index as not ignored, the
+    same way ``git check-ignore`` does. The index is only read once a path
+    matches an ignore rule, and kept until its stamp changes. Parsed files are
+    cached by their ``(ino, mtime_ns, size)`` stamp and the merged rules of
+    each directory are cached by the stamps of every file that contributes to
+    them.
+    ``ignored_names`` returns ``None`` when the repository uses configuration
+    the matcher does not model, and the caller should ask git instead.
+    """
+
+    MAX_DIRECTORIES = 1024
+
+    def __init__(self, repo_root: str):
+        self.repo_root = repo_root
+        self._file_rules: Dict[Tuple[str, str], Tuple[FileStamp, List[IgnoreRule]]] = {}
+        self._dir_rules: "OrderedDict[str, Tuple[tuple, _CompiledRules]]" = OrderedDict()
+        self._settings_key: Optional[tuple] = None
+        self._settings: Optional[Tuple[str, bool, int]] = None
+        self._git_dir = ""
+        self._common_dir = ""
+        self._index_stamp: Optional[tuple] = None
+        self._index_checked = False
+        self._tracked: List[str] = []
+        self._lock = threading.Lock()
+
+    def ignored_names(
+        self, dir_rel: str, entries: Iterable[Tuple[str, bool]]
+    ) -> Optional[Set[str]]:
+        """Return the ignored names among *entries* of repo-relative *dir_rel*.
+
+        *entries* are ``(name, is_dir)`` pairs, where ``is_dir`` follows git's
+        view (a symlink to a directory is not a directory). When *dir_rel*
+        itself lies inside an ignored directory nothing is reported, so that
+        navigating into an ignored directory still shows its contents.
+        """
+        if any(os.environ.get(name) for name in _GIT_OVERRIDE_ENV):
+            return None
+        with self._lock:
+            try:
+                if not self._refresh_settings():
+                    return None
+                self._index_checked = False
+                sources = self._rule_sources(dir_rel)
+                stamps = tuple(file_stamp(path) for path, _base in sources)
+                if dir_rel and self._directory_excluded(dir_rel, sources, stamps):
+                    return set()
+                rules = self._rules_for(dir_rel, sources, stamps)
+
+                prefix = f"{dir_rel}/" if dir_rel else ""
+                ignored: Set[str] = set()
+                for name, is_dir in entries:
+                    rel_path = prefix + name
+                    if rules.matches(rel_path, is_dir) and not self._is_tracked(
+                        rel_path
+                    ):
+                        ignored.add(name)
+                return ignored
+            except UnsupportedGitConfig:
+                return None
+
+    def _is_tracked(self, rel_path: str) -> bool:
+        """Whether *rel_path* is in the index, or is a directory holding entries."""
+        tracked = self._tracked_paths()
+        index = bisect_left(tracked, rel_path)
+        if index < len(tracked) and tracked[index] == rel_path:
+            return True
+        prefix = rel_path + "/"
+        index = bisect_left(tracked, prefix, index)
+        return index < len(tracked) and tracked[index].startswith(prefix)
+
+    def _directory_excluded(
+        self, dir_rel: str, sources: List[Tuple[str, str]], stamps: tuple
+    ) -> bool:
+        # Each ancestor's rules come from a prefix of *dir_rel*'s sources, so
+        # every ignore file on the path is stamped once rather than per level.
+        parts = dir_rel.split("/")
+        shared = len(sources) - len(parts)
+        for depth in range(1, len(parts) + 1):
+            parent = "/".join(parts[: depth - 1])
+            path = "/".join(parts[:depth])
+            count = shared + depth - 1
+            rules = self._rules_for(parent, sources[:count], stamps[:count])
+            if rules.matches(path, True) and not self._is_tracked(path):
+                return True
+        return False
+
+    def _refresh_settings(self) -> bool:
+        dirs = resolve_git_dirs(self.repo_root)
+        if dirs is None:
+            return False
+        git_dir, common_dir = dirs
+        config_home = os.environ.get("XDG_CONFIG_HOME") or os.path.expanduser(
+            "~/.config"
+        )
+        config_files = [
+            os.path.join(config_home, "git", "config"),
+            os.path.expanduser("~/.gitconfig"),
+            os.path.join(common_dir, "config"),
+        ]
+        if not os.environ.get("GIT_CONFIG_NOSYSTEM"):
+            config_files.insert(0, "/etc/gitconfig")
+        if os.path.exists(os.path.join(git_dir, "config.worktree")):
+            # Per-worktree config needs extensions.worktreeConfig semantics.
+            raise UnsupportedGitConfig(git_dir)
+        key = (git_dir, common_dir, tuple(file_stamp(path) for path in config_files))
+        if key == self._settings_key and self._settings is not None:
+            return True
+
+        values: Dict[str, str] = {}
+        for path in config_files:
+            values.update(_parse_git_config(path))
+        excludes_file = values.get("core.excludesfile") or os.path.join(
+            config_home, "git", "ignore"
+        )
+        excludes_file = os.path.expanduser(excludes_file)
+        if not os.path.isabs(excludes_file):
+            excludes_file = os.path.join(self.repo_root, excludes_file)
+        object_format = values.get("extensions.objectformat", "sha1").lower()
+        hash_size = {"sha1": 20, "sha256": 32}.get(object_format)
+        if hash_size is None:
+            raise UnsupportedGitConfig(object_format)
+
+        self._settings_key = key
+        self._settings = (excludes_file, _config_bool(values.get("core.ignorecase")), hash_size)
+        self._git_dir = git_dir
+        self._common_dir = common_dir
+        self._dir_rules.clear()
+        self._index_stamp = None
+        return True
+
+    def _tracked_paths(self) -> List[str]:
+        """Sorted index paths, re-stamped once per ``ignored_names`` call.
+
+        Raises ``UnsupportedGitConfig`` when the index cannot be read in full.
+        """
+        if self._index_checked:
+            return self._tracked
+        assert self._settings is not None
+        index_path = os.path.join(self._git_dir, "index")
+        stamp = (index_path, file_stamp(index_path))
+        if stamp != self._index_stamp:
+            tracked = _read_index_paths(index_path, self._settings[2])
+            if tracked is None:
+                self._index_stamp = None
+                raise UnsupportedGitConfig(index_path)
+            self._index_stamp = stamp
+            self._tracked = tracked
+        self._index_checked = True
+        return self._tracked
+
+    def _rule_sources(self, dir_rel: str) -> List[Tuple[str, str]]:
+        """``(path, base)`` of every ignore file that applies inside *dir_rel*."""
+        assert self._settings is not None
+        excludes_file = self._settings[0]
+        sources = [
+            (excludes_file, ""),
+            (os.path.join(self._common_dir, "info", "exclude"), ""),
+            (os.path.join(self.repo_root, ".gitignore"), ""),
+        ]
+        if dir_rel:
+            parts = dir_rel.split("/")
+            for depth in range(1, len(parts) + 1):
+                base = "/".join(parts[:depth])
+                sources.append(
+                    (os.path.join(self.repo_root, *parts[:depth], ".gitignore"), base)
+                )
+        return sources
+
+    def _rules_for(
+        self, dir_rel: str, sources: List[Tuple[str, str]], stamps: tuple
+    ) -> _CompiledRules:
+        assert self._settings is not None
+        ignore_case = self._settings[1]
+        cached = self._dir_rules.get(dir_rel)
+        if cached is not None and cached[0] == stamps:
+            self._dir_rules.move_to_end(dir_rel)
+            return cached[1]
+
+        rules: List[IgnoreRule] = []
+        for (path, base), stamp in zip(sources, stamps):
+            rules.extend(self._load_file(path, base, stamp))
+        compiled = _CompiledRules(rules, ignore_case)
+        self._dir_rules[dir_rel] = (stamps, compiled)
+        while len(self._dir_rules) > self.MAX_DIRECTORIES:
+            self._dir_rules.popitem(last=False)
+        return compiled
+
+    def _load_file(self, path: str, base: str, stamp: FileStamp) -> List[IgnoreRule]:
+        if stamp is None:
+            self._file_rules.pop((path, base), None)
+            return []
+        cached = self._file_rules.get((path, base))
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        try:
+            with open(path, "r", encoding="utf-8", errors="surrogateescape") as handle:
+                lines = handle.read().splitlines()
+        except OSError:
+            return []
+        rules = parse_ignore_lines(lines, base)
+        self._file_rules[(path, base)] = (stamp, rules)
+        return rules
+
+
+class CheckIgnoreProcess:
+    """Long-lived ``git check-ignore --stdin`` coprocess for one repository.
+
+    Only the paths being listed are sent to git, so the cost of an ignore
+    lookup scales with the size of the directory rather than the repository.
+    Answers are kept in a bounded LRU cache keyed by repo-relative path. The
+    coprocess reads each ignore file once, so callers pass the ignore files
+    that apply to a query and the process restarts when one of them changes.
+    """
+
+    # Input bytes written before reading answers back; staying well below the
+    # pipe buffer means git can never block on stdout while we block on stdin.
+    BATCH_BYTES = 16 * 1024
+
+    def __init__(self, repo_root: str, *, cache_size: int = 65536, timeout: float = 5.0):
+        self.repo_root = repo_root
+        self.cache_size = max(1, cache_size)
+        self.timeout = timeout
+        self._cache: "OrderedDict[str, bool]" = OrderedDict()
+        self._ignore_file_stamps: Dict[str, FileStamp] = {}
+        self._process: Optional[subprocess.Popen[bytes]] = None
+        self._buffer = b""
+        self._failed = False
+        self._lock = threading.Lock()
+
+    def ignored(
+        self, rel_paths: Iterable[str], ignore_files: Iterable[str] = ()
+    ) -> Dict[str, bool]:
+        """Return ``{rel_path: is_ignored}`` for each repo-relative path."""
+        with self._lock:
+            self._check_ignore_files(ignore_files)
+            results: Dict[str, bool] = {}
+            missing: List[str] = []
+            for rel_path in rel_paths:
+                cached = self._cache.get(rel_path)
+                if cached is None:
+                    missing.append(rel_path)
+                else:
+                    self._cache.move_to_end(rel_path)
+                    results[rel_path] = cached
+            if missing:
+                answers = self._query(missing)
+                for rel_path in missing:
+                    ignored = answers.get(rel_path, False)
+                    results[rel_path] = ignored
+                    if rel_path in answers:
+                        self._remember(rel_path, ignored)
+            return results
+
+    def close(self) -> None:
+        with self._lock:
+            self._stop_process()
+
+    def _remember(self, rel_path: str, ignored: bool) -> None:
+        self._cache[rel_path] = ignored
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _check_ignore_files(self, ignore_files: Iterable[str]) -> None:
+        changed = False
+        stamps: List[Tuple[str, FileStamp]] = []
+        for path in ignore_files:
+            stamp = file_stamp(path)
+            stamps.append((path, stamp))
+            known = self._ignore_file_stamps.get(path, stamp)
+            if known != stamp:
+                changed = True
+        if changed:
+            self._stop_process()
+            self._cache.clear()
+            self._ignore_file_stamps.clear()
+            self._failed = False
+        for path, stamp in stamps:
+            self._ignore_file_stamps[path] = stamp
+
+    def _start_process(self) -> Optional[subprocess.Popen[bytes]]:
+        if self._process is not None and self._process.poll() is None:
+            return self._process
+        if self._failed:
+            return None
+        env = dict(os.environ)
+        env["GIT_FLUSH"] = "1"
+        try:
+            self._process = subprocess.Popen(
+                [
+                    "git",
+                    "-C",
+                    self.repo_root,
+                    "check-ignore",
+                    "--stdin",
+                    "-z",
+                    "--non-matching",
+                    "-v",
+                ],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                env=env,
+            )
+        except (FileNotFoundError, OSError):
+            self._failed = True
+            self._process = None
+            return None
+        self._buffer = b""
+        return self._process
+
+    def _stop_process(self) -> None:
+        process = self._process
+        self._process = None
+        self._buffer = b""
+        if process is None:
+            return
+        try:
+            if process.stdin:
+                process.stdin.close()
+        except OSError:
+            pass
+        try:
+            process.wait(timeout=0.5)
+        except Exception:
+            try:
+                process.kill()
+                process.wait(timeout=0.5)
+            except Exception:
+                pass
+        if process.stdout:
+            try:
+                process.stdout.close()
+            except OSError:
+                pass
+
+    def _query(self, rel_paths: List[str]) -> Dict[str, bool]:
+        answers: Dict[str, bool] = {}
+        process = self._start_process()
+        if process is None:
+            return answers
+
+        batch: List[str] = []
+        batch_bytes = 0
+        try:
+            for rel_path in rel_paths:
+                encoded_len = len(os.fsencode(rel_path)) + 1
+                if batch and batch_bytes + encoded_len > self.BATCH_BYTES:
+                    self._run_batch(process, batch, answers)
+                    batch, batch_bytes = [], 0
+                batch.append(rel_path)
+                batch_bytes += encoded_len
+            if batch:
+                self._run_batch(process, batch, answers)
+        except (OSError, ValueError, TimeoutError):
+            # A wedged or crashed git only costs us the ignore filtering.
+            self._stop_process()
+            self._failed = True
+        return answers
+
+    def _run_batch(
+        self,
+        process: subprocess.Popen[bytes],
+        batch: List[str],
+        answers: Dict[str, bool],
+    ) -> None:
+        assert process.stdin is not None
+        payload = b"".join(os.fsencode(path) + b"\0" for path in batch)
+        process.stdin.write(payload)
+        process.stdin.flush()
+        fields = self._read_fields(process, 4 * len(batch))
+        for index, rel_path in enumerate(batch):
+            pattern = fields[4 * index + 2]
+            # Negated patterns (``!keep.apk``) match but re-include the path.
+            answers[rel_path] = bool(pattern) and not pattern.startswith(b"!")
+
+    def _read_fields(self, process: subprocess.Popen[bytes], count: int) -> List[bytes]:
+        assert process.stdout is not None
+        fd = process.stdout.fileno()
+        found = self._buffer.count(b"\0")
+        while found < count:
+            ready, _, _ = select.select([fd], [], [], self.timeout)
+            if not ready:
+                raise TimeoutError("git check-ignore did not answer")
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                raise OSError("git check-ignore exited")
+            self._buffer += chunk
+            found += chunk.count(b"\0")
+        fields = self._buffer.split(b"\0", count)
+        self._buffer = fields.pop()
+        return fields
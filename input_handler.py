@@ -11,7 +11,66 @@ import config
 from keys import is_ctrl_j, is_enter
 
 
+class _SelectionContext:
+    """Context directory, scope and paste target of the selected row.
+
+    Resolved on first access, so keys that never ask (plain movement, most
+    single-key commands) skip the scope lookups entirely.
+    """
+
+    def __init__(self, handler: "InputHandler", items, selected_index: Optional[int]):
+        self._handler = handler
+        self._items = items
+        self._selected_index = selected_index
+        self._scope = None
+        self._target_dir: Optional[str] = None
+
+    def _resolve_scope(self):
+        if self._scope is None:
+            if self._selected_index is None:
+                self._scope = (None, None, None)
+            else:
+                self._scope = self._handler._compute_context_scope(
+                    self._items, self._selected_index
+                )
+        return self._scope
+
+    @property
+    def context_path(self) -> Optional[str]:
+        return self._resolve_scope()[0]
+
+    @property
+    def scope_range(self):
+        return self._resolve_scope()[1]
+
+    @property
+    def context_index(self) -> Optional[int]:
+        return self._resolve_scope()[2]
+
+    @property
+    def target_dir(self) -> str:
+        if self._target_dir is None:
+            handler = self._handler
+            if self._selected_index is None:
+                self._target_dir = handler.nav.dir_manager.current_path
+            else:
+                _name, is_dir, path, _depth = self._items[self._selected_index]
+                context_path, scope_range, context_index = self._resolve_scope()
+                self._target_dir = handler._determine_target_directory(
+                    path,
+                    is_dir,
+                    selected_index=self._selected_index,
+                    context_path=context_path,
+                    context_index=context_index,
+                    scope_range=scope_range,
+                )
+        return self._target_dir
+
+
 class InputHandler:
+    # Longest run of motion keys folded into a single cursor move.
+    MAX_MOTION_BURST = 512
+
     def __init__(self, navigator):
         self.nav = navigator
         self.pending_operator = None
@@ -104,23 +163,17 @@ class InputHandler:
             self._flash()
             return
 
-        target_real = os.path.realpath(target_path)
         target_name = os.path.basename(target_path) or target_path
+        target_index = display_items.index_of(target_path)
 
         if target_path in self.nav.expanded_nodes:
-            collapse_index = None
-            for idx, (_, _, path, _) in enumerate(display_items):
-                if os.path.realpath(path) == target_real:
-                    collapse_index = idx
-                    break
-
-            self.nav.collapse_branch(target_path)
-            if collapse_index is not None:
-                self.nav.browser_selected = collapse_index
+            self.nav.collapse_node(target_path, target_index)
+            if target_index is not None:
+                self.nav.browser_selected = target_index
                 self.nav.update_visual_active(self.nav.browser_selected)
             self.nav.status_message = f"Collapsed {target_name}"
         else:
-            self.nav.expanded_nodes.add(target_path)
+            self.nav.expand_node(target_path, target_index)
             self.nav.status_message = f"Expanded {target_name}"
 
         self.nav.need_redraw = True
@@ -161,46 +214,14 @@ class InputHandler:
 
     def _expand_all_directories(self):
         self.nav.exit_visual_mode()
-
-        root = os.path.realpath(self.nav.dir_manager.current_path)
-        to_visit = [root]
-        visited = set()
-        added = 0
-
-        while to_visit:
-            current = to_visit.pop()
-            if current in visited:
-                continue
-            visited.add(current)
-
-            try:
-                entries = self.nav.dir_manager.list_directory(current)
-            except Exception:
-                continue
-
-            for name, is_dir in entries:
-                if not is_dir:
-                    continue
-                child_path = os.path.realpath(os.path.join(current, name))
-                to_visit.append(child_path)
-                if child_path not in self.nav.expanded_nodes:
-                    self.nav.expanded_nodes.add(child_path)
-                    added += 1
-
-        if added:
-            self.nav.status_message = f"Expanded {added} directories"
-        else:
-            self.nav.status_message = "No directories expanded"
-        self.nav.need_redraw = True
+        self.nav.start_expand_all()
 
     def _handle_comma_command(
         self,
         key,
         total: int,
         selection,
-        context_path,
-        scope_range,
-        target_dir,
+        context: _SelectionContext,
         display_items=None,
     ) -> bool:
         if display_items is None:
@@ -215,21 +236,28 @@ class InputHandler:
         self.nav.leader_sequence = "," + command
         self.nav.need_redraw = True
 
-        base_dir = context_path or target_dir or self.nav.dir_manager.current_path
+        def base_dir():
+            return (
+                context.context_path
+                or context.target_dir
+                or self.nav.dir_manager.current_path
+            )
 
         command_map = {
-            "j": lambda: self._jump_to_scope_edge("down", scope_range, total),
-            "k": lambda: self._jump_to_scope_edge("up", scope_range, total),
-            "sa": lambda: self._set_sort_mode("alpha", "Sort: Name", context_path),
+            "j": lambda: self._jump_to_scope_edge("down", context.scope_range, total),
+            "k": lambda: self._jump_to_scope_edge("up", context.scope_range, total),
+            "sa": lambda: self._set_sort_mode(
+                "alpha", "Sort: Name", context.context_path
+            ),
             "sma": lambda: self._set_sort_mode(
-                "mtime_asc", "Sort: Modified ↑", context_path
+                "mtime_asc", "Sort: Modified ↑", context.context_path
             ),
             "smd": lambda: self._set_sort_mode(
-                "mtime_desc", "Sort: Modified ↓", context_path
+                "mtime_desc", "Sort: Modified ↓", context.context_path
             ),
             "cl": self._clear_clipboard,
-            "nf": lambda: self.nav.create_new_file_no_open(base_dir),
-            "nd": lambda: self.nav.create_new_directory(base_dir),
+            "nf": lambda: self.nav.create_new_file_no_open(base_dir()),
+            "nd": lambda: self.nav.create_new_directory(base_dir()),
             "rn": lambda: self._leader_rename(selection),
             "b": self._leader_bookmark,
             "cm": self._clear_marked_items,
@@ -344,6 +372,10 @@ class InputHandler:
         if is_dir:
             return selected_index
 
+        parent_index = getattr(items, "parent_index", None)
+        if parent_index is not None:
+            return parent_index(selected_index)
+
         current_depth = depth
 
         for idx in range(selected_index - 1, -1, -1):
@@ -359,6 +391,13 @@ class InputHandler:
         if dir_index < 0 or dir_index >= len(items):
             return None
 
+        subtree_end = getattr(items, "subtree_end", None)
+        if subtree_end is not None:
+            end = subtree_end(dir_index)
+            if end == dir_index + 1:
+                return (dir_index, dir_index)
+            return (dir_index + 1, end - 1)
+
         base_depth = items[dir_index][3]
         first_child = None
         last_child = None
@@ -783,10 +822,22 @@ class InputHandler:
                 self.popup_leader_sequence = ""
             return True
 
+        if key == ord("/"):
+            text = self.nav.prompt_for_input("/")
+            if text:
+                self.nav.command_popup_search = text
+                self._popup_search(backwards=False)
+            self.nav.need_redraw = True
+            return True
+
+        if key in (ord("n"), ord("N")):
+            self._popup_search(backwards=key == ord("N"))
+            return True
+
         with self.nav.command_popup_lock:
-            lines = list(self.nav.command_popup_lines or [])
+            total_lines = len(self.nav.command_popup_lines or [])
             visible = max(1, self.nav.command_popup_view_rows or 1)
-            max_scroll = max(0, len(lines) - visible)
+            max_scroll = max(0, total_lines - visible)
             current_scroll = self.nav.command_popup_scroll
 
         if key in (ord("j"), curses.KEY_DOWN):
@@ -841,6 +892,39 @@ class InputHandler:
 
         return True
 
+    def _popup_search(self, backwards: bool) -> None:
+        """Scroll to the next (previous) output line containing the search.
+
+        Searching continues from the last match while it is on screen and
+        wraps around the ends of the output.
+        """
+        text = getattr(self.nav, "command_popup_search", "")
+        if not text:
+            self._flash()
+            return
+        with self.nav.command_popup_lock:
+            buffer = self.nav.command_popup_lines
+            total_lines = len(buffer)
+            visible = max(1, self.nav.command_popup_view_rows or 1)
+            scroll = self.nav.command_popup_scroll
+            match = self.nav.command_popup_match
+            if match is None or not scroll <= match < scroll + visible:
+                match = scroll if backwards else scroll - 1
+            start = match - 1 if backwards else match + 1
+            wrap = total_lines - 1 if backwards else 0
+            found = buffer.find(text, start, backwards)
+            if found is None:
+                found = buffer.find(text, wrap, backwards)
+            if found is not None:
+                self.nav.command_popup_match = found
+                if not scroll <= found < scroll + visible:
+                    self.nav.command_popup_scroll = min(
+                        found, max(0, total_lines - visible)
+                    )
+        if found is None:
+            self._flash()
+        self.nav.need_redraw = True
+
     def _popup_scroll_to_edge(self, which: str) -> None:
         with self.nav.command_popup_lock:
             total_lines = len(self.nav.command_popup_lines or [])
@@ -946,6 +1030,73 @@ class InputHandler:
         suffix = picker.extensions[0].lstrip(".")
         return path + "." + suffix
 
+    def motion_delta(self, key) -> Optional[int]:
+        """Cursor delta of *key* when it is a plain list-mode move, else ``None``.
+
+        Only states where ``j``/``k`` and the arrows do nothing but move the
+        cursor qualify; prompts, leaders, filters and visual mode interpret
+        the same keys differently.
+        """
+        if key in (ord("j"), curses.KEY_DOWN):
+            delta = 1
+        elif key in (ord("k"), curses.KEY_UP):
+            delta = -1
+        else:
+            return None
+        nav = self.nav
+        if (
+            getattr(nav, "layout_mode", "list") != "list"
+            or getattr(nav, "command_popup_visible", False)
+            or getattr(nav, "show_help", False)
+            or getattr(nav, "command_mode", False)
+            or getattr(nav, "visual_mode", False)
+            or self.in_filter_mode
+            or self.pending_comma
+            or self.pending_operator is not None
+        ):
+            return None
+        return delta
+
+    def handle_key_burst(self, stdscr, key) -> bool:
+        """Handle *key*, folding motion keys already queued behind it.
+
+        A held ``j`` on a slow link arrives as a clump of repeats; they are
+        read without blocking and applied as one move, so the next frame
+        shows where the cursor ended up instead of replaying every step.
+        The first key that is not a motion is pushed back for the next read.
+        """
+        delta = self.motion_delta(key)
+        if delta is None or stdscr is None:
+            # Other keys may open prompts or suspend curses, drawing over
+            # rows the renderer would otherwise consider unchanged.
+            invalidate = getattr(getattr(self.nav, "renderer", None), "invalidate", None)
+            if invalidate is not None:
+                invalidate()
+            return self.handle_key(stdscr, key)
+        count = 1
+        while count < self.MAX_MOTION_BURST:
+            next_key = stdscr.getch()
+            if next_key == -1:
+                break
+            step = self.motion_delta(next_key)
+            if step is None:
+                curses.ungetch(next_key)
+                break
+            delta += step
+            count += 1
+        self._apply_motion(delta)
+        return False
+
+    def _apply_motion(self, delta: int) -> None:
+        self.nav.status_message = ""
+        total = len(self.nav.build_display_items())
+        if total == 0:
+            self.nav.browser_selected = 0
+            self._flash()
+            return
+        self.nav.browser_selected = max(0, min(self.nav.browser_selected, total - 1))
+        self._move_selection(total, delta)
+
     def handle_key(self, stdscr, key):
         if getattr(self.nav, "command_popup_visible", False):
             if self._handle_command_popup_key(key):
@@ -1026,6 +1177,14 @@ class InputHandler:
                 self.nav.exit_visual_mode()
                 return False
 
+            cancel_expand = getattr(self.nav, "cancel_expand_all", None)
+            if cancel_expand is not None and cancel_expand():
+                return False
+
+            cancel_scan = getattr(self.nav, "cancel_listing_scan", None)
+            if cancel_scan is not None and cancel_scan():
+                return False
+
             self._reset_comma()
             self.pending_operator = None
             self.in_filter_mode = False
@@ -1054,29 +1213,18 @@ class InputHandler:
         total = len(display_items)
         selection = None
         selected_name = selected_path = selected_is_dir = None
-        target_dir = self.nav.dir_manager.current_path
-        context_path = None
-        scope_range = None
-        context_index = None
 
         if total == 0:
             self.nav.browser_selected = 0
+            context = _SelectionContext(self, display_items, None)
         else:
             self.nav.browser_selected = max(
                 0, min(self.nav.browser_selected, total - 1)
             )
             selection = display_items[self.nav.browser_selected]
             selected_name, selected_is_dir, selected_path, _ = selection
-            context_path, scope_range, context_index = self._compute_context_scope(
-                display_items, self.nav.browser_selected
-            )
-            target_dir = self._determine_target_directory(
-                selected_path,
-                selected_is_dir,
-                selected_index=self.nav.browser_selected,
-                context_path=context_path,
-                context_index=context_index,
-                scope_range=scope_range,
+            context = _SelectionContext(
+                self, display_items, self.nav.browser_selected
             )
 
         if key == ord(","):
@@ -1092,9 +1240,7 @@ class InputHandler:
                 key,
                 total,
                 selection,
-                context_path,
-                scope_range,
-                target_dir,
+                context,
                 display_items,
             ):
                 return False
@@ -1218,7 +1364,7 @@ class InputHandler:
         # === Multi-mark operations ===
         if self.nav.marked_items:
             if key == ord("p"):
-                self._copy_marked(target_dir)
+                self._copy_marked(context.target_dir)
                 self._record_repeat_sequence([ord("p")])
                 return False
             if key == ord("x"):
@@ -1228,6 +1374,7 @@ class InputHandler:
         # === Single-item paste (only when no marks) ===
         if key == ord("p") and self.nav.clipboard.has_entries:
             try:
+                target_dir = context.target_dir
                 self.nav.clipboard.paste(target_dir)
                 count = self.nav.clipboard.entry_count
                 noun = "item" if count == 1 else "items"
@@ -1589,18 +1736,19 @@ class InputHandler:
     ):
         current_dir = self.nav.dir_manager.current_path
 
-        if (
-            selected_index is not None
-            and context_path
-            and scope_range
-            and self._is_directory_expanded(context_path)
-        ):
+        if selected_index is not None and context_path and scope_range:
             start, end = scope_range
             if (
                 start is not None
                 and end is not None
                 and start <= selected_index <= end
                 and (context_index is None or selected_index > context_index)
+                # Rows below the context directory are its children, so it
+                # is expanded; only check the set when that is unknown.
+                and (
+                    context_index is not None
+                    or self._is_directory_expanded(context_path)
+                )
             ):
                 return context_path
 
@@ -0,0 +1,61 @@
+"""Incremental bytes-to-lines decoding for subprocess output."""
+
+from __future__ import annotations
+
+import codecs
+from typing import List
+
+
+class LineDecoder:
+    """Turn arbitrary byte chunks into complete text lines.
+
+    UTF-8 sequences split across chunks are decoded once their last byte
+    arrives, and undecodable bytes become U+FFFD. Newlines follow the
+    universal-newline rules the text-mode pipes used, so ``\\r\\n`` and a
+    lone ``\\r`` end a line too. A trailing partial line waits in the
+    decoder until ``finish``.
+    """
+
+    def __init__(self):
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        # The unterminated line so far, joined only once it ends, so a long
+        # line arriving in many chunks costs linear time.
+        self._pieces: List[str] = []
+        self._cr = False
+
+    def feed(self, data: bytes) -> List[str]:
+        text = self._decoder.decode(data)
+        if self._cr:
+            text = "\r" + text
+        # The matching "\n" of a trailing "\r" may open the next chunk.
+        self._cr = text.endswith("\r")
+        if self._cr:
+            text = text[:-1]
+        if "\r" in text:
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+        if "\n" not in text:
+            if text:
+                self._pieces.append(text)
+            return []
+        lines = text.split("\n")
+        if self._pieces:
+            self._pieces.append(lines[0])
+            lines[0] = "".join(self._pieces)
+        tail = lines.pop()
+        self._pieces = [tail] if tail else []
+        return lines
+
+    def finish(self) -> List[str]:
+        """Lines still buffered once the stream has ended."""
+        text = "".join(self._pieces) + ("\r" if self._cr else "")
+        text += self._decoder.decode(b"", final=True)
+        self._pieces = []
+        self._cr = False
+        if not text:
+            return []
+        if "\r" in text:
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+        lines = text.split("\n")
+        if not lines[-1]:
+            lines.pop()
+        return lines
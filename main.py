@@ -463,8 +463,7 @@ def main(argv: list[str] | None = None) -> int:
 
 
 def _write_picker_cache(selection: list[str]) -> None:
-    cache_root = os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache"))
-    cache_dir = os.path.join(cache_root, "o")
+    cache_dir = config.get_cache_dir()
     try:
         os.makedirs(cache_dir, exist_ok=True)
         cache_path = os.path.join(cache_dir, "picker-selection.txt")
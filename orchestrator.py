@@ -1,11 +1,18 @@
 import curses
 import os
+import sys
+import time
 from typing import Optional, Callable, Any
 
 from core_navigator import FileNavigator
+from event_loop import EventLoop
+from frame_scheduler import FOCUS_IN, FOCUS_OUT, FrameScheduler, set_focus_reporting
 
 
 class Orchestrator:
+    # Longest stretch spent on queued keys before a frame is drawn.
+    MAX_BURST_SECONDS = 0.05
+
     def __init__(
         self,
         start_path: Optional[str] = None,
@@ -18,6 +25,7 @@ class Orchestrator:
         self.navigator: Optional[Any] = None
         self.picker_options = picker_options
         self.reveal_path = reveal_path
+        self.scheduler: Optional[FrameScheduler] = None
 
     def setup(self) -> None:
         if self.navigator is None:
@@ -59,30 +67,145 @@ class Orchestrator:
         except Exception:
             pass
 
-        stdscr.timeout(40)
+        stdscr.timeout(0)
+        try:
+            input_fd = sys.stdin.fileno()
+        except (AttributeError, OSError, ValueError):
+            input_fd = 0
+        loop = EventLoop(input_fd)
+        loop.install_resize_handler()
+        if hasattr(navigator, "set_wake_callback"):
+            navigator.set_wake_callback(loop.wake)
+
+        # Matrix frames are paced by the scheduler; list mode sleeps until
+        # input or a background event arrives.
+        self.scheduler = FrameScheduler.from_config(getattr(navigator, "config", None))
+
         navigator.need_redraw = True
+        if hasattr(navigator, "start_background_services"):
+            navigator.start_background_services()
+        if hasattr(navigator, "schedule_prefetch"):
+            navigator.schedule_prefetch()
 
+        try:
+            self._event_loop(stdscr, navigator, loop)
+        finally:
+            if hasattr(navigator, "set_wake_callback"):
+                navigator.set_wake_callback(None)
+            set_focus_reporting(False)
+            loop.close()
+
+    def _event_loop(self, stdscr, navigator, loop: EventLoop) -> None:
+        scheduler = self.scheduler or FrameScheduler()
+        reporting = False
         while True:
-            should_render = navigator.need_redraw or navigator.layout_mode == "matrix"
-            if should_render:
+            if hasattr(navigator, "begin_tick"):
+                navigator.begin_tick()
+            if hasattr(navigator, "apply_external_changes"):
+                navigator.apply_external_changes()
+            if hasattr(navigator, "apply_expand_progress"):
+                navigator.apply_expand_progress()
+            if hasattr(navigator, "apply_listing_progress"):
+                navigator.apply_listing_progress()
+            animating = navigator.layout_mode == "matrix"
+            # Focus reports only pace Matrix frames; elsewhere they would
+            # reach prompts as stray "ESC [ I" / "ESC [ O" keys.
+            if animating != reporting:
+                set_focus_reporting(animating)
+                reporting = animating
+                if animating:
+                    # No reports arrived while off; assume the terminal has focus.
+                    scheduler.set_focus(True)
+            if navigator.need_redraw or (animating and scheduler.frame_due()):
+                started = time.monotonic()
+                # Clear first: a worker may flag another redraw mid-render.
+                navigator.need_redraw = False
                 navigator.renderer.render()
-                if navigator.layout_mode != "matrix":
-                    navigator.need_redraw = False
-                else:
-                    navigator.need_redraw = False
+                if animating:
+                    scheduler.record_frame(started, time.monotonic())
 
+            # Prompts switch the window to blocking reads; keys already
+            # buffered by curses are drained before sleeping on the fd.
+            stdscr.timeout(0)
             key = stdscr.getch()
             if key == -1:
+                loop.wait(scheduler.timeout() if animating else None)
+                if loop.take_resize():
+                    self._apply_resize(loop.input_fd)
+                    navigator.need_redraw = True
                 continue
 
-            if navigator.input_handler.handle_key(stdscr, key):
+            if self._handle_input_burst(stdscr, navigator, key, scheduler):
                 break
 
-            if getattr(navigator, "exit_requested", False):
-                break
+            if hasattr(navigator, "schedule_prefetch"):
+                navigator.schedule_prefetch()
 
             navigator.need_redraw = True
 
+    def _handle_input_burst(
+        self, stdscr, navigator, key: int, scheduler: FrameScheduler
+    ) -> bool:
+        """Handle *key* and whatever input is already queued behind it.
+
+        Rendering waits until the queue is empty or ``MAX_BURST_SECONDS``
+        passed, so a clump of keys costs one frame. Returns ``True`` to exit.
+        """
+        handler = navigator.input_handler
+        handle = getattr(handler, "handle_key_burst", handler.handle_key)
+        deadline = time.monotonic() + self.MAX_BURST_SECONDS
+        while True:
+            focus = self._read_focus_event(stdscr, key)
+            if focus is not None:
+                scheduler.set_focus(focus)
+                navigator.need_redraw = True
+            elif key == curses.KEY_RESIZE:
+                navigator.need_redraw = True
+            else:
+                scheduler.note_input()
+                if handle(stdscr, key):
+                    return True
+            if getattr(navigator, "exit_requested", False):
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            stdscr.timeout(0)
+            key = stdscr.getch()
+            if key == -1:
+                return False
+
+    @staticmethod
+    def _read_focus_event(stdscr, key: int) -> Optional[bool]:
+        """Consume an ``ESC [ I`` / ``ESC [ O`` focus report starting at *key*.
+
+        Returns the new focus state, or ``None`` after pushing back anything
+        that was not a focus report so Esc keeps working.
+        """
+        if key != 27:
+            return None
+        stdscr.timeout(0)
+        bracket = stdscr.getch()
+        if bracket != ord("["):
+            if bracket != -1:
+                curses.ungetch(bracket)
+            return None
+        final = stdscr.getch()
+        if final in (FOCUS_IN, FOCUS_OUT):
+            return final == FOCUS_IN
+        # ungetch is last-in first-out.
+        if final != -1:
+            curses.ungetch(final)
+        curses.ungetch(bracket)
+        return None
+
+    @staticmethod
+    def _apply_resize(fd: int) -> None:
+        try:
+            rows, cols = os.get_terminal_size(fd)
+            curses.resizeterm(rows, cols)
+        except (OSError, curses.error, ValueError):
+            pass
+
     def _run_curses(self) -> None:
         curses.wrapper(self._curses_main)
 
@@ -96,6 +219,11 @@ class Orchestrator:
             self.shutdown()
 
     def shutdown(self) -> None:
+        if self.navigator and hasattr(self.navigator, "stop_background_services"):
+            try:
+                self.navigator.stop_background_services()
+            except Exception:
+                pass
         if self.navigator and hasattr(self.navigator.clipboard, "cleanup"):
             try:
                 self.navigator.clipboard.cleanup()
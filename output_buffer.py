@@ -0,0 +1,308 @@
+"""Bounded line store for command popup output."""
+
+from __future__ import annotations
+
+import mmap
+import os
+import tempfile
+from array import array
+from bisect import bisect_right
+from collections import deque
+from typing import Deque, Iterable, Iterator, List, Optional
+
+
+class SpillFile:
+    """Append-only line file read back through ``mmap``.
+
+    ``offsets[i]`` is the byte offset where line ``i`` starts, built as lines
+    are written, so reading a line is one slice of the mapping and a search
+    runs ``mmap.find`` over the raw bytes and bisects the index, without
+    holding the output in Python strings. The file stops growing at
+    ``max_bytes``; ``extend`` reports how many lines fit, and with a cap
+    below 4 GiB offsets are stored in 4 bytes each. The file is deleted on
+    ``close``.
+    """
+
+    def __init__(self, directory: str, max_bytes: Optional[int] = None):
+        os.makedirs(directory, exist_ok=True)
+        fd, self.path = tempfile.mkstemp(
+            prefix="output-", suffix=".log", dir=directory
+        )
+        self._file = os.fdopen(fd, "w+b")
+        self.max_bytes = max_bytes
+        narrow = max_bytes is not None and max_bytes < 2**32
+        self._typecode = "I" if narrow and array("I").itemsize >= 4 else "Q"
+        self.offsets = array(self._typecode)
+        self.full = False
+        self.size = 0
+        self._map: Optional[mmap.mmap] = None
+        self._mapped = 0
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def extend(self, lines: Iterable[str]) -> int:
+        """Write *lines*; return how many fit below ``max_bytes``."""
+        if self.full:
+            return 0
+        parts: List[bytes] = []
+        offsets = array(self._typecode)
+        size = self.size
+        limit = self.max_bytes
+        for line in lines:
+            data = line.encode("utf-8", "replace") + b"\n"
+            if limit is not None and size + len(data) > limit:
+                self.full = True
+                break
+            offsets.append(size)
+            size += len(data)
+            parts.append(data)
+        if not parts:
+            return 0
+        try:
+            self._file.write(b"".join(parts))
+        except OSError:
+            # Keep the file in step with the index (for example on ENOSPC).
+            self._file.seek(self.size)
+            self._file.truncate()
+            raise
+        self.offsets.extend(offsets)
+        self.size = size
+        return len(parts)
+
+    def _view(self) -> mmap.mmap:
+        """The mapping, remapped when lines were written since the last one."""
+        if self._map is None or self._mapped < self.size:
+            self._file.flush()
+            if self._map is not None:
+                self._map.close()
+            self._map = mmap.mmap(
+                self._file.fileno(), self.size, access=mmap.ACCESS_READ
+            )
+            self._mapped = self.size
+        return self._map
+
+    def _span(self, index: int) -> tuple:
+        start = self.offsets[index]
+        end = self.offsets[index + 1] if index + 1 < len(self.offsets) else self.size
+        return start, end - 1  # drop the newline
+
+    def line(self, index: int) -> str:
+        start, end = self._span(index)
+        return self._view()[start:end].decode("utf-8", "replace")
+
+    def find(self, text: str, start: int, backwards: bool = False) -> Optional[int]:
+        """Index of the first line from *start* (or before it) containing *text*."""
+        count = len(self.offsets)
+        if not text or not count:
+            return None
+        needle = text.encode("utf-8", "replace")
+        view = self._view()
+        if backwards:
+            if start < 0:
+                return None
+            limit = self._span(min(start, count - 1))[1]
+            pos = view.rfind(needle, 0, limit)
+        else:
+            if start >= count:
+                return None
+            pos = view.find(needle, self.offsets[max(0, start)])
+        if pos < 0:
+            return None
+        return bisect_right(self.offsets, pos) - 1
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        try:
+            self._file.close()
+        except OSError:
+            pass
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+
+class OutputBuffer:
+    """Keep the newest lines of a command's output within line and byte caps.
+
+    Lines live in fixed-size chunks, so appending and evicting from the front
+    are O(1) per line and a row lookup is O(1) arithmetic. ``total`` counts
+    every line ever appended and ``dropped`` those evicted to stay under
+    ``max_lines`` / ``max_bytes``. With a ``spill_dir``, reaching a cap moves
+    everything into a ``SpillFile`` there instead and nothing is dropped;
+    the buffer falls back to evicting if the file cannot be written. Once
+    the file reaches ``spill_max_bytes`` later lines are not kept and
+    ``truncated`` counts them.
+
+    Like the list it replaces, it supports ``len`` and integer or slice
+    indexing, so the renderer copies only the rows on screen. It is not
+    thread-safe; the navigator's popup lock guards it.
+    """
+
+    CHUNK_LINES = 1024
+
+    def __init__(
+        self,
+        max_lines: int = 50_000,
+        max_bytes: int = 16 * 1024 * 1024,
+        spill_dir: Optional[str] = None,
+        spill_max_bytes: int = 1024 * 1024 * 1024,
+    ):
+        self.max_lines = max(1, max_lines)
+        self.max_bytes = max(1, max_bytes)
+        self.spill_dir = spill_dir
+        self.spill_max_bytes = max(1, spill_max_bytes)
+        self.spill: Optional[SpillFile] = None
+        self._chunks: Deque[List[str]] = deque()
+        # Lines already evicted from the front of the first chunk.
+        self._head = 0
+        self._count = 0
+        self.bytes = 0
+        self.total = 0
+        self.dropped = 0
+        self.truncated = 0
+
+    @staticmethod
+    def _size(line: str) -> int:
+        # ``isascii`` is O(1) on CPython strings; only non-ASCII lines encode.
+        if line.isascii():
+            return len(line) + 1
+        return len(line.encode("utf-8", "replace")) + 1
+
+    def append(self, line: str) -> None:
+        if self.spill is not None:
+            self._spill_extend([line])
+            return
+        chunks = self._chunks
+        if not chunks or len(chunks[-1]) >= self.CHUNK_LINES:
+            chunks.append([])
+        chunks[-1].append(line)
+        self._count += 1
+        self.total += 1
+        self.bytes += self._size(line)
+        if self._count > self.max_lines or self.bytes > self.max_bytes:
+            if self.spill_dir is not None and self._start_spill():
+                return
+            while self._count > 1 and (
+                self._count > self.max_lines or self.bytes > self.max_bytes
+            ):
+                self._evict_one()
+
+    def extend(self, lines: Iterable[str]) -> None:
+        if self.spill is not None:
+            self._spill_extend(lines)
+            return
+        remaining = iter(lines)
+        for line in remaining:
+            self.append(line)
+            if self.spill is not None:
+                self._spill_extend(remaining)
+                return
+
+    def _start_spill(self) -> bool:
+        spill: Optional[SpillFile] = None
+        try:
+            spill = SpillFile(
+                self.spill_dir, self.spill_max_bytes  # type: ignore[arg-type]
+            )
+            written = spill.extend(self)
+        except OSError:
+            if spill is not None:
+                spill.close()
+            self.spill_dir = None
+            return False
+        self.spill = spill
+        self.truncated += self._count - written
+        self._chunks.clear()
+        self._head = 0
+        self._count = 0
+        self.bytes = 0
+        return True
+
+    def _spill_extend(self, lines: Iterable[str]) -> None:
+        spill = self.spill
+        assert spill is not None
+        batch = list(lines)
+        self.total += len(batch)
+        try:
+            self.truncated += len(batch) - spill.extend(batch)
+        except OSError:
+            self.dropped += len(batch)
+
+    def _evict_one(self) -> None:
+        first = self._chunks[0]
+        self.bytes -= self._size(first[self._head])
+        self._head += 1
+        self._count -= 1
+        self.dropped += 1
+        if self._head >= len(first):
+            self._chunks.popleft()
+            self._head = 0
+
+    def close(self) -> None:
+        """Release the spill file, if any; the buffer is empty afterwards."""
+        self.clear()
+
+    def clear(self) -> None:
+        if self.spill is not None:
+            self.spill.close()
+            self.spill = None
+        self._chunks.clear()
+        self._head = 0
+        self._count = 0
+        self.bytes = 0
+        self.total = 0
+        self.dropped = 0
+        self.truncated = 0
+
+    def __len__(self) -> int:
+        if self.spill is not None:
+            return len(self.spill)
+        return self._count
+
+    def _line(self, index: int) -> str:
+        if self.spill is not None:
+            return self.spill.line(index)
+        position = self._head + index
+        chunk, offset = divmod(position, self.CHUNK_LINES)
+        return self._chunks[chunk][offset]
+
+    def __getitem__(self, index):
+        count = len(self)
+        if isinstance(index, slice):
+            start, stop, step = index.indices(count)
+            return [self._line(i) for i in range(start, stop, step)]
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError("output line out of range")
+        return self._line(index)
+
+    def __iter__(self) -> Iterator[str]:
+        if self.spill is not None:
+            for index in range(len(self.spill)):
+                yield self.spill.line(index)
+            return
+        for idx, chunk in enumerate(self._chunks):
+            yield from (chunk[self._head :] if idx == 0 else chunk)
+
+    def find(self, text: str, start: int, backwards: bool = False) -> Optional[int]:
+        """Index of the nearest line at or after (before) *start* with *text*."""
+        if self.spill is not None:
+            return self.spill.find(text, start, backwards)
+        if not text:
+            return None
+        if backwards:
+            indices = range(min(start, self._count - 1), -1, -1)
+        else:
+            indices = range(max(0, start), self._count)
+        for index in indices:
+            if text in self._line(index):
+                return index
+        return None
+
+    def __repr__(self) -> str:
+        return f"OutputBuffer({len(self)} lines, {self.dropped} dropped)"
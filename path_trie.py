@@ -0,0 +1,236 @@
+"""Path-component trie for caches keyed by absolute paths."""
+
+from __future__ import annotations
+
+import os
+from collections.abc import MutableSet
+from typing import Dict, Generic, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+_MISSING = object()
+
+
+class _Node:
+    __slots__ = ("children", "value")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.value = _MISSING
+
+
+class PathTrie(Generic[V]):
+    """Map absolute paths to values with one node per path component.
+
+    Lookups, inserts and longest-prefix queries cost O(depth) regardless of how
+    many paths are stored, which keeps per-directory caches flat as a session
+    visits more of the filesystem.
+    """
+
+    def __init__(self):
+        self._root = _Node()
+        self._size = 0
+
+    @staticmethod
+    def split(path: str) -> List[str]:
+        return [part for part in path.split(os.sep) if part]
+
+    @staticmethod
+    def join(parts: List[str]) -> str:
+        return os.sep + os.sep.join(parts)
+
+    def _find(self, path: str) -> Optional[_Node]:
+        node = self._root
+        for part in self.split(path):
+            node = node.children.get(part)
+            if node is None:
+                return None
+        return node
+
+    def get(self, path: str, default: Optional[V] = None) -> Optional[V]:
+        node = self._find(path)
+        if node is None or node.value is _MISSING:
+            return default
+        return node.value  # type: ignore[return-value]
+
+    def __getitem__(self, path: str) -> V:
+        node = self._find(path)
+        if node is None or node.value is _MISSING:
+            raise KeyError(path)
+        return node.value  # type: ignore[return-value]
+
+    def __setitem__(self, path: str, value: V) -> None:
+        node = self._root
+        for part in self.split(path):
+            child = node.children.get(part)
+            if child is None:
+                child = node.children[part] = _Node()
+            node = child
+        if node.value is _MISSING:
+            self._size += 1
+        node.value = value
+
+    def __contains__(self, path: object) -> bool:
+        if not isinstance(path, str):
+            return False
+        node = self._find(path)
+        return node is not None and node.value is not _MISSING
+
+    def __delitem__(self, path: str) -> None:
+        if self.pop(path, _MISSING) is _MISSING:  # type: ignore[arg-type]
+            raise KeyError(path)
+
+    def pop(self, path: str, default: Optional[V] = None) -> Optional[V]:
+        """Remove *path* and return its value, pruning emptied branches."""
+        trail: List[Tuple[_Node, str]] = []
+        node = self._root
+        for part in self.split(path):
+            child = node.children.get(part)
+            if child is None:
+                return default
+            trail.append((node, part))
+            node = child
+        if node.value is _MISSING:
+            return default
+        value = node.value
+        node.value = _MISSING
+        self._size -= 1
+        while trail and not node.children and node.value is _MISSING:
+            parent, part = trail.pop()
+            del parent.children[part]
+            node = parent
+        return value  # type: ignore[return-value]
+
+    def pop_subtree(self, path: str) -> List[str]:
+        """Remove *path* and everything stored below it; return their paths."""
+        parts = self.split(path)
+        if not parts:
+            removed = list(self)
+            self.clear()
+            return removed
+        trail: List[Tuple[_Node, str]] = []
+        node = self._root
+        for part in parts:
+            child = node.children.get(part)
+            if child is None:
+                return []
+            trail.append((node, part))
+            node = child
+        removed = list(self._walk(node, parts))
+        parent, part = trail.pop()
+        del parent.children[part]
+        while trail and not parent.children and parent.value is _MISSING:
+            node = parent
+            parent, part = trail.pop()
+            del parent.children[part]
+        self._size -= len(removed)
+        return removed
+
+    def has_descendants(self, path: str) -> bool:
+        """Whether any path strictly below *path* is stored.
+
+        Emptied branches are pruned on removal, so any child node leads to a
+        stored value.
+        """
+        node = self._find(path)
+        return node is not None and bool(node.children)
+
+    def _walk(self, node: _Node, parts: List[str]) -> Iterator[str]:
+        stack: List[Tuple[_Node, List[str]]] = [(node, parts)]
+        while stack:
+            current, current_parts = stack.pop()
+            if current.value is not _MISSING:
+                yield self.join(current_parts)
+            for part, child in current.children.items():
+                stack.append((child, current_parts + [part]))
+
+    def longest_prefix(self, path: str) -> Optional[Tuple[str, V]]:
+        """Return ``(prefix, value)`` for the deepest stored ancestor-or-self."""
+        node = self._root
+        parts = self.split(path)
+        best: Optional[Tuple[int, object]] = None
+        if node.value is not _MISSING:
+            best = (0, node.value)
+        for depth, part in enumerate(parts, start=1):
+            node = node.children.get(part)
+            if node is None:
+                break
+            if node.value is not _MISSING:
+                best = (depth, node.value)
+        if best is None:
+            return None
+        return self.join(parts[: best[0]]), best[1]  # type: ignore[return-value]
+
+    def clear(self) -> None:
+        self._root = _Node()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[str]:
+        return self._walk(self._root, [])
+
+
+class ExpandedNodeSet(MutableSet):
+    """Set of expanded directory paths with trie-backed subtree operations.
+
+    Membership and iteration use a plain ``set``; a ``PathTrie`` mirrors it so
+    removing a subtree or asking whether anything below a path is expanded
+    costs O(depth) plus the size of the subtree, not a scan of every path.
+    ``version`` counts mutations so display caches can tell when expansions
+    changed. Paths are expected in normalized absolute form.
+    """
+
+    def __init__(self, paths: Iterable[str] = ()):
+        self._members: set = set()
+        self._trie: PathTrie[bool] = PathTrie()
+        self.version = 0
+        for path in paths:
+            self.add(path)
+
+    def __contains__(self, path: object) -> bool:
+        return path in self._members
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._members)
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    def __repr__(self) -> str:
+        return f"ExpandedNodeSet({sorted(self._members)!r})"
+
+    def add(self, path: str) -> None:
+        if path not in self._members:
+            self._members.add(path)
+            self._trie[path] = True
+            self.version += 1
+
+    def discard(self, path: str) -> None:
+        if path in self._members:
+            self._members.discard(path)
+            self._trie.pop(path)
+            self.version += 1
+
+    def clear(self) -> None:
+        if self._members:
+            self._members.clear()
+            self._trie.clear()
+            self.version += 1
+
+    def update(self, paths: Iterable[str]) -> None:
+        for path in paths:
+            self.add(path)
+
+    def discard_subtree(self, path: str) -> int:
+        """Remove *path* and every expanded path under it; return how many."""
+        removed = self._trie.pop_subtree(path)
+        if removed:
+            self._members.difference_update(removed)
+            self.version += 1
+        return len(removed)
+
+    def has_descendants(self, path: str) -> bool:
+        """Whether some path strictly below *path* is expanded."""
+        return self._trie.has_descendants(path)
@@ -0,0 +1,69 @@
+"""Speculative directory listing ahead of navigation."""
+
+from __future__ import annotations
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterable, List
+
+
+class ListingPrefetcher:
+    """List likely navigation targets on a small thread pool.
+
+    ``schedule`` replaces the wanted set: queued prefetches for paths that are
+    no longer wanted are cancelled, and at most ``max_pending`` paths are kept
+    queued. Listings land in ``DirectoryManager``'s cache, so entering a
+    prefetched directory is a stamp check instead of a scan.
+    """
+
+    def __init__(self, dir_manager, *, max_workers: int = 2, max_pending: int = 8):
+        self.dir_manager = dir_manager
+        self.max_pending = max(1, max_pending)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, max_workers), thread_name_prefix="o-prefetch"
+        )
+        self._futures: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def schedule(self, paths: Iterable[str]) -> None:
+        """Prefetch *paths*, most wanted first, dropping stale requests."""
+        wanted: List[str] = []
+        for path in paths:
+            if path not in wanted:
+                wanted.append(path)
+            if len(wanted) >= self.max_pending:
+                break
+
+        with self._lock:
+            if self._closed:
+                return
+            for path, future in list(self._futures.items()):
+                if future.done():
+                    del self._futures[path]
+                elif path not in wanted and future.cancel():
+                    del self._futures[path]
+            for path in wanted:
+                if path in self._futures:
+                    continue
+                self._futures[path] = self._executor.submit(self._prefetch, path)
+
+    def pending(self) -> int:
+        with self._lock:
+            return sum(1 for future in self._futures.values() if not future.done())
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            futures = list(self._futures.values())
+            self._futures.clear()
+        for future in futures:
+            future.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _prefetch(self, path: str) -> None:
+        try:
+            self.dir_manager.prefetch(path)
+        except Exception:
+            # Prefetching is best effort; the real listing reports errors.
+            pass
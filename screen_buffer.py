@@ -0,0 +1,76 @@
+"""Row-level shadow of the terminal for diffed redraws."""
+
+from __future__ import annotations
+
+import curses
+from typing import Any, Dict, Optional, Tuple
+
+
+class ShadowScreen:
+    """Remember the ``(text, attr)`` last written to each row.
+
+    ``put`` and ``put_runs`` skip rows whose content is unchanged, so a frame
+    that only moves the cursor rewrites the two rows involved and the status
+    bar rather than the whole window. ``begin`` erases and forgets everything
+    when the window size changed or ``invalidate`` was called, for example
+    after prompts or other views drew over the rows.
+    """
+
+    def __init__(self):
+        self._rows: Dict[int, Tuple[Any, ...]] = {}
+        self._size: Optional[Tuple[int, int]] = None
+        self._stale = True
+
+    def invalidate(self) -> None:
+        self._stale = True
+
+    def begin(self, stdscr: Any, max_y: int, max_x: int) -> None:
+        if not self._stale and self._size == (max_y, max_x):
+            return
+        self._rows.clear()
+        self._size = (max_y, max_x)
+        self._stale = False
+        try:
+            stdscr.erase()
+        except curses.error:
+            pass
+
+    def put(self, stdscr: Any, y: int, text: str, attr: int = 0) -> bool:
+        """Draw *text* on row *y* unless it is already there; report writes."""
+        content = (text, attr)
+        if self._rows.get(y) == content:
+            return False
+        self._rows[y] = content
+        try:
+            stdscr.move(y, 0)
+            stdscr.clrtoeol()
+            if text:
+                stdscr.addstr(y, 0, text, attr)
+        except curses.error:
+            pass
+        return True
+
+    def put_runs(
+        self, stdscr: Any, y: int, runs: Tuple[Tuple[int, str, int], ...]
+    ) -> bool:
+        """Like ``put`` for a row of ``(x, text, attr)`` runs."""
+        content = ("runs", runs)
+        if self._rows.get(y) == content:
+            return False
+        self._rows[y] = content
+        self.write_runs(stdscr, y, runs)
+        return True
+
+    @staticmethod
+    def write_runs(stdscr: Any, y: int, runs: Tuple[Tuple[int, str, int], ...]) -> None:
+        try:
+            stdscr.move(y, 0)
+            stdscr.clrtoeol()
+        except curses.error:
+            return
+        for x, text, attr in runs:
+            try:
+                stdscr.addstr(y, x, text, attr)
+            except curses.error:
+                # The bottom-right cell raises after drawing; keep going.
+                pass
@@ -129,3 +129,51 @@ def test_normalize_executors_with_fallbacks(monkeypatch):
     assert executors_spec.shell == ["/bin/dash", "-c"]
     assert any("Invalid python executor" in w for w in warnings)
     assert any("Invalid shell executor" in w for w in warnings)
+
+
+def test_load_user_config_expand_all_limits(tmp_path: Path, monkeypatch):
+    cfg_path = tmp_path / "config.json"
+    cfg_path.write_text(
+        json.dumps({"expand_all_max_depth": 3, "expand_all_max_nodes": 0}),
+        encoding="utf-8",
+    )
+    monkeypatch.setattr(config, "_config_path", lambda: str(cfg_path), raising=False)
+
+    user_config = config.load_user_config()
+
+    assert user_config.expand_all_max_depth == 3
+    assert user_config.expand_all_max_nodes == config.UserConfig().expand_all_max_nodes
+    assert any("expand_all_max_nodes" in warning for warning in user_config.warnings)
+
+
+def test_load_user_config_matrix_frame_rates(tmp_path: Path, monkeypatch):
+    cfg_path = tmp_path / "config.json"
+    cfg_path.write_text(
+        json.dumps({"matrix_fps": 15, "matrix_idle_fps": "1", "matrix_cpu_budget": 400}),
+        encoding="utf-8",
+    )
+    monkeypatch.setattr(config, "_config_path", lambda: str(cfg_path), raising=False)
+
+    user_config = config.load_user_config()
+
+    assert user_config.matrix_fps == 15
+    assert user_config.matrix_idle_fps == config.UserConfig().matrix_idle_fps
+    assert user_config.matrix_idle_seconds == config.UserConfig().matrix_idle_seconds
+    assert user_config.matrix_cpu_budget == 100
+    assert any("matrix_idle_fps" in warning for warning in user_config.warnings)
+    assert any("matrix_cpu_budget" in warning for warning in user_config.warnings)
+
+
+def test_load_user_config_popup_spill_limit(tmp_path: Path, monkeypatch):
+    cfg_path = tmp_path / "config.json"
+    cfg_path.write_text(
+        json.dumps({"popup_spill_max_bytes": 4096, "popup_max_bytes": 0}),
+        encoding="utf-8",
+    )
+    monkeypatch.setattr(config, "_config_path", lambda: str(cfg_path), raising=False)
+
+    user_config = config.load_user_config()
+
+    assert user_config.popup_spill_max_bytes == 4096
+    assert user_config.popup_max_bytes == config.UserConfig().popup_max_bytes
+    assert any("popup_max_bytes" in warning for warning in user_config.warnings)
@@ -0,0 +1,232 @@
+import os
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from core_navigator import FileNavigator
+
+
+def _count_listings(monkeypatch, nav):
+    calls = []
+    real_list_directory = nav.dir_manager.list_directory
+
+    def counting(path, **kwargs):
+        calls.append(path)
+        return real_list_directory(path, **kwargs)
+
+    monkeypatch.setattr(nav.dir_manager, "list_directory", counting)
+    return calls
+
+
+def test_display_items_are_memoized_within_a_tick(tmp_path, monkeypatch):
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "mod.py").write_text("x")
+    (tmp_path / "notes.txt").write_text("x")
+    nav = FileNavigator(str(tmp_path))
+    calls = _count_listings(monkeypatch, nav)
+
+    first = nav.build_display_items()
+    assert nav.build_display_items() is first
+    nav.begin_tick()
+    assert nav.build_display_items() is first
+    assert len(calls) == 1
+
+    nav.expanded_nodes.add(str(tmp_path / "pkg"))
+    expanded = nav.build_display_items()
+    assert [row[0] for row in expanded] == ["pkg", "mod.py", "notes.txt"]
+
+    nav.dir_manager.filter_pattern = "n"
+    assert [row[0] for row in nav.build_display_items()] == ["notes.txt"]
+
+
+def test_prefetching_a_hidden_directory_keeps_the_memo(tmp_path):
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "mod.py").write_text("x")
+    (tmp_path / "other").mkdir()
+    nav = FileNavigator(str(tmp_path))
+
+    first = nav.build_display_items()
+    nav.dir_manager.prefetch(str(tmp_path / "other"))
+    nav.begin_tick()
+    assert nav.build_display_items() is first
+
+    # A listing that is shown does invalidate it once replaced.
+    nav.dir_manager.refresh_cache(str(tmp_path))
+    assert nav.build_display_items() is not first
+
+
+def test_display_items_notice_disk_changes_on_the_next_tick(tmp_path):
+    (tmp_path / "a.txt").write_text("a")
+    nav = FileNavigator(str(tmp_path))
+    assert [row[0] for row in nav.build_display_items()] == ["a.txt"]
+
+    (tmp_path / "b.txt").write_text("b")
+    os.utime(tmp_path, ns=(0, os.stat(tmp_path).st_mtime_ns + 1_000_000))
+    assert [row[0] for row in nav.build_display_items()] == ["a.txt"]
+
+    nav.begin_tick()
+    assert [row[0] for row in nav.build_display_items()] == ["a.txt", "b.txt"]
+
+
+def _rebuilt(nav):
+    nav._display_cache = None
+    return nav.build_display_items()
+
+
+def test_expand_and_collapse_splice_only_the_changed_subtree(tmp_path, monkeypatch):
+    for parent in ("a", "b", "c"):
+        (tmp_path / parent / "inner").mkdir(parents=True)
+        (tmp_path / parent / "inner" / "leaf.txt").write_text("x")
+        (tmp_path / parent / "file.txt").write_text("x")
+    nav = FileNavigator(str(tmp_path))
+    nav.expanded_nodes.add(str(tmp_path / "a"))
+    nav.expanded_nodes.add(str(tmp_path / "b" / "inner"))
+    rows = nav.build_display_items()
+    b_index = [row[2] for row in rows].index(str(tmp_path / "b"))
+    calls = _count_listings(monkeypatch, nav)
+
+    nav.expand_node(str(tmp_path / "b"), b_index)
+    spliced = nav.build_display_items()
+    assert calls == [str(tmp_path / "b"), str(tmp_path / "b" / "inner")]
+    assert [row[0] for row in rows] == ["a", "inner", "file.txt", "b", "c"]
+    assert spliced == _rebuilt(nav)
+
+    nav.collapse_node(str(tmp_path / "a"), 0)
+    collapsed = nav.build_display_items()
+    assert [row[0] for row in collapsed] == [
+        "a", "b", "inner", "leaf.txt", "file.txt", "c",
+    ]
+    assert collapsed == _rebuilt(nav)
+
+
+def test_expand_all_runs_in_background_and_applies_on_tick(tmp_path):
+    (tmp_path / "pkg" / "sub").mkdir(parents=True)
+    (tmp_path / "pkg" / "sub" / "leaf.py").write_text("x")
+    nav = FileNavigator(str(tmp_path))
+
+    nav.start_expand_all()
+    job = nav.expand_job
+    assert job is not None and job.wait(5)
+    assert nav.apply_expand_progress()
+
+    assert nav.expand_job is None
+    assert [row[0] for row in nav.build_display_items()] == ["pkg", "sub", "leaf.py"]
+    assert nav.status_message == "Expanded 2 directories"
+
+
+def test_changing_directory_cancels_expand_all(tmp_path):
+    (tmp_path / "pkg").mkdir()
+    nav = FileNavigator(str(tmp_path))
+
+    nav.start_expand_all()
+    job = nav.expand_job
+    nav.change_directory(str(tmp_path / "pkg"))
+
+    assert nav.expand_job is None
+    assert job.cancelled
+
+
+def test_reveal_and_toggle_find_rows_by_path(tmp_path, monkeypatch):
+    for name in ("a", "b", "c"):
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "inner.txt").write_text("x")
+    nav = FileNavigator(str(tmp_path), reveal_path=str(tmp_path / "c"))
+    assert nav.browser_selected == 2
+
+    nav.expanded_nodes.add(str(tmp_path / "a"))
+    nav.expanded_nodes.add(str(tmp_path / "b"))
+    items = nav.build_display_items()
+    nav.browser_selected = items.index_of(str(tmp_path / "b" / "inner.txt"))
+    assert nav.browser_selected == 3
+
+    def fail(*_args, **_kwargs):
+        raise AssertionError("rows should be found without realpath scans")
+
+    monkeypatch.setattr(os.path, "realpath", fail)
+    nav.input_handler._toggle_inline_expansion(items[nav.browser_selected], items)
+
+    assert nav.browser_selected == 2
+    assert [row[0] for row in nav.build_display_items()] == [
+        "a", "inner.txt", "b", "c",
+    ]
+
+
+def test_streamed_batches_keep_the_selection_on_its_path(tmp_path, monkeypatch):
+    from directory_manager import DirectoryManager
+
+    for index in range(300):
+        (tmp_path / f"f{index:03d}.txt").write_text("x")
+    monkeypatch.setattr(DirectoryManager, "STREAM_SYNC_SECONDS", 0)
+    monkeypatch.setattr(DirectoryManager, "STREAM_CHECK_EVERY", 20)
+    monkeypatch.setattr(DirectoryManager, "STREAM_PUBLISH_SECONDS", 0)
+    nav = FileNavigator(str(tmp_path))
+    nav.begin_tick()
+    partial = nav.build_display_items()
+    assert len(partial) < 300
+    nav.browser_selected = len(partial) - 1
+    selected_path = partial[nav.browser_selected][2]
+
+    manager = nav.dir_manager
+    deadline = time.monotonic() + 5
+    while manager.scan_progress(manager.current_path) is not None:
+        assert time.monotonic() < deadline, "stream did not finish"
+        time.sleep(0.01)
+    nav.begin_tick()
+    assert nav.apply_listing_progress()
+
+    rows = nav.build_display_items()
+    assert len(rows) == 300
+    assert nav.browser_selected != len(partial) - 1
+    assert rows[nav.browser_selected][2] == selected_path
+    assert not nav.apply_listing_progress()
+
+
+def test_watcher_events_rescan_only_changed_directories(tmp_path, monkeypatch):
+    import directory_manager
+
+    (tmp_path / "a.txt").write_text("a")
+    nav = FileNavigator(str(tmp_path))
+    nav.build_display_items()
+    scans = []
+    real_scandir = directory_manager.os.scandir
+
+    def counting_scandir(path):
+        scans.append(path)
+        return real_scandir(path)
+
+    monkeypatch.setattr(directory_manager.os, "scandir", counting_scandir)
+
+    # A chmod-style event leaves the directory stamp, and the listing, alone.
+    nav.queue_external_change(str(tmp_path))
+    nav.begin_tick()
+    assert nav.apply_external_changes()
+    assert scans == []
+
+    (tmp_path / "b.txt").write_text("b")
+    os.utime(tmp_path, ns=(0, os.stat(tmp_path).st_mtime_ns + 1_000_000))
+    nav.queue_external_change(str(tmp_path))
+    nav.begin_tick()
+    assert nav.apply_external_changes()
+    assert [row[0] for row in nav.build_display_items()] == ["a.txt", "b.txt"]
+    assert len(scans) == 1
+    assert not nav.apply_external_changes()
+
+
+def test_only_directories_on_screen_are_watched(tmp_path):
+    for name in ("a", "b", "c"):
+        (tmp_path / name).mkdir()
+    nav = FileNavigator(str(tmp_path))
+    watched = []
+    nav.fs_watcher = SimpleNamespace(max_watches=2, watch=watched.append)
+    nav.expanded_nodes.add(str(tmp_path / "a"))
+    nav.expanded_nodes.add(str(tmp_path / "b"))
+
+    nav.build_display_items()
+    nav.dir_manager.prefetch(str(tmp_path / "c"))
+    nav.fs_watcher = None
+
+    # Capped at max_watches, with the current directory watched last.
+    assert watched == [str(tmp_path / "a"), str(tmp_path)]
@@ -8,6 +8,7 @@ import pytest
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
 from directory_manager import DirectoryManager
+from git_repo import GitignoreMatcher
 
 
 def _git(repo: Path, *args: str) -> None:
@@ -57,3 +58,38 @@ def test_directory_manager_applies_parent_repo_gitignore_from_nested_directory(t
     manager = DirectoryManager(str(nested))
 
     assert [name for name, _is_dir in manager.get_items()] == ["src", "README.md"]
+
+
+@pytest.mark.skipif(
+    not shutil.which("git"), reason="git is required for gitignore integration tests"
+)
+def test_directory_manager_reuses_check_ignore_process_per_repo(tmp_path, monkeypatch):
+    # Force the git fallback used when the in-process matcher bails out.
+    monkeypatch.setattr(GitignoreMatcher, "ignored_names", lambda *_args: None)
+    repo = tmp_path
+    _git(repo, "init")
+    (repo / ".gitignore").write_text("*.log\n!keep.log\nbuild/\n", encoding="utf-8")
+    (repo / "build").mkdir()
+    (repo / "build" / "out.bin").write_text("x", encoding="utf-8")
+    (repo / "pkg").mkdir()
+    (repo / "pkg" / "debug.log").write_text("x", encoding="utf-8")
+    (repo / "pkg" / "keep.log").write_text("x", encoding="utf-8")
+
+    manager = DirectoryManager(str(repo))
+    try:
+        assert [e.name for e in manager.list_directory(str(repo / "pkg"))] == [
+            "keep.log"
+        ]
+        process = manager._git_ignore_procs[str(repo.resolve())]
+        # Navigating into an ignored directory still shows what is inside it.
+        assert [e.name for e in manager.list_directory(str(repo / "build"))] == [
+            "out.bin"
+        ]
+        assert manager._git_ignore_procs[str(repo.resolve())] is process
+
+        (repo / ".gitignore").write_text("*.log\n", encoding="utf-8")
+        manager.refresh_cache()
+        assert manager.list_directory(str(repo / "pkg")) == []
+    finally:
+        manager.close()
+    assert manager._git_ignore_procs == {}
@@ -0,0 +1,162 @@
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import directory_manager
+from directory_manager import DirectoryManager, ListingEntry
+
+
+def test_list_directory_uses_scandir_type_info(tmp_path, monkeypatch):
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "notes.txt").write_text("x")
+    (tmp_path / "linked").symlink_to(tmp_path / "pkg")
+    (tmp_path / "dangling").symlink_to(tmp_path / "missing")
+
+    def fail(*_args, **_kwargs):
+        raise AssertionError("per-entry os.path probes should not run")
+
+    monkeypatch.setattr(directory_manager.os.path, "exists", fail)
+    monkeypatch.setattr(directory_manager.os.path, "isdir", fail)
+
+    manager = DirectoryManager(str(tmp_path))
+    items = manager.list_directory(str(tmp_path))
+
+    assert all(isinstance(item, ListingEntry) for item in items)
+    assert [(name, is_dir) for name, is_dir in items] == [
+        ("linked", True),
+        ("pkg", True),
+        ("notes.txt", False),
+    ]
+
+
+def test_mtime_sort_reuses_entry_stat(tmp_path):
+    older = tmp_path / "older.txt"
+    newer = tmp_path / "newer.txt"
+    older.write_text("old")
+    newer.write_text("new")
+    os.utime(older, (1_000, 1_000))
+    os.utime(newer, (2_000, 2_000))
+
+    manager = DirectoryManager(str(tmp_path))
+    manager.set_sort_mode("mtime_desc")
+
+    items = manager.get_items()
+    assert [item.name for item in items] == ["newer.txt", "older.txt"]
+    assert items[0].mtime() == 2_000
+
+
+def _count_scans(monkeypatch):
+    calls = []
+    real_scandir = directory_manager.os.scandir
+
+    def counting_scandir(path):
+        calls.append(path)
+        return real_scandir(path)
+
+    monkeypatch.setattr(directory_manager.os, "scandir", counting_scandir)
+    return calls
+
+
+def test_cached_listing_is_revalidated_by_directory_stamp(tmp_path, monkeypatch):
+    (tmp_path / "a.txt").write_text("a")
+    calls = _count_scans(monkeypatch)
+    manager = DirectoryManager(str(tmp_path))
+
+    assert [item.name for item in manager.get_items()] == ["a.txt"]
+    assert [item.name for item in manager.get_items()] == ["a.txt"]
+    assert len(calls) == 1
+
+    (tmp_path / "b.txt").write_text("b")
+    os.utime(tmp_path, ns=(0, os.stat(tmp_path).st_mtime_ns + 1_000_000))
+
+    assert [item.name for item in manager.get_items()] == ["a.txt", "b.txt"]
+    assert len(calls) == 2
+
+
+def test_hidden_toggle_and_sort_change_reuse_cached_scan(tmp_path, monkeypatch):
+    (tmp_path / ".hidden").write_text("h")
+    (tmp_path / "visible.txt").write_text("v")
+    calls = _count_scans(monkeypatch)
+    manager = DirectoryManager(str(tmp_path))
+
+    assert [item.name for item in manager.get_items()] == ["visible.txt"]
+    manager.toggle_hidden()
+    assert [item.name for item in manager.get_items()] == ["visible.txt", ".hidden"]
+    manager.set_sort_mode("mtime_asc")
+    manager.get_items()
+
+    assert len(calls) == 1
+
+
+def _wait_for_scan(manager, path):
+    deadline = time.monotonic() + 5
+    while manager.scan_progress(path) is not None:
+        assert time.monotonic() < deadline, "stream did not finish"
+        time.sleep(0.01)
+
+
+def test_large_directory_streams_in_background_and_merges_sorted(tmp_path, monkeypatch):
+    for index in range(300):
+        (tmp_path / f"f{index:03d}.txt").write_text("x")
+    monkeypatch.setattr(DirectoryManager, "STREAM_SYNC_SECONDS", 0)
+    monkeypatch.setattr(DirectoryManager, "STREAM_CHECK_EVERY", 20)
+    monkeypatch.setattr(DirectoryManager, "STREAM_PUBLISH_SECONDS", 0)
+    manager = DirectoryManager(str(tmp_path))
+    progress = []
+    manager.stream_observer = progress.append
+
+    partial = manager.get_items()
+    assert 20 <= len(partial) <= 300
+    assert [e.name for e in partial] == sorted(e.name for e in partial)
+
+    _wait_for_scan(manager, str(tmp_path))
+    names = [e.name for e in manager.get_items()]
+    assert names == [f"f{index:03d}.txt" for index in range(300)]
+    assert progress and set(progress) == {str(tmp_path.resolve())}
+
+
+def test_cancelled_scan_keeps_partial_listing_until_directory_changes(
+    tmp_path, monkeypatch
+):
+    for index in range(200):
+        (tmp_path / f"f{index:03d}.txt").write_text("x")
+    monkeypatch.setattr(DirectoryManager, "STREAM_SYNC_SECONDS", 0)
+    monkeypatch.setattr(DirectoryManager, "STREAM_CHECK_EVERY", 10)
+    real_from_dir_entry = ListingEntry.from_dir_entry.__func__
+
+    def slow_from_dir_entry(cls, dir_entry):
+        if threading.current_thread() is not threading.main_thread():
+            time.sleep(0.005)
+        return real_from_dir_entry(cls, dir_entry)
+
+    monkeypatch.setattr(ListingEntry, "from_dir_entry", classmethod(slow_from_dir_entry))
+    manager = DirectoryManager(str(tmp_path))
+
+    first = manager.get_items()
+    kept = manager.cancel_scan(str(tmp_path))
+    assert kept is not None and kept < 200
+    assert manager.scan_progress(str(tmp_path)) is None
+    time.sleep(0.05)
+    assert len(manager.get_items()) == kept >= len(first)
+
+    manager.discard_partial_listings()
+    monkeypatch.setattr(DirectoryManager, "STREAM_SYNC_SECONDS", 60)
+    assert len(manager.get_items()) == 200
+
+
+def test_listing_cache_evicts_least_recently_used(tmp_path, monkeypatch):
+    for name in ("a", "b", "c"):
+        (tmp_path / name).mkdir()
+    monkeypatch.setattr(DirectoryManager, "MAX_CACHED_LISTINGS", 2)
+    manager = DirectoryManager(str(tmp_path))
+
+    manager.list_directory(str(tmp_path / "a"))
+    manager.list_directory(str(tmp_path / "b"))
+    manager.list_directory(str(tmp_path / "a"))
+    manager.list_directory(str(tmp_path / "c"))
+
+    assert list(manager._cache) == [str(tmp_path / "a"), str(tmp_path / "c")]
@@ -0,0 +1,55 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from directory_manager import ListingEntry
+from display_tree import DirNode, DisplayRows
+
+
+def _node(path, depth, names, children=None):
+    entries = [ListingEntry(name.rstrip("/"), name.endswith("/")) for name in names]
+    return DirNode(path, depth, entries, children)
+
+
+def _sample():
+    inner = _node("/r/a/x", 2, ["x1", "x2"])
+    a = _node("/r/a", 1, ["x/", "y"], {0: inner})
+    c = _node("/r/c", 1, ["c1"])
+    return DisplayRows(_node("/r", 0, ["a/", "b", "c/", "d"], {0: a, 2: c}))
+
+
+def test_rows_match_depth_first_flattening():
+    rows = _sample()
+    names = [row[0] for row in rows]
+    assert names == ["a", "x", "x1", "x2", "y", "b", "c", "c1", "d"]
+    assert len(rows) == len(names)
+    assert [rows[i] for i in range(len(rows))] == list(rows)
+    assert rows[-1] == ("d", False, "/r/d", 0)
+    assert rows[2:4] == [("x1", False, "/r/a/x/x1", 2), ("x2", False, "/r/a/x/x2", 2)]
+    assert [row[0] for row in rows[3:8]] == ["x2", "y", "b", "c", "c1"]
+    assert [row[0] for row in rows[::4]] == ["a", "y", "d"]
+
+
+def test_index_parent_and_subtree_queries():
+    rows = _sample()
+    assert rows.index_of("/r/a/x/x2") == 3
+    assert rows.index_of("/r/c/c1") == 7
+    assert rows.index_of("/r/d") == 8
+    assert rows.index_of("/r/b/nope") is None
+    assert rows.index_of("/elsewhere") is None
+    assert rows.parent_index(3) == 1
+    assert rows.parent_index(4) == 0
+    assert rows.parent_index(5) is None
+    assert rows.subtree_end(0) == 5
+    assert rows.subtree_end(1) == 4
+    assert rows.subtree_end(5) == 6
+
+
+def test_splicing_leaves_previous_rows_untouched():
+    rows = _sample()
+    collapsed = rows.with_collapsed(0)
+    assert [row[0] for row in collapsed] == ["a", "b", "c", "c1", "d"]
+    expanded = collapsed.with_expanded(1, _node("/r/b", 1, ["b1"]))
+    assert [row[0] for row in expanded] == ["a", "b", "b1", "c", "c1", "d"]
+    assert len(rows) == 9 and rows[1][0] == "x"
@@ -0,0 +1,59 @@
+import os
+import signal
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from event_loop import EventLoop
+
+
+@pytest.fixture
+def loop():
+    read_fd, write_fd = os.pipe()
+    event_loop = EventLoop(read_fd)
+    yield event_loop, write_fd
+    event_loop.close()
+    os.close(read_fd)
+    os.close(write_fd)
+
+
+def test_wait_reports_input_and_times_out_when_idle(loop):
+    event_loop, write_fd = loop
+    started = time.monotonic()
+    assert event_loop.wait(0.05) is False
+    assert time.monotonic() - started >= 0.04
+
+    os.write(write_fd, b"j")
+    assert event_loop.wait(1.0) is True
+
+
+def test_worker_wake_interrupts_a_blocking_wait(loop):
+    event_loop, _write_fd = loop
+    event_loop.wake()  # owner thread: ignored, so the wait below must block
+    threading.Timer(0.05, event_loop.wake).start()
+
+    started = time.monotonic()
+    assert event_loop.wait(None) is False
+    assert 0.04 <= time.monotonic() - started < 2.0
+    # The wake byte was drained, so an idle wait sleeps again.
+    assert event_loop.wait(0.01) is False
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGWINCH"), reason="needs SIGWINCH")
+def test_resize_signal_wakes_the_loop_once(loop):
+    event_loop, _write_fd = loop
+    previous = signal.getsignal(signal.SIGWINCH)
+    event_loop.install_resize_handler()
+    try:
+        os.kill(os.getpid(), signal.SIGWINCH)
+        event_loop.wait(1.0)
+        assert event_loop.take_resize() is True
+        assert event_loop.take_resize() is False
+    finally:
+        event_loop.close()
+    assert signal.getsignal(signal.SIGWINCH) == (previous or signal.SIG_DFL)
@@ -1,8 +1,14 @@
+import os
+import signal
+import subprocess
+import sys
 import threading
+import time
 from types import SimpleNamespace
 
 import file_actions
 from file_actions import FileActionService
+from line_decoder import LineDecoder
 
 
 class DummyNavigator:
@@ -151,3 +157,100 @@ def test_run_execution_launches_job(monkeypatch, tmp_path):
         assert "done" in navigator.command_popup_lines
         assert navigator.command_popup_visible is True
     assert "Completed" in navigator.status_message
+
+
+def test_line_decoder_handles_split_characters_and_newlines():
+    decoder = LineDecoder()
+    data = "wörld\r\n50%\r100%\n\ntail".encode("utf-8")
+    lines: list[str] = []
+    for idx in range(len(data)):
+        lines.extend(decoder.feed(data[idx : idx + 1]))
+    assert lines == ["wörld", "50%", "100%", ""]
+    assert decoder.finish() == ["tail"]
+    assert decoder.finish() == []
+
+
+def test_line_decoder_long_unterminated_line_is_linear():
+    decoder = LineDecoder()
+    chunk = b"x" * 65536
+    started = time.monotonic()
+    for _ in range(800):  # 50 MiB without a newline
+        assert decoder.feed(chunk) == []
+    lines = decoder.feed(b"\r")
+    lines += decoder.feed(b"\nnext")
+    assert time.monotonic() - started < 5.0
+    assert len(lines) == 1 and len(lines[0]) == 800 * 65536
+    assert decoder.finish() == ["next"]
+
+
+def test_monitor_reads_chunks_and_publishes_batches(tmp_path):
+    navigator = DummyNavigator(str(tmp_path), ["python"], ["/bin/bash", "-lc"])
+    calls: list[int] = []
+    original_append = navigator.append_command_popup_lines
+
+    def counting_append(lines):
+        calls.append(len(lines))
+        original_append(lines)
+
+    navigator.append_command_popup_lines = counting_append
+    service = FileActionService(navigator)
+    script = (
+        "import sys\n"
+        "for i in range(5000):\n"
+        "    sys.stdout.write(f'line {i}\\n')\n"
+        "sys.stdout.write('h\\u00e9llo\\r\\nno newline')\n"
+        "sys.stdout.flush()\n"
+        "sys.stderr.write('oops\\n')\n"
+    )
+    job = file_actions.ExecutionJob("demo.py", [sys.executable], "demo", "python")
+    job.mark_process(
+        subprocess.Popen(
+            [sys.executable, "-c", script],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            stdin=subprocess.DEVNULL,
+            bufsize=0,
+        )
+    )
+
+    service._monitor_execution_job(job)
+
+    lines = navigator.command_popup_lines
+    stdout_lines = [line for line in lines if not line.startswith("[stderr]")]
+    assert stdout_lines[:2] == ["line 0", "line 1"]
+    assert stdout_lines[5000:] == ["héllo", "no newline"]
+    assert "[stderr] oops" in lines
+    assert job.exit_code == 0
+    assert sum(calls) == len(lines)
+    assert len(calls) < 100
+
+
+def test_monitor_stops_draining_after_a_background_child_keeps_writing(tmp_path):
+    navigator = DummyNavigator(str(tmp_path), ["python"], ["/bin/sh", "-c"])
+    service = FileActionService(navigator)
+    job = file_actions.ExecutionJob("bg.sh", ["/bin/sh"], "bg", "shell")
+    # The child keeps the pipe full, so it never looks idle.
+    writer = f"{sys.executable} -c \"while 1: print('x' * 60000, flush=True)\""
+    job.mark_process(
+        subprocess.Popen(
+            ["/bin/sh", "-c", f"{writer} & echo $! >&2"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            stdin=subprocess.DEVNULL,
+            bufsize=0,
+        )
+    )
+    monitor = threading.Thread(target=service._monitor_execution_job, args=(job,))
+    monitor.start()
+    monitor.join(5)
+    pid_lines = [
+        line for line in navigator.command_popup_lines if line.startswith("[stderr] ")
+    ]
+    if pid_lines:
+        try:
+            os.kill(int(pid_lines[0].split()[1]), signal.SIGKILL)
+        except (OSError, ValueError):
+            pass
+
+    assert not monitor.is_alive()
+    assert job.exit_code == 0
@@ -0,0 +1,82 @@
+import os
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from directory_manager import DirectoryManager
+from expand_all import ExpandAllJob
+
+
+def _make_tree(root: Path, depth: int, fanout: int) -> None:
+    if depth == 0:
+        return
+    for index in range(fanout):
+        child = root / f"d{index}"
+        child.mkdir()
+        (child / "file.txt").write_text("x")
+        _make_tree(child, depth - 1, fanout)
+
+
+def _run(manager, root, **limits):
+    job = ExpandAllJob(manager, root, **limits)
+    job.start()
+    assert job.wait(5)
+    return job, job.take_expanded()
+
+
+def test_expand_all_is_breadth_first_and_depth_bounded(tmp_path):
+    _make_tree(tmp_path, 3, 2)
+    manager = DirectoryManager(str(tmp_path))
+
+    job, paths = _run(manager, str(tmp_path), max_depth=2, max_nodes=100)
+
+    depths = [len(Path(p).relative_to(tmp_path).parts) for p in paths]
+    assert depths == sorted(depths)
+    assert set(depths) == {1, 2}
+    assert len(paths) == 6
+    assert not job.limit_reached
+    # Every handed-out directory is already listed, so rendering never scans.
+    assert all(os.path.realpath(p) in manager._cache for p in paths)
+
+
+def test_expand_all_stops_at_node_budget(tmp_path):
+    _make_tree(tmp_path, 3, 3)
+    manager = DirectoryManager(str(tmp_path))
+
+    job, paths = _run(manager, str(tmp_path), max_depth=8, max_nodes=4)
+
+    assert len(paths) == 4
+    assert job.expanded == 4
+    assert job.limit_reached
+
+
+def test_expand_all_skips_symlink_loops(tmp_path):
+    (tmp_path / "a").mkdir()
+    (tmp_path / "a" / "back").symlink_to(tmp_path)
+    manager = DirectoryManager(str(tmp_path))
+
+    _job, paths = _run(manager, str(tmp_path), max_depth=8, max_nodes=100)
+
+    assert paths == [str(tmp_path / "a")]
+
+
+def test_expand_all_cancel_stops_publishing(tmp_path):
+    _make_tree(tmp_path, 2, 2)
+    gate = threading.Event()
+
+    class SlowManager(DirectoryManager):
+        def list_directory(self, target_path, **kwargs):
+            gate.wait(5)
+            return super().list_directory(target_path, **kwargs)
+
+    manager = SlowManager(str(tmp_path))
+    job = ExpandAllJob(manager, str(tmp_path), max_depth=8, max_nodes=100)
+    job.start()
+    job.cancel()
+    gate.set()
+
+    assert job.wait(5)
+    assert job.cancelled
+    assert job.take_expanded() == []
@@ -0,0 +1,108 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import orchestrator
+from frame_scheduler import FrameScheduler
+from orchestrator import Orchestrator
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_rate_drops_when_idle_and_stops_without_focus():
+    clock = FakeClock()
+    scheduler = FrameScheduler(fps=20, idle_fps=2, idle_seconds=5, clock=clock)
+    assert scheduler.interval() == pytest.approx(0.05)
+
+    clock.now += 6
+    assert scheduler.interval() == pytest.approx(0.5)
+
+    scheduler.note_input()
+    assert scheduler.interval() == pytest.approx(0.05)
+
+    scheduler.set_focus(False)
+    assert scheduler.interval() is None
+    assert scheduler.timeout() is None
+    assert not scheduler.frame_due()
+
+    scheduler.set_focus(True)
+    assert scheduler.frame_due()
+
+
+def test_frame_cost_stretches_interval_to_cpu_budget():
+    clock = FakeClock()
+    scheduler = FrameScheduler(fps=25, cpu_budget=0.1, clock=clock)
+    scheduler.record_frame(100.0, 100.02)  # 20 ms frames
+
+    # 20 ms of drawing per 200 ms keeps the view at 10% of a core.
+    assert scheduler.interval() == pytest.approx(0.2)
+    assert not scheduler.frame_due()
+    assert scheduler.timeout() == pytest.approx(0.2)
+    clock.now = 100.2
+    assert scheduler.frame_due()
+
+
+def test_from_config_reads_matrix_settings():
+    class Config:
+        matrix_fps = 30
+        matrix_idle_fps = 60
+        matrix_idle_seconds = 10
+        matrix_cpu_budget = 50
+
+    scheduler = FrameScheduler.from_config(Config())
+    assert scheduler.fps == 30
+    assert scheduler.idle_fps == 30  # never faster than the active rate
+    assert scheduler.idle_seconds == 10
+    assert scheduler.cpu_budget == pytest.approx(0.5)
+
+
+class KeyQueue:
+    def __init__(self, keys):
+        self.keys = list(keys)
+
+    def timeout(self, _delay):
+        pass
+
+    def getch(self):
+        return self.keys.pop(0) if self.keys else -1
+
+
+@pytest.fixture
+def queue(monkeypatch):
+    screen = KeyQueue([])
+    monkeypatch.setattr(
+        orchestrator.curses, "ungetch", lambda key: screen.keys.insert(0, key)
+    )
+    return screen
+
+
+def test_focus_reports_are_consumed(queue):
+    queue.keys = [ord("["), ord("O"), ord("j")]
+    assert Orchestrator._read_focus_event(queue, 27) is False
+    assert queue.keys == [ord("j")]
+
+    queue.keys = [ord("["), ord("I")]
+    assert Orchestrator._read_focus_event(queue, 27) is True
+
+
+def test_other_escape_input_is_pushed_back(queue):
+    assert Orchestrator._read_focus_event(queue, 27) is None
+    assert queue.keys == []
+
+    queue.keys = [ord("["), ord("A")]
+    assert Orchestrator._read_focus_event(queue, 27) is None
+    assert queue.keys == [ord("["), ord("A")]
+
+    queue.keys = [ord("j")]
+    assert Orchestrator._read_focus_event(queue, 27) is None
+    assert queue.keys == [ord("j")]
+    assert Orchestrator._read_focus_event(queue, ord("j")) is None
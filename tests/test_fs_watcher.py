@@ -0,0 +1,100 @@
+import errno
+import os
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import fs_watcher
+from fs_watcher import DirectoryWatcher
+
+
+def _collector():
+    seen: list[str] = []
+    event = threading.Event()
+
+    def on_change(path: str) -> None:
+        seen.append(path)
+        event.set()
+
+    return seen, event, on_change
+
+
+def test_watcher_reports_external_creation(tmp_path):
+    seen, event, on_change = _collector()
+    watcher = DirectoryWatcher(on_change, poll_interval=0.05)
+    watcher.start()
+    try:
+        watcher.watch(str(tmp_path))
+        (tmp_path / "new.txt").write_text("x")
+        assert event.wait(2.0)
+    finally:
+        watcher.stop()
+
+    assert seen == [str(tmp_path)]
+
+
+def test_watcher_polls_when_inotify_is_unavailable(tmp_path, monkeypatch):
+    monkeypatch.setattr(fs_watcher._Inotify, "create", classmethod(lambda cls: None))
+    seen, event, on_change = _collector()
+    watcher = DirectoryWatcher(on_change, poll_interval=0.05)
+    watcher.start()
+    try:
+        watcher.watch(str(tmp_path))
+        assert not watcher.uses_inotify
+        (tmp_path / "new.txt").write_text("x")
+        os.utime(tmp_path, ns=(0, os.stat(tmp_path).st_mtime_ns + 1_000_000))
+        assert event.wait(2.0)
+    finally:
+        watcher.stop()
+
+    assert seen[0] == str(tmp_path)
+
+
+def test_watch_count_is_capped_with_lru_eviction(tmp_path):
+    dirs = []
+    for name in ("a", "b", "c"):
+        path = tmp_path / name
+        path.mkdir()
+        dirs.append(str(path))
+
+    watcher = DirectoryWatcher(lambda _path: None, max_watches=2)
+    watcher.start()
+    try:
+        if not watcher.uses_inotify:
+            pytest.skip("inotify is unavailable on this platform")
+        watcher.watch(dirs[0])
+        watcher.watch(dirs[1])
+        watcher.watch(dirs[0])
+        watcher.watch(dirs[2])
+        assert list(watcher._watches) == [dirs[0], dirs[2]]
+    finally:
+        watcher.stop()
+
+
+def test_refused_watch_falls_back_to_polling_once(tmp_path):
+    watcher = DirectoryWatcher(lambda _path: None)
+    watcher.start()
+    try:
+        if not watcher.uses_inotify:
+            pytest.skip("inotify is unavailable on this platform")
+        calls = []
+        real_add_watch = watcher._inotify.add_watch
+
+        def refusing(path):
+            calls.append(path)
+            return -1, errno.EACCES
+
+        watcher._inotify.add_watch = refusing
+        watcher.watch(str(tmp_path))
+        watcher.watch(str(tmp_path))
+        watcher._inotify.add_watch = real_add_watch
+
+        assert calls == [str(tmp_path)]
+        assert list(watcher._polled) == [str(tmp_path)]
+        assert str(tmp_path) not in watcher._watches
+    finally:
+        watcher.stop()
@@ -0,0 +1,224 @@
+import re
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from directory_manager import DirectoryManager
+from git_repo import (
+    CheckIgnoreProcess,
+    GitRootFinder,
+    GitignoreMatcher,
+    parse_ignore_lines,
+)
+
+requires_git = pytest.mark.skipif(
+    not shutil.which("git"), reason="git is required for gitignore integration tests"
+)
+
+
+def _git(repo: Path, *args: str, stdin: str = "") -> str:
+    return subprocess.run(
+        ["git", "-C", str(repo), *args],
+        check=True,
+        capture_output=True,
+        text=True,
+        input=stdin,
+    ).stdout
+
+
+def _ignored(rules, path, is_dir=False):
+    verdict = False
+    for rule in rules:
+        if rule.dir_only and not is_dir:
+            continue
+        if re.fullmatch(rule.regex, path):
+            verdict = not rule.negated
+    return verdict
+
+
+def test_parse_ignore_lines_handles_anchors_globstars_and_escapes():
+    rules = parse_ignore_lines(
+        ["# note", "/build/", "**/cache", "docs/**", "a/**/z", r"\#lit", r"sp\ ", ""],
+        base="pkg",
+    )
+
+    assert [rule.dir_only for rule in rules] == [True, False, False, False, False, False]
+    assert _ignored(rules, "pkg/build", is_dir=True)
+    assert not _ignored(rules, "pkg/build")
+    assert not _ignored(rules, "pkg/sub/build", is_dir=True)
+    assert _ignored(rules, "pkg/x/y/cache")
+    assert _ignored(rules, "pkg/docs/a/b")
+    assert not _ignored(rules, "pkg/docs", is_dir=True)
+    assert _ignored(rules, "pkg/a/z") and _ignored(rules, "pkg/a/b/c/z")
+    assert _ignored(rules, "pkg/deep/#lit")
+    assert _ignored(rules, "pkg/sp ")
+    assert not _ignored(rules, "other/x/cache")
+
+
+@requires_git
+def test_matcher_agrees_with_git_check_ignore(tmp_path):
+    repo = tmp_path
+    _git(repo, "init")
+    (repo / ".gitignore").write_text(
+        "*.log\n!important.log\n/out/\nlogs/**\n!logs/keep\n[ab]?.tmp\n*.LOCK\n",
+        encoding="utf-8",
+    )
+    (repo / ".git" / "info" / "exclude").write_text("secret*\n", encoding="utf-8")
+    (repo / "a" / "b").mkdir(parents=True)
+    (repo / "a" / ".gitignore").write_text("*.txt\n!keep.txt\n/local\n", encoding="utf-8")
+    (repo / "a" / "b" / ".gitignore").write_text("!*.log\n", encoding="utf-8")
+    (repo / "logs").mkdir()
+    (repo / "out").mkdir()
+    names = [
+        "x.log", "important.log", "a1.tmp", "c1.tmp", "secret.key", "tracked.log",
+        "X.LOCK", "a/x.log", "a/q.txt", "a/keep.txt", "a/local", "a/b/y.log",
+        "a/b/local", "logs/keep", "logs/other",
+    ]
+    for name in names:
+        (repo / name).write_text("x", encoding="utf-8")
+    _git(repo, "add", "-f", "tracked.log")
+
+    matcher = GitignoreMatcher(str(repo))
+    for directory in ["", "a", "a/b", "logs"]:
+        listing = sorted((repo / directory).iterdir()) if directory else sorted(repo.iterdir())
+        entries = [(p.name, p.is_dir()) for p in listing if p.name != ".git"]
+        prefix = f"{directory}/" if directory else ""
+        answers = _git(
+            repo,
+            "check-ignore",
+            "--stdin",
+            "-z",
+            "--non-matching",
+            "-v",
+            stdin="".join(f"{prefix}{name}\0" for name, _ in entries),
+        ).split("\0")
+        expected = {
+            name
+            for index, (name, _) in enumerate(entries)
+            if answers[4 * index + 2] and not answers[4 * index + 2].startswith("!")
+        }
+        assert matcher.ignored_names(directory, entries) == expected, directory
+
+
+@requires_git
+def test_listing_decides_ignored_entries_without_forking_git(tmp_path, monkeypatch):
+    repo = tmp_path
+    _git(repo, "init")
+    (repo / ".gitignore").write_text("dist/\n*.pyc\n", encoding="utf-8")
+    (repo / "dist").mkdir()
+    (repo / "mod.pyc").write_text("x", encoding="utf-8")
+    (repo / "mod.py").write_text("x", encoding="utf-8")
+
+    def no_git(*_args, **_kwargs):
+        raise AssertionError("ignore checks should not start git")
+
+    monkeypatch.setattr(CheckIgnoreProcess, "_start_process", no_git)
+    manager = DirectoryManager(str(repo))
+
+    assert [entry.name for entry in manager.get_items()] == ["mod.py"]
+    assert [entry.name for entry in manager.list_directory(str(repo / "dist"))] == []
+
+
+@requires_git
+def test_matcher_reads_the_index_only_when_a_rule_matches(tmp_path, monkeypatch):
+    import git_repo
+
+    repo = tmp_path
+    _git(repo, "init")
+    (repo / ".gitignore").write_text("build/\n", encoding="utf-8")
+    (repo / "build" / "keep").mkdir(parents=True)
+    (repo / "build" / "keep" / "a.txt").write_text("x", encoding="utf-8")
+    (repo / "build-x").write_text("x", encoding="utf-8")
+    _git(repo, "add", "-f", "build/keep/a.txt", "build-x")
+    reads = []
+    real_read = git_repo._read_index_paths
+
+    def counting(*args):
+        reads.append(args[0])
+        return real_read(*args)
+
+    monkeypatch.setattr(git_repo, "_read_index_paths", counting)
+    matcher = GitignoreMatcher(str(repo))
+
+    assert matcher.ignored_names("", [("src", True), ("README", False)]) == set()
+    assert reads == []
+    # "build" holds a tracked file, so git does not treat it as ignored.
+    assert matcher.ignored_names("", [("build", True), ("build-x", False)]) == set()
+    assert matcher.ignored_names("build", [("keep", True)]) == set()
+    assert len(reads) == 1
+
+
+@requires_git
+def test_matcher_defers_to_git_for_config_includes(tmp_path):
+    repo = tmp_path
+    _git(repo, "init")
+    with open(repo / ".git" / "config", "a", encoding="utf-8") as handle:
+        handle.write("[include]\n\tpath = extra.conf\n")
+
+    assert GitignoreMatcher(str(repo)).ignored_names("", [("x", False)]) is None
+
+
+def test_root_finder_walks_up_and_honours_gitfiles_and_ceilings(tmp_path, monkeypatch):
+    monkeypatch.delenv("GIT_DIR", raising=False)
+    monkeypatch.delenv("GIT_CEILING_DIRECTORIES", raising=False)
+    repo = tmp_path / "repo"
+    (repo / ".git").mkdir(parents=True)
+    (repo / ".git" / "HEAD").write_text("ref: refs/heads/main\n", encoding="utf-8")
+    (repo / ".git" / "modules" / "lib").mkdir(parents=True)
+    submodule = repo / "vendor" / "lib"
+    (submodule / "src").mkdir(parents=True)
+    (submodule / ".git").write_text("gitdir: ../../.git/modules/lib\n", encoding="utf-8")
+    deep = repo / "a" / "b"
+    deep.mkdir(parents=True)
+
+    def no_git(*_args, **_kwargs):
+        raise AssertionError("root discovery should not start git")
+
+    monkeypatch.setattr(subprocess, "run", no_git)
+    finder = GitRootFinder()
+    assert finder.find(str(deep)) == str(repo)
+    assert finder.find(str(repo / "a")) == str(repo)
+    assert finder.find(str(submodule / "src")) == str(submodule)
+    assert finder.find(str(repo / ".git" / "modules")) is None
+    assert finder.find(str(tmp_path)) is None
+
+    monkeypatch.setenv("GIT_CEILING_DIRECTORIES", str(repo))
+    assert finder.find(str(deep)) is None
+    assert finder.find(str(repo)) == str(repo)
+
+
+def test_refresh_cache_notices_git_init(tmp_path, monkeypatch):
+    monkeypatch.delenv("GIT_DIR", raising=False)
+    monkeypatch.delenv("GIT_CEILING_DIRECTORIES", raising=False)
+    project = tmp_path / "project"
+    (project / "src").mkdir(parents=True)
+    manager = DirectoryManager(str(project))
+    assert manager._get_git_repo_root(str(project / "src")) is None
+
+    (project / ".git").mkdir()
+    (project / ".git" / "HEAD").write_text("ref: refs/heads/main\n", encoding="utf-8")
+    assert manager._get_git_repo_root(str(project / "src")) is None
+    manager.refresh_cache(str(project / "src"))
+    assert manager._get_git_repo_root(str(project / "src")) == str(project)
+
+
+def test_ignore_files_follow_gitfiles_to_the_real_git_dir(tmp_path):
+    project = tmp_path / "project"
+    (project / ".git").mkdir(parents=True)
+    worktree = tmp_path / "worktree"
+    worktree.mkdir()
+    real_git_dir = project / ".git" / "worktrees" / "wt"
+    real_git_dir.mkdir(parents=True)
+    (real_git_dir / "commondir").write_text("../..\n", encoding="utf-8")
+    (worktree / ".git").write_text(f"gitdir: {real_git_dir}\n", encoding="utf-8")
+
+    files = DirectoryManager._ignore_files_for(str(worktree), "")
+    assert files[:2] == [
+        str(real_git_dir / "index"),
+        str(project / ".git" / "info" / "exclude"),
+    ]
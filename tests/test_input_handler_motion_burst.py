@@ -0,0 +1,60 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import input_handler
+from core_navigator import FileNavigator
+
+
+class FakeScreen:
+    def __init__(self, keys):
+        self.keys = list(keys)
+
+    def getch(self):
+        return self.keys.pop(0) if self.keys else -1
+
+
+def make_nav(tmp_path, count=20):
+    for idx in range(count):
+        (tmp_path / f"f{idx:02d}.txt").write_text("x")
+    return FileNavigator(str(tmp_path))
+
+
+def test_queued_motion_keys_fold_into_one_move(tmp_path, monkeypatch):
+    nav = make_nav(tmp_path)
+    screen = FakeScreen([ord("j"), ord("j"), ord("k"), ord("j"), ord("x")])
+    monkeypatch.setattr(
+        input_handler.curses, "ungetch", lambda key: screen.keys.insert(0, key)
+    )
+    moves = []
+    original = nav.input_handler._move_selection
+    monkeypatch.setattr(
+        nav.input_handler,
+        "_move_selection",
+        lambda total, delta: (moves.append(delta), original(total, delta)),
+    )
+
+    assert nav.input_handler.handle_key_burst(screen, ord("j")) is False
+
+    assert moves == [3]
+    assert nav.browser_selected == 3
+    assert screen.keys == [ord("x")]
+
+
+def test_motion_wraps_like_single_steps(tmp_path):
+    nav = make_nav(tmp_path, count=5)
+    nav.input_handler.handle_key_burst(FakeScreen([ord("k")] * 3), ord("k"))
+    assert nav.browser_selected == 1
+
+
+def test_visual_mode_motion_is_not_folded(tmp_path):
+    nav = make_nav(tmp_path)
+    nav.enter_visual_mode(0)
+    screen = FakeScreen([ord("j")])
+
+    nav.input_handler.handle_key_burst(screen, ord("j"))
+
+    assert nav.input_handler.motion_delta(ord("j")) is None
+    assert nav.browser_selected == 1
+    assert screen.keys == [ord("j")]
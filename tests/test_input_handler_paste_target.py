@@ -108,3 +108,44 @@ def test_paste_targets_nested_context_directory():
     )
 
     assert target == os.path.realpath(level_two)
+
+
+def test_context_scope_matches_between_row_tree_and_list():
+    from directory_manager import ListingEntry
+    from display_tree import DirNode, DisplayRows
+
+    handler, nav = make_handler()
+    root = nav.dir_manager.current_path
+    alpha = os.path.join(root, "alpha")
+    bravo = os.path.join(alpha, "bravo")
+    nav.expanded_nodes.update({alpha, bravo})
+
+    def node(path, depth, names, children=None):
+        entries = [ListingEntry(n.rstrip("/"), n.endswith("/")) for n in names]
+        return DirNode(path, depth, entries, children)
+
+    inner = node(bravo, 2, ["note.md"])
+    middle = node(alpha, 1, ["bravo/", "top.md"], {0: inner})
+    rows = DisplayRows(node(root, 0, ["alpha/", "beta/", "z.txt"], {0: middle}))
+    plain = list(rows)
+
+    for index in range(len(plain)):
+        assert handler._compute_context_scope(
+            rows, index
+        ) == handler._compute_context_scope(plain, index)
+
+
+def test_plain_movement_skips_context_resolution(tmp_path, monkeypatch):
+    from core_navigator import FileNavigator
+
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b.txt").write_text("x")
+    nav = FileNavigator(str(tmp_path))
+
+    def fail(*_args, **_kwargs):
+        raise AssertionError("scope should only resolve when a key needs it")
+
+    monkeypatch.setattr(nav.input_handler, "_compute_context_scope", fail)
+    nav.input_handler.handle_key(None, ord("j"))
+
+    assert nav.browser_selected == 1
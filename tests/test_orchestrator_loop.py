@@ -0,0 +1,74 @@
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from orchestrator import Orchestrator
+
+
+class FakeLoop:
+    input_fd = 0
+
+    def __init__(self):
+        self.waits = 0
+
+    def wait(self, _timeout=None):
+        self.waits += 1
+        return False
+
+    def take_resize(self):
+        return False
+
+
+class FakeScreen:
+    def __init__(self, keys):
+        self.keys = list(keys)
+
+    def timeout(self, _delay):
+        pass
+
+    def getch(self):
+        return self.keys.pop(0) if self.keys else -1
+
+
+def test_redraw_requested_during_render_is_kept():
+    nav = SimpleNamespace(need_redraw=True, layout_mode="list", renders=0)
+
+    def render():
+        nav.renders += 1
+        if nav.renders == 1:
+            # A listing batch lands while the frame is drawn.
+            nav.need_redraw = True
+
+    nav.renderer = SimpleNamespace(render=render)
+    nav.input_handler = SimpleNamespace(handle_key=lambda _scr, _key: True)
+    screen = FakeScreen([-1, ord("q")])
+
+    Orchestrator()._event_loop(screen, nav, FakeLoop())
+
+    assert nav.renders == 2
+
+
+def test_focus_reporting_follows_matrix_layout(monkeypatch):
+    import orchestrator
+
+    calls = []
+    monkeypatch.setattr(
+        orchestrator, "set_focus_reporting", lambda enabled: calls.append(enabled)
+    )
+    nav = SimpleNamespace(need_redraw=True, layout_mode="matrix")
+
+    def handle_key(_scr, key):
+        if key == ord("l"):
+            nav.layout_mode = "list"
+            return False
+        return True
+
+    nav.renderer = SimpleNamespace(render=lambda: None)
+    nav.input_handler = SimpleNamespace(handle_key=handle_key)
+    screen = FakeScreen([ord("l"), -1, ord("q")])
+
+    Orchestrator()._event_loop(screen, nav, FakeLoop())
+
+    assert calls == [True, False]
@@ -0,0 +1,140 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from core_navigator import FileNavigator
+from output_buffer import OutputBuffer
+
+
+class SmallChunks(OutputBuffer):
+    CHUNK_LINES = 4
+
+
+def test_line_cap_keeps_newest_lines_across_chunks():
+    buffer = SmallChunks(max_lines=10)
+    buffer.extend(f"line {idx}" for idx in range(25))
+
+    assert len(buffer) == 10
+    assert buffer.total == 25
+    assert buffer.dropped == 15
+    assert list(buffer) == [f"line {idx}" for idx in range(15, 25)]
+    assert buffer[0] == "line 15"
+    assert buffer[-1] == "line 24"
+    assert buffer[3:6] == ["line 18", "line 19", "line 20"]
+    assert buffer[8:50] == ["line 23", "line 24"]
+    with pytest.raises(IndexError):
+        buffer[10]
+
+
+def test_byte_cap_counts_encoded_size_and_keeps_last_line():
+    buffer = SmallChunks(max_bytes=12)
+    buffer.extend(["abc", "ééé", "xy"])  # 4 + 7 + 3 bytes with newlines
+    assert list(buffer) == ["ééé", "xy"]
+    assert buffer.bytes == 10
+
+    buffer.append("z" * 40)
+    assert list(buffer) == ["z" * 40]
+    assert buffer.dropped == 3
+
+    buffer.clear()
+    assert len(buffer) == 0 and buffer.total == 0 and buffer.bytes == 0
+
+
+def test_popup_scroll_follows_evicted_lines(tmp_path):
+    nav = FileNavigator(str(tmp_path))
+    nav.open_command_popup("run", [])
+    nav.command_popup_lines = OutputBuffer(max_lines=5)
+    nav.append_command_popup_lines([str(idx) for idx in range(5)])
+    nav.command_popup_scroll = 3
+    nav.command_popup_match = 4
+
+    nav.append_command_popup_lines(["5", "6"])
+
+    assert nav.command_popup_scroll == 1
+    assert nav.command_popup_lines[nav.command_popup_scroll] == "3"
+    assert nav.command_popup_lines[nav.command_popup_match] == "4"
+
+    nav.append_command_popup_lines(["7", "8", "9"])
+    assert nav.command_popup_match is None
+
+
+def test_spill_keeps_every_line_on_disk(tmp_path):
+    buffer = SmallChunks(max_lines=5, spill_dir=str(tmp_path / "cache"))
+    buffer.extend(f"line {idx}" for idx in range(3))
+    assert buffer.spill is None
+
+    buffer.extend(["héllo"] + [f"line {idx}" for idx in range(4, 100)])
+
+    assert buffer.spill is not None
+    assert len(buffer) == 100 and buffer.total == 100 and buffer.dropped == 0
+    assert buffer[3] == "héllo"
+    assert buffer[98:] == ["line 98", "line 99"]
+    buffer.append("tail")
+    assert buffer[-1] == "tail"
+
+    assert buffer.find("line 5", 0) == 5
+    assert buffer.find("line 5", 6) == 50
+    assert buffer.find("héllo", 99, backwards=True) == 3
+    assert buffer.find("line 0", 0, backwards=True) == 0
+    assert buffer.find("missing", 0) is None
+
+    path = buffer.spill.path
+    assert Path(path).parent == tmp_path / "cache"
+    buffer.close()
+    assert not Path(path).exists()
+    assert len(buffer) == 0
+
+
+def test_spill_stops_at_its_byte_cap(tmp_path):
+    buffer = SmallChunks(
+        max_lines=2, spill_dir=str(tmp_path / "cache"), spill_max_bytes=20
+    )
+    buffer.extend(f"row{idx}" for idx in range(10))  # 5 bytes per line
+
+    assert buffer.spill is not None
+    assert buffer.spill.offsets.itemsize == 4
+    assert list(buffer) == ["row0", "row1", "row2", "row3"]
+    assert buffer.total == 10 and buffer.truncated == 6 and buffer.dropped == 0
+    buffer.append("x")
+    assert len(buffer) == 4 and buffer.truncated == 7
+    assert Path(buffer.spill.path).stat().st_size == 20
+    buffer.close()
+
+
+def test_unwritable_spill_dir_falls_back_to_dropping(tmp_path):
+    blocker = tmp_path / "not-a-dir"
+    blocker.write_text("")
+    buffer = OutputBuffer(max_lines=3, spill_dir=str(blocker / "o"))
+    buffer.extend(str(idx) for idx in range(5))
+
+    assert buffer.spill is None
+    assert list(buffer) == ["2", "3", "4"]
+    assert buffer.dropped == 2
+
+
+def test_popup_search_moves_to_matches_and_wraps(tmp_path):
+    nav = FileNavigator(str(tmp_path))
+    lines = [f"step {idx}" for idx in range(40)]
+    lines[5] = lines[30] = "error: boom"
+    nav.open_command_popup("run", lines)
+    nav.command_popup_view_rows = 10
+    nav.command_popup_search = "error"
+    handler = nav.input_handler
+
+    handler._popup_search(backwards=False)
+    assert nav.command_popup_match == 5
+    assert nav.command_popup_scroll == 0  # already on screen
+
+    handler._popup_search(backwards=False)
+    assert nav.command_popup_match == 30
+    assert nav.command_popup_scroll == 30
+
+    handler._popup_search(backwards=False)
+    assert nav.command_popup_match == 5  # wrapped
+    assert nav.command_popup_scroll == 5
+
+    handler._popup_search(backwards=True)
+    assert nav.command_popup_match == 30
@@ -0,0 +1,55 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from path_trie import ExpandedNodeSet, PathTrie
+
+
+def test_path_trie_maps_paths_and_finds_longest_prefix():
+    trie = PathTrie()
+    trie["/repo"] = "root"
+    trie["/repo/sub/module"] = "module"
+
+    assert trie.get("/repo") == "root"
+    assert trie.get("/repo/sub") is None
+    assert "/repo/sub" not in trie
+    assert trie.longest_prefix("/repo/sub/file") == ("/repo", "root")
+    assert trie.longest_prefix("/repo/sub/module/x") == ("/repo/sub/module", "module")
+    assert trie.longest_prefix("/elsewhere") is None
+    assert sorted(trie) == ["/repo", "/repo/sub/module"]
+    assert len(trie) == 2
+
+
+def test_path_trie_pop_prunes_empty_branches():
+    trie = PathTrie()
+    trie["/a/b/c"] = 1
+    trie["/a"] = 2
+
+    assert trie.pop("/a/b/c") == 1
+    assert trie.pop("/a/b/c", "gone") == "gone"
+    assert trie._root.children["a"].children == {}
+    del trie["/a"]
+    assert len(trie) == 0 and trie._root.children == {}
+
+
+def test_expanded_node_set_removes_subtrees_and_tracks_versions():
+    nodes = ExpandedNodeSet(["/r/a", "/r/a/b", "/r/a/b/c", "/r/ab", "/r/z"])
+    version = nodes.version
+
+    assert nodes.has_descendants("/r/a")
+    assert not nodes.has_descendants("/r/ab")
+    assert nodes.discard_subtree("/r/a") == 3
+    assert set(nodes) == {"/r/ab", "/r/z"}
+    assert "/r/a/b" not in nodes
+    assert nodes.version > version
+
+    version = nodes.version
+    assert nodes.discard_subtree("/r/missing") == 0
+    nodes.add("/r/z")
+    assert nodes.version == version
+
+    nodes -= {"/r/z"}
+    assert nodes == {"/r/ab"}
+    nodes.clear()
+    assert len(nodes) == 0 and not nodes.has_descendants("/r")
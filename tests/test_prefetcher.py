@@ -0,0 +1,70 @@
+import sys
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import directory_manager
+from core_navigator import FileNavigator
+from directory_manager import DirectoryManager
+from prefetcher import ListingPrefetcher
+
+
+def test_prefetched_listing_is_a_cache_hit(tmp_path, monkeypatch):
+    (tmp_path / "child").mkdir()
+    (tmp_path / "child" / "file.txt").write_text("x")
+    manager = DirectoryManager(str(tmp_path))
+    prefetcher = ListingPrefetcher(manager)
+    try:
+        prefetcher.schedule([str(tmp_path / "child")])
+        while prefetcher.pending():
+            threading.Event().wait(0.01)
+    finally:
+        prefetcher.close()
+
+    def fail(_path):
+        raise AssertionError("prefetched directory was scanned again")
+
+    monkeypatch.setattr(directory_manager.os, "scandir", fail)
+    assert [e.name for e in manager.list_directory(str(tmp_path / "child"))] == [
+        "file.txt"
+    ]
+
+
+def test_schedule_cancels_prefetches_the_cursor_moved_away_from():
+    release = threading.Event()
+    started = threading.Event()
+    fetched = []
+
+    def prefetch(path):
+        started.set()
+        release.wait(5)
+        fetched.append(path)
+
+    prefetcher = ListingPrefetcher(SimpleNamespace(prefetch=prefetch), max_workers=1)
+    try:
+        prefetcher.schedule(["/busy", "/stale"])
+        assert started.wait(5)
+        prefetcher.schedule(["/busy", "/wanted"])
+        release.set()
+        while prefetcher.pending():
+            threading.Event().wait(0.01)
+    finally:
+        prefetcher.close()
+
+    assert fetched == ["/busy", "/wanted"]
+
+
+def test_navigator_prefetches_selected_directory_and_siblings(tmp_path):
+    for name in ("a", "b", "c"):
+        (tmp_path / name).mkdir()
+    (tmp_path / "file.txt").write_text("x")
+    scheduled = []
+    nav = FileNavigator(str(tmp_path))
+    nav.prefetcher = SimpleNamespace(schedule=lambda paths: scheduled.append(list(paths)))
+    nav.browser_selected = 1
+
+    nav.schedule_prefetch()
+
+    assert scheduled == [[str(tmp_path / p) for p in ("b", "c", "a")]]
@@ -128,6 +128,25 @@ def test_directory_manager_reorders_cached_items_after_global_sort_change(tmp_pa
     ]
 
 
+def test_selecting_mtime_sort_restats_edited_files(tmp_path):
+    now = time.time()
+    _create_file(tmp_path / "aaa.txt", now - 1000)
+    edited = _create_file(tmp_path / "zzz.txt", now - 2000)
+
+    manager = DirectoryManager(str(tmp_path))
+    manager.set_sort_mode("mtime_desc")
+    assert [name for name, _is_dir in manager.get_items()] == ["aaa.txt", "zzz.txt"]
+
+    # Editing a file leaves the directory stamp, and so the listing, in place.
+    stamp = os.stat(tmp_path).st_mtime_ns
+    os.utime(edited, (now, now))
+    assert os.stat(tmp_path).st_mtime_ns == stamp
+    assert [name for name, _is_dir in manager.get_items()] == ["aaa.txt", "zzz.txt"]
+
+    manager.set_sort_mode("mtime_desc")
+    assert [name for name, _is_dir in manager.get_items()] == ["zzz.txt", "aaa.txt"]
+
+
 def test_leader_sort_commands_refresh_visible_order_immediately(tmp_path):
     now = time.time()
     _create_file(tmp_path / "aaa_new.txt", now)
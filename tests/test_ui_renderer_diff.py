@@ -0,0 +1,72 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from core_navigator import FileNavigator
+
+
+class RecordingScreen:
+    def __init__(self, rows=12, cols=60):
+        self.size = (rows, cols)
+        self.written: list[int] = []
+        self.erased = 0
+
+    def getmaxyx(self):
+        return self.size
+
+    def erase(self):
+        self.erased += 1
+
+    def move(self, _y, _x):
+        pass
+
+    def clrtoeol(self):
+        pass
+
+    def addstr(self, y, _x, _text, _attr=0):
+        self.written.append(y)
+
+    def refresh(self):
+        pass
+
+
+def make_nav(tmp_path):
+    for idx in range(20):
+        (tmp_path / f"f{idx:02d}.txt").write_text("x")
+    nav = FileNavigator(str(tmp_path))
+    screen = RecordingScreen()
+    nav.renderer.stdscr = screen
+    return nav, screen
+
+
+def test_cursor_move_rewrites_only_changed_rows(tmp_path):
+    nav, screen = make_nav(tmp_path)
+    nav.renderer.render()
+    assert screen.erased == 1
+    assert len(screen.written) == 11  # row 1 is blank
+
+    screen.written.clear()
+    nav.browser_selected = 1
+    nav.renderer.render()
+
+    # Only the old and new cursor rows; the status bar text is unchanged.
+    assert screen.erased == 1
+    assert sorted(screen.written) == [2, 3]
+
+
+def test_invalidate_and_resize_repaint_everything(tmp_path):
+    nav, screen = make_nav(tmp_path)
+    nav.renderer.render()
+
+    screen.written.clear()
+    nav.renderer.invalidate()
+    nav.renderer.render()
+    assert screen.erased == 2
+    assert len(screen.written) == 11  # row 1 is blank
+
+    screen.written.clear()
+    screen.size = (8, 60)
+    nav.renderer.render()
+    assert screen.erased == 3
+    assert len(screen.written) == 7
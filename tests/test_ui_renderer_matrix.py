@@ -0,0 +1,142 @@
+import curses
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import ui_renderer
+from core_navigator import FileNavigator
+
+
+class CellScreen:
+    """Curses stand-in that keeps a character grid and rejects ``addch``."""
+
+    def __init__(self, rows=14, cols=50):
+        self.size = (rows, cols)
+        self.cells: dict[tuple[int, int], tuple[str, int]] = {}
+        self.addstr_calls: list[int] = []
+        self._cursor = (0, 0)
+
+    def getmaxyx(self):
+        return self.size
+
+    def erase(self):
+        self.cells.clear()
+
+    def move(self, y, x):
+        self._cursor = (y, x)
+
+    def clrtoeol(self):
+        y, x = self._cursor
+        for key in [key for key in self.cells if key[0] == y and key[1] >= x]:
+            del self.cells[key]
+
+    def addstr(self, y, x, text, attr=0):
+        self.addstr_calls.append(y)
+        for offset, ch in enumerate(text):
+            self.cells[(y, x + offset)] = (ch, attr)
+
+    def addch(self, *_args):  # pragma: no cover - must not be used
+        raise AssertionError("matrix rows should be drawn with addstr")
+
+    def refresh(self):
+        pass
+
+
+def expected_cells(state, selected, start_y, rows):
+    """Per-cell reference output of the original Matrix renderer."""
+    cells = {}
+    for stream in state.streams:
+        chars = stream.chars or "0"
+        for row in range(rows):
+            offset = int((stream.head - row) % stream.length)
+            ch = chars[(stream.length - 1 - offset) % stream.length]
+            attr = curses.A_DIM
+            if stream.index == selected:
+                attr = curses.A_BOLD if offset == 0 else curses.A_NORMAL
+            elif offset == 0:
+                attr = curses.A_NORMAL
+            cells[(start_y + row, stream.column)] = (ch, attr)
+    return {key: value for key, value in cells.items() if value[0] != " "}
+
+
+def test_matrix_rows_match_per_cell_output(tmp_path, monkeypatch):
+    for idx in range(6):
+        (tmp_path / f"entry{idx}").write_text("x")
+    monkeypatch.setattr(ui_renderer.time, "monotonic", lambda: 100.0)
+    nav = FileNavigator(str(tmp_path))
+    nav.layout_mode = "matrix"
+    nav.browser_selected = 2
+    screen = CellScreen()
+    nav.renderer.stdscr = screen
+
+    nav.renderer.render()
+
+    max_y, _max_x = screen.size
+    rows = max_y - 4
+    state = nav.matrix_state
+    drawn = {
+        key: value
+        for key, value in screen.cells.items()
+        if 2 <= key[0] < 2 + rows and value[0] != " "
+    }
+    assert drawn == expected_cells(state, 2, 2, rows)
+    # One run per stream at most, plus the dim runs between them.
+    per_row = {y: screen.addstr_calls.count(y) for y in range(2, 2 + rows)}
+    assert max(per_row.values()) <= 2 * len(state.streams) + 1
+
+    screen.addstr_calls.clear()
+    nav.renderer.render()
+    # Time stood still, so no Matrix row changed.
+    assert not [y for y in screen.addstr_calls if 2 <= y < 2 + rows]
+
+
+def test_matrix_builds_streams_for_the_selected_page_only(tmp_path):
+    for idx in range(130):
+        (tmp_path / f"f{idx:03d}").write_text("x")
+    nav = FileNavigator(str(tmp_path))
+    nav.layout_mode = "matrix"
+    screen = CellScreen(cols=50)
+    nav.renderer.stdscr = screen
+
+    nav.renderer.render()
+    state = nav.matrix_state
+    assert state.window == (0, 50)
+    assert [stream.index for stream in state.streams] == list(range(50))
+    columns = [stream.column for stream in state.streams]
+    assert len(set(columns)) == len(columns)
+
+    nav.browser_selected = 120
+    nav.renderer.render()
+    state = nav.matrix_state
+    assert state.window == (100, 130)
+    assert state.streams[0].name == "f100"
+    assert 120 in state.index_map
+
+
+def test_matrix_streams_survive_directory_changes(tmp_path):
+    for name in ("a", "c", "d"):
+        (tmp_path / name).write_text("x")
+    nav = FileNavigator(str(tmp_path))
+    nav.layout_mode = "matrix"
+    nav.renderer.stdscr = CellScreen()
+
+    nav.renderer.render()
+    state = nav.matrix_state
+    before = {stream.path: stream for stream in state.streams}
+    nav.renderer.render()
+    assert nav.matrix_state is state  # same display list: no reconciliation
+
+    (tmp_path / "b").write_text("x")
+    (tmp_path / "d").unlink()
+    nav.notify_directory_changed(str(tmp_path))
+    assert nav.matrix_state is state
+    nav.renderer.render()
+
+    after = {stream.path: stream for stream in nav.matrix_state.streams}
+    assert sorted(after) == sorted(str(tmp_path / name) for name in "abc")
+    for name in ("a", "c"):
+        path = str(tmp_path / name)
+        assert after[path] is before[path]
+    assert [stream.index for stream in nav.matrix_state.streams] == [0, 1, 2]
+    assert nav.matrix_state.index_map[2].name == "c"
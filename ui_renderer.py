@@ -2,10 +2,12 @@
 import curses
 import random
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Any, Optional, Sequence, Tuple, cast
 
 from directory_manager import DirectoryManager
+from display_tree import DisplayRows
+from screen_buffer import ShadowScreen
 
 
 @dataclass
@@ -28,11 +30,16 @@ class MatrixStream:
 @dataclass
 class MatrixState:
     streams: list[MatrixStream]
-    signature: Tuple[str, ...]
     max_height: int
     max_width: int
     last_update: float
     index_map: dict[int, MatrixStream]
+    # Display rows ``[start, stop)`` that currently have streams.
+    window: Tuple[int, int] = (0, 0)
+    # The display list the streams were reconciled against; display lists
+    # are immutable, so the same object means nothing changed.
+    source: Any = None
+    by_path: dict[str, MatrixStream] = field(default_factory=dict)
 
 
 @dataclass
@@ -56,6 +63,15 @@ class UIRenderer:
         self.nav = navigator
         self.stdscr: Optional[Any] = None
         self._idle_matrix_state: Optional[IdleMatrixState] = None
+        # The list and Matrix views are diffed row by row against the
+        # previous frame; help and popups repaint and leave the shadow stale.
+        self._screen = ShadowScreen()
+        self._diffing = False
+        self._diffed_layout: Optional[str] = None
+
+    def invalidate(self) -> None:
+        """Repaint every row on the next frame (after prompts or suspends)."""
+        self._screen.invalidate()
 
     def render(self):
         stdscr = self.stdscr
@@ -63,7 +79,17 @@ class UIRenderer:
             return
 
         max_y, max_x = cast(Tuple[int, int], stdscr.getmaxyx())
-        self._clear_screen(stdscr)
+        self._diffing = not self.nav.show_help and not getattr(
+            self.nav, "command_popup_visible", False
+        )
+        if self._diffing:
+            if self.nav.layout_mode != self._diffed_layout:
+                self._screen.invalidate()
+                self._diffed_layout = self.nav.layout_mode
+            self._screen.begin(stdscr, max_y, max_x)
+        else:
+            self._clear_screen(stdscr)
+            self._screen.invalidate()
 
         if self.nav.show_help:
             self._render_help(stdscr, max_y, max_x)
@@ -95,29 +121,31 @@ class UIRenderer:
             except Exception:
                 pass
 
-    def _render_path_header(self, stdscr: Any, display_path: str, max_x: int) -> None:
-        try:
-            stdscr.addstr(0, 0, display_path[:max_x])
-        except curses.error:
-            pass
+    def _put_row(self, stdscr: Any, y: int, text: str, attr: int = 0) -> None:
+        if self._diffing:
+            self._screen.put(stdscr, y, text, attr)
+            return
         try:
-            stdscr.move(1, 0)
+            stdscr.move(y, 0)
             stdscr.clrtoeol()
+            if text:
+                stdscr.addstr(y, 0, text, attr)
         except curses.error:
             pass
 
+    def _render_path_header(self, stdscr: Any, display_path: str, max_x: int) -> None:
+        self._put_row(stdscr, 0, display_path[:max_x])
+        self._put_row(stdscr, 1, "")
+
     def _render_status_bar(
         self, stdscr: Any, text: str, max_y: int, max_x: int, *, bold: bool = True
     ) -> None:
         if max_y <= 0:
             return
         attr = curses.A_BOLD if bold else curses.A_NORMAL
-        try:
-            stdscr.move(max_y - 1, 0)
-            stdscr.clrtoeol()
-            stdscr.addstr(max_y - 1, 0, text[: max_x - 1] if max_x > 0 else text, attr)
-        except curses.error:
-            pass
+        self._put_row(
+            stdscr, max_y - 1, text[: max_x - 1] if max_x > 0 else text, attr
+        )
 
     def _compose_status(
         self,
@@ -152,6 +180,16 @@ class UIRenderer:
         if leader_seq:
             parts.append(leader_seq)
 
+        scan_progress = getattr(self.nav.dir_manager, "scan_progress", None)
+        if scan_progress is not None:
+            loaded = scan_progress(self.nav.dir_manager.current_path)
+            if loaded is not None:
+                parts.append(f"loading {loaded:,}…")
+
+        expand_job = getattr(self.nav, "expand_job", None)
+        if expand_job is not None:
+            parts.append(f"expanding {expand_job.expanded:,}…")
+
         hidden_indicator = self.nav.dir_manager.get_hidden_status_text().strip()
         if hidden_indicator:
             parts.append(hidden_indicator)
@@ -181,14 +219,29 @@ class UIRenderer:
 
     def _render_command_popup(self, stdscr: Any, max_y: int, max_x: int) -> None:
         with self.nav.command_popup_lock:
-            lines = list(self.nav.command_popup_lines or [])
+            buffer = self.nav.command_popup_lines or []
+            total_lines = len(buffer)
+            dropped = getattr(buffer, "dropped", 0)
+            spill = getattr(buffer, "spill", None)
+            truncated = getattr(buffer, "truncated", 0)
             header = self.nav.command_popup_header or "Command Output"
             current_scroll = self.nav.command_popup_scroll
-
-        if not lines:
-            lines = ["(no output)"]
-
-        total_lines = len(lines)
+            match = getattr(self.nav, "command_popup_match", None)
+
+        if not total_lines:
+            buffer = ["(no output)"]
+            total_lines = 1
+        output_note = f"  ({dropped:,} earlier lines dropped)" if dropped else ""
+        if spill is not None:
+            spill_path = DirectoryManager.pretty_path(spill.path)
+            output_note += f"  (full output: {spill_path})"
+        if truncated:
+            output_note += f"  ({truncated:,} later lines not kept: spill limit)"
+
+        def _window(scroll: int, rows: int) -> list[str]:
+            # Copy only the rows on screen; the buffer keeps growing meanwhile.
+            with self.nav.command_popup_lock:
+                return list(buffer[scroll : scroll + rows])
 
         def _apply_scroll(scroll_value: int, view_rows: int) -> None:
             with self.nav.command_popup_lock:
@@ -200,7 +253,7 @@ class UIRenderer:
             max_scroll = max(0, total_lines - visible_rows)
             scroll = max(0, min(current_scroll, max_scroll))
             _apply_scroll(scroll, visible_rows)
-            visible = lines[scroll : scroll + visible_rows]
+            visible = _window(scroll, visible_rows)
 
             for row in range(visible_rows):
                 if row >= max_y - 1:
@@ -209,13 +262,14 @@ class UIRenderer:
                     stdscr.move(row, 0)
                     stdscr.clrtoeol()
                     if row < len(visible):
-                        stdscr.addstr(row, 0, visible[row][:max_x])
+                        attr = curses.A_REVERSE if scroll + row == match else 0
+                        stdscr.addstr(row, 0, visible[row][:max_x], attr)
                 except curses.error:
                     pass
 
             footer = (
                 f"{header}  [{scroll + 1}-{min(total_lines, scroll + visible_rows)}/{total_lines}]"
-                "  j/k scroll  ESC cancel/close"
+                f"{output_note}  j/k scroll  ESC cancel/close"
             )
             self._render_status_bar(stdscr, footer, max_y, max_x, bold=False)
 
@@ -267,7 +321,7 @@ class UIRenderer:
         max_scroll = max(0, total_lines - visible_rows)
         scroll = max(0, min(current_scroll, max_scroll))
         _apply_scroll(scroll, visible_rows)
-        visible = lines[scroll : scroll + visible_rows]
+        visible = _window(scroll, visible_rows)
 
         line_info = (
             f"{scroll + 1}-{min(total_lines, scroll + visible_rows)}/{total_lines}"
@@ -283,7 +337,7 @@ class UIRenderer:
         except curses.error:
             pass
 
-        instructions = "j/k scroll  ESC cancel/close"
+        instructions = "j/k scroll  / search  ESC cancel/close"
         try:
             stdscr.addstr(footer_y, left + 1, " " * header_width)
             stdscr.addstr(footer_y, left + 2, instructions[: max(0, width - 4)])
@@ -294,13 +348,16 @@ class UIRenderer:
         for idx in range(visible_rows):
             y = content_top + idx
             text = visible[idx] if idx < len(visible) else ""
+            attr = curses.A_REVERSE if scroll + idx == match else 0
             try:
                 stdscr.addstr(y, left + 1, " " * (width - 2))
-                stdscr.addstr(y, left + 2, text[:inner_width])
+                stdscr.addstr(y, left + 2, text[:inner_width], attr)
             except curses.error:
                 pass
 
-        footer = f"{header}  [{line_info}]  j/k scroll  ESC cancel/close"
+        footer = (
+            f"{header}  [{line_info}]{output_note}  j/k scroll  ESC cancel/close"
+        )
         self._render_status_bar(stdscr, footer, max_y, max_x, bold=False)
 
     # ------------------------------------------------------------------
@@ -329,13 +386,6 @@ class UIRenderer:
         if available_height < 0:
             available_height = 0
 
-        for yy in range(list_start_y, max(0, max_y - 1)):
-            try:
-                stdscr.move(yy, 0)
-                stdscr.clrtoeol()
-            except curses.error:
-                pass
-
         items = self.nav.build_display_items()
         total = len(items)
         visual_indices_set = set()
@@ -366,21 +416,17 @@ class UIRenderer:
             self.nav.list_offset : self.nav.list_offset + available_height
         ]
 
+        lines: list[Tuple[str, int]] = []
         if total == 0:
             msg = (
                 "(no matches)"
                 if self.nav.dir_manager.filter_pattern
                 else "(empty directory)"
             )
-            try:
-                stdscr.addstr(
-                    list_start_y + (available_height // 2 if available_height else 0),
-                    max(0, (max_x - len(msg)) // 2),
-                    msg,
-                    curses.A_DIM,
-                )
-            except curses.error:
-                pass
+            msg_row = available_height // 2 if available_height else 0
+            lines = [("", curses.A_NORMAL)] * msg_row
+            pad = " " * max(0, (max_x - len(msg)) // 2)
+            lines.append(((pad + msg)[:max_x], curses.A_DIM))
         else:
             for i, (name, is_dir, full_path, depth) in enumerate(visible_items):
                 global_idx = self.nav.list_offset + i
@@ -405,14 +451,14 @@ class UIRenderer:
                 suffix = "/" if is_dir else ""
                 indent = "  " * depth
                 line = f"{indent}{sel_block}{exp_symbol}{name}{suffix}"
+                lines.append((line[:max_x], attr))
 
-                y = list_start_y + i
-                try:
-                    stdscr.move(y, 0)
-                    stdscr.clrtoeol()
-                    stdscr.addstr(y, 0, line[:max_x], attr)
-                except curses.error:
-                    pass
+        for i in range(max(available_height, len(lines))):
+            y = list_start_y + i
+            if y >= max_y - 1:
+                break
+            text, attr = lines[i] if i < len(lines) else ("", curses.A_NORMAL)
+            self._put_row(stdscr, y, text, attr)
 
         scroll_indicator = ""
         if total > available_height and available_height > 0:
@@ -437,21 +483,12 @@ class UIRenderer:
 
         if available_rows <= 0 or max_x <= 0:
             msg = "(matrix view needs more space)"
-            try:
-                stdscr.addstr(1, 0, msg[:max_x] if max_x > 0 else msg, curses.A_DIM)
-            except curses.error:
-                pass
+            self._put_row(stdscr, 1, msg[:max_x] if max_x > 0 else msg, curses.A_DIM)
             status = self._compose_status(mode_indicator="[Matrix]")
             self._render_status_bar(stdscr, status, max_y, max_x, bold=False)
             return
 
         matrix_height = max(1, available_rows - 1)
-        for y in range(content_start_y, max(0, max_y - 1)):
-            try:
-                stdscr.move(y, 0)
-                stdscr.clrtoeol()
-            except curses.error:
-                pass
 
         items = self.nav.build_display_items()
         total = len(items)
@@ -466,18 +503,18 @@ class UIRenderer:
             return
 
         self._idle_matrix_state = None
-        state = self._ensure_matrix_state(items, matrix_height, max_x)
-
-        now = time.monotonic()
-        delta = 0.0 if state.last_update == 0 else now - state.last_update
-        state.last_update = now
-
         selected_index = (
             0 if total == 0 else max(0, min(self.nav.browser_selected, total - 1))
         )
         if total > 0:
             self.nav.browser_selected = selected_index
 
+        state = self._ensure_matrix_state(items, matrix_height, max_x, selected_index)
+
+        now = time.monotonic()
+        delta = 0.0 if state.last_update == 0 else now - state.last_update
+        state.last_update = now
+
         visual_indices: list[int] = []
         if getattr(self.nav, "visual_mode", False):
             visual_indices = getattr(self.nav, "get_visual_indices", lambda _t: [])(
@@ -488,9 +525,8 @@ class UIRenderer:
         paused_indices.add(selected_index)
 
         if self.nav.marked_items:
-            index_by_path = {items[idx][2]: idx for idx in range(total)}
             for marked_path in self.nav.marked_items:
-                idx = index_by_path.get(marked_path)
+                idx = items.index_of(marked_path)
                 if idx is not None:
                     paused_indices.add(idx)
 
@@ -499,40 +535,23 @@ class UIRenderer:
                 continue
             stream.head = (stream.head + stream.velocity * delta) % matrix_height
 
+        rows = min(matrix_height, max(0, label_row - content_start_y))
+        columns: list[Tuple[int, str, int, int, int]] = []
         for stream in state.streams:
             col = max(0, min(max_x - 1, stream.column))
-            chars = stream.chars or "0"
-            for row_offset in range(matrix_height):
-                y = content_start_y + row_offset
-                if y >= label_row:
-                    break
-                offset = int((stream.head - row_offset) % stream.length)
-                char_index = (stream.length - 1 - offset) % stream.length
-                ch = chars[char_index]
-                attr = curses.A_DIM
-                if stream.index == selected_index:
-                    attr = curses.A_BOLD if offset == 0 else curses.A_NORMAL
-                elif offset == 0:
-                    attr = curses.A_NORMAL
-                try:
-                    stdscr.addch(y, col, ch, attr)
-                except curses.error:
-                    pass
+            text, head_row = self._stream_column(stream.chars or "0", stream.head, rows)
+            if stream.index == selected_index:
+                columns.append((col, text, head_row, curses.A_NORMAL, curses.A_BOLD))
+            else:
+                columns.append((col, text, head_row, curses.A_DIM, curses.A_NORMAL))
+        self._draw_matrix_rows(stdscr, content_start_y, rows, max_x, columns)
 
         if 0 <= label_row < max_y:
             name, is_dir, path, _ = items[selected_index]
             pretty = DirectoryManager.pretty_path(path)
             if is_dir and not pretty.endswith("/"):
                 pretty = pretty + "/"
-            start_x = 0
-            try:
-                stdscr.move(label_row, 0)
-                stdscr.clrtoeol()
-                width = max(0, max_x - start_x)
-                if width > 0:
-                    stdscr.addstr(label_row, start_x, pretty[:width])
-            except curses.error:
-                pass
+            self._put_row(stdscr, label_row, pretty[: max(0, max_x)])
 
         selection_indicator = f"  [{selected_index + 1}/{total}]"
         status = self._compose_status(
@@ -556,65 +575,121 @@ class UIRenderer:
             positions.append(pos)
         return positions
 
+    @staticmethod
+    def _matrix_window(total: int, selected: int, max_x: int) -> Tuple[int, int]:
+        """Rows shown as streams: the page of ``max_x`` entries holding *selected*.
+
+        One stream per terminal column at most, so positions never collide
+        and only the page on screen is ever built.
+        """
+        capacity = max(1, max_x)
+        if total <= capacity:
+            return 0, total
+        start = selected - selected % capacity
+        return start, min(total, start + capacity)
+
     def _ensure_matrix_state(
         self,
         items: Sequence[Tuple[str, bool, str, int]],
         matrix_height: int,
         max_x: int,
+        selected_index: int = 0,
     ) -> MatrixState:
-        signature = tuple(entry[2] for entry in items)
+        window = self._matrix_window(len(items), selected_index, max_x)
         state: Optional[MatrixState] = getattr(self.nav, "matrix_state", None)
+        if state is not None and state.max_height != matrix_height:
+            # Pattern lengths and head ranges depend on the height.
+            state = None
 
         if (
-            state is None
-            or state.signature != signature
-            or state.max_height != matrix_height
-            or state.max_width != max_x
+            state is not None
+            and isinstance(items, DisplayRows)
+            and state.source is items
+            and state.window == window
+            and state.max_width == max_x
         ):
-            streams: list[MatrixStream] = []
-            columns = self._compute_columns(len(items), max_x)
-            pattern_length = max(32, matrix_height * 2)
-            for idx, (name, is_dir, path, depth) in enumerate(items):
-                column = columns[idx] if idx < len(columns) else (idx % max_x)
-                velocity = random.uniform(5.0, 12.0)
-                head = random.uniform(0, matrix_height - 1 if matrix_height > 1 else 0)
-                base_label = name + ("/" if is_dir else "")
-                sanitized = base_label.strip()
-                if not sanitized:
-                    sanitized = "?"
-                sanitized = sanitized.replace(" ", "_")
-                if len(sanitized) == 1:
-                    chars = sanitized * pattern_length
-                else:
-                    repeats = (pattern_length // len(sanitized)) + 2
-                    chars = (sanitized * repeats)[:pattern_length]
-                streams.append(
-                    MatrixStream(
-                        index=idx,
-                        name=name,
-                        path=path,
-                        is_dir=is_dir,
-                        depth=depth,
-                        column=column,
-                        velocity=velocity,
-                        head=head,
-                        chars=chars,
-                    )
-                )
-
-            index_map = {stream.index: stream for stream in streams}
-            state = MatrixState(
-                streams=streams,
-                signature=signature,
-                max_height=matrix_height,
-                max_width=max_x,
-                last_update=0.0,
-                index_map=index_map,
-            )
-            self.nav.matrix_state = state
+            return state
 
+        state = self._reconcile_matrix_state(
+            state, items, window, matrix_height, max_x
+        )
+        self.nav.matrix_state = state
         return state
 
+    def _reconcile_matrix_state(
+        self,
+        previous: Optional[MatrixState],
+        items: Sequence[Tuple[str, bool, str, int]],
+        window: Tuple[int, int],
+        matrix_height: int,
+        max_x: int,
+    ) -> MatrixState:
+        """Streams for *window*, reusing the previous stream of each path.
+
+        Entries that stayed keep their velocity and head; only added or
+        changed entries get new streams, and columns are recomputed.
+        """
+        start, stop = window
+        entries = items[start:stop]
+        columns = self._compute_columns(len(entries), max_x)
+        known = previous.by_path if previous is not None else {}
+        streams: list[MatrixStream] = []
+        for offset, entry in enumerate(entries):
+            name, is_dir, path, depth = entry
+            index = start + offset
+            stream = known.get(path)
+            if stream is None or stream.is_dir != is_dir or stream.name != name:
+                stream = self._make_stream(index, entry, columns[offset], matrix_height)
+            else:
+                stream.index = index
+                stream.column = columns[offset]
+                stream.depth = depth
+            streams.append(stream)
+
+        return MatrixState(
+            streams=streams,
+            max_height=matrix_height,
+            max_width=max_x,
+            last_update=previous.last_update if previous is not None else 0.0,
+            index_map={stream.index: stream for stream in streams},
+            window=window,
+            source=items,
+            by_path={stream.path: stream for stream in streams},
+        )
+
+    @staticmethod
+    def _make_stream(
+        index: int,
+        entry: Tuple[str, bool, str, int],
+        column: int,
+        matrix_height: int,
+    ) -> MatrixStream:
+        name, is_dir, path, depth = entry
+        pattern_length = max(32, matrix_height * 2)
+        velocity = random.uniform(5.0, 12.0)
+        head = random.uniform(0, matrix_height - 1 if matrix_height > 1 else 0)
+        base_label = name + ("/" if is_dir else "")
+        sanitized = base_label.strip()
+        if not sanitized:
+            sanitized = "?"
+        sanitized = sanitized.replace(" ", "_")
+        if len(sanitized) == 1:
+            chars = sanitized * pattern_length
+        else:
+            repeats = (pattern_length // len(sanitized)) + 2
+            chars = (sanitized * repeats)[:pattern_length]
+        return MatrixStream(
+            index=index,
+            name=name,
+            path=path,
+            is_dir=is_dir,
+            depth=depth,
+            column=column,
+            velocity=velocity,
+            head=head,
+            chars=chars,
+        )
+
     def _render_idle_matrix(
         self,
         stdscr: Any,
@@ -662,31 +737,94 @@ class UIRenderer:
         trail_length = max(32, matrix_height * 2)
 
         if 0 <= label_row:
-            try:
-                stdscr.move(label_row, 0)
-                stdscr.clrtoeol()
-            except curses.error:
-                pass
+            self._put_row(stdscr, label_row, "")
 
+        rows = min(matrix_height, max(0, label_row - content_start_y))
+        columns: list[Tuple[int, str, int, int, int]] = []
         for stream in state.streams:
             stream.head = (stream.head + stream.velocity * delta) % matrix_height
             if len(stream.chars) < trail_length:
                 repeats = (trail_length // max(1, len(stream.chars))) + 2
                 stream.chars = (stream.chars * repeats)[:trail_length]
-            chars = stream.chars or "0"
-            length = len(chars)
             col = max(0, min(max_x - 1, stream.column))
-            for row_offset in range(matrix_height):
-                y = content_start_y + row_offset
-                if y >= label_row:
-                    break
-                offset = int((stream.head - row_offset) % length)
-                char_index = (length - 1 - offset) % length
-                ch = chars[char_index]
-                attr = curses.A_DIM
-                if offset == int(stream.head % length):
-                    attr = curses.A_NORMAL
-                try:
-                    stdscr.addch(y, col, ch, attr)
-                except curses.error:
-                    pass
+            text, _head_row = self._stream_column(stream.chars or "0", stream.head, rows)
+            # The idle rain lights the top cell of each stream.
+            columns.append((col, text, 0, curses.A_DIM, curses.A_NORMAL))
+        self._draw_matrix_rows(stdscr, content_start_y, rows, max_x, columns)
+
+    @staticmethod
+    def _stream_column(chars: str, head: float, rows: int) -> Tuple[str, int]:
+        """Characters a stream shows from the top row down, and its head row.
+
+        Row ``r`` shows ``chars[(len - 1 - head + r) % len]``, so the visible
+        column is one contiguous slice of the pattern repeated twice.
+        """
+        length = len(chars)
+        top = int(head) % length
+        start = (length - 1 - top) % length
+        doubled = chars * (2 + rows // length)
+        return doubled[start : start + rows], top
+
+    def _draw_matrix_rows(
+        self,
+        stdscr: Any,
+        start_y: int,
+        rows: int,
+        max_x: int,
+        columns: list[Tuple[int, str, int, int, int]],
+    ) -> None:
+        """Write Matrix rows with one ``addstr`` per attribute run.
+
+        *columns* holds ``(col, text, head_row, body_attr, head_attr)`` per
+        stream, later streams winning a shared column. The column strings are
+        transposed into row strings with ``zip`` instead of placing every
+        cell with ``addch``.
+        """
+        if rows <= 0 or max_x <= 0:
+            return
+        blank = " " * rows
+        grid = [blank] * max_x
+        owners: dict[int, Tuple[int, int, int]] = {}
+        for col, text, head_row, body_attr, head_attr in columns:
+            grid[col] = text
+            owners[col] = (head_row, body_attr, head_attr)
+        for row, cells in enumerate(zip(*grid)):
+            line = "".join(cells)
+            overrides: dict[int, int] = {}
+            for col, (head_row, body_attr, head_attr) in owners.items():
+                if row == head_row:
+                    overrides[col] = head_attr
+                elif body_attr != curses.A_DIM:
+                    overrides[col] = body_attr
+            self._put_runs(
+                stdscr, start_y + row, self._attr_runs(line, curses.A_DIM, overrides)
+            )
+
+    def _put_runs(
+        self, stdscr: Any, y: int, runs: Tuple[Tuple[int, str, int], ...]
+    ) -> None:
+        if self._diffing:
+            self._screen.put_runs(stdscr, y, runs)
+            return
+        ShadowScreen.write_runs(stdscr, y, runs)
+
+    @staticmethod
+    def _attr_runs(
+        line: str, base_attr: int, overrides: dict[int, int]
+    ) -> Tuple[Tuple[int, str, int], ...]:
+        """Split *line* into ``(x, text, attr)`` runs, skipping blank ones.
+
+        Rows are cleared before the runs are drawn, so runs of spaces in the
+        base attribute need no write.
+        """
+        runs: list[Tuple[int, str, int]] = []
+        pos = 0
+        for col in sorted(overrides):
+            if col > pos and line[pos:col].strip():
+                runs.append((pos, line[pos:col], base_attr))
+            runs.append((col, line[col], overrides[col]))
+            pos = col + 1
+        tail = line[pos:].rstrip()
+        if tail:
+            runs.append((pos, tail, base_attr))
+        return tuple(runs)